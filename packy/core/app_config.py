@@ -30,10 +30,22 @@ class AppConfig:
     Attributes:
         VERSION (str): Application current version.
         LOG_FILE_PATH (Path): Absolute path to the application log file.
+        SCAN_CACHE_PATH (Path): Absolute path to the cache of the directory
+            listings read by the integrity checks.
+        LOG_MAX_BYTES (int): Size in bytes past which the log file is rotated,
+            never if 0.
+        LOG_BACKUP_COUNT (int): Number of rotated log files kept.
+        LOG_JSON_LINES (bool): Whether the log file holds JSON lines instead
+            of text. Like the other values, it is fixed for a build: the
+            application never changes it, and the settings do not hold it.
     """
 
     VERSION: str = "0.9.0.0"
     LOG_FILE_PATH: Path = field(init=False)
+    SCAN_CACHE_PATH: Path = field(init=False)
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_JSON_LINES: bool = False
 
     def __post_init__(self) -> None:
         """Initializes derived configuration paths after dataclass creation."""
@@ -48,3 +60,8 @@ class AppConfig:
             "LOG_FILE_PATH",
             folder_path / "log.txt",
         )
+        object.__setattr__(
+            self,
+            "SCAN_CACHE_PATH",
+            folder_path / "scan_cache.sqlite3",
+        )
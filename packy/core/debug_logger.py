@@ -5,11 +5,20 @@ message handler, formats them with contextual information, and writes
 them to a log file. It also supports optional console output in
 development environments.
 
+The messages are logged from any thread, the workers packing included, so
+the handler only stamps them and queues them. A single background thread
+writes them in batches, a write and a flush per batch rather than per
+message, so the lines never interleave. The file is rotated once it grows
+past a size, keeping a number of older files, and can hold JSON lines
+instead of text. The size, the number of files and the format are read
+from the AppConfig of the application. The queue is written out before a fatal message aborts
+the application and when logging stops, at exit at the latest.
+
 Typical usage example:
 
   from pathlib import Path
 
-  DebugLogger.start(Path("app.log"))
+  DebugLogger.start(Path("app.log"), AppConfig())
   # Run application...
   DebugLogger.stop()
 
@@ -24,15 +33,242 @@ from PySide6 import QtCore
 from PySide6.QtCore import QDateTime, QMessageLogContext, Qt, QThread, QtMsgType
 
 # Standard library
+import atexit
+import contextlib
+import json
 import os
+import queue
 import sys
-from typing import TYPE_CHECKING, Literal, TextIO, final
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO, Literal, final
 
 if TYPE_CHECKING:
+    # Local application
+    from packy.core.app_config import AppConfig
+
     # Standard library
     from pathlib import Path
 
+# Maximum number of messages written by a single write
+MAX_BATCH_SIZE = 1000
+
+# Delay in seconds to wait for the queue to be written before aborting
+FATAL_FLUSH_TIMEOUT = 5.0
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class _LogRecord:
+    """A message stamped by the thread logging it.
+
+    Attributes:
+        timestamp (str): Date and time of the message, in ISO format.
+        pid (int): Identifier of the process.
+        thread_id (str): Identifier of the thread logging the message.
+        ctx_file (str): The source file where the message originated.
+        ctx_line (int): The line number in the source file.
+        level (str): The severity of the message.
+        msg (str): The log message content.
+    """
+
+    timestamp: str
+    pid: int
+    thread_id: str
+    ctx_file: str
+    ctx_line: int
+    level: str
+    msg: str
+
+    # -------------------------------------------------------------------------
+    def text(self) -> str:
+        """Formats the record into a structured line, without line break.
+
+        !! Warning !! Since the display of "files" and "lines" only works by default when Qt
+        is in debug mode, we need to set QT_MESSAGELOGCONTEXT to enable them. But I haven't
+        figured out how to do that in Python environment.
+        """
+        return (
+            f"[{self.timestamp}][{self.pid},0x{self.thread_id}]"
+            f"[{self.ctx_file}:{self.ctx_line}][{self.level}]: {self.msg}"
+        )
+
+    # -------------------------------------------------------------------------
+    def jsonLine(self) -> str:
+        """Formats the record into a JSON object, without line break."""
+        return json.dumps(
+            {
+                "time": self.timestamp,
+                "pid": self.pid,
+                "thread": self.thread_id,
+                "file": self.ctx_file,
+                "line": self.ctx_line,
+                "level": self.level,
+                "message": self.msg,
+            },
+            ensure_ascii=False,
+        )
+
+
+###############################################################################
+@final
+class _LogWriter:
+    """Writes the log records queued by any thread from a background thread.
+
+    Attributes:
+        __path (Path): The path to the log file.
+        __max_bytes (int): Size in bytes past which the file is rotated, never
+            if 0.
+        __backup_count (int): Number of rotated files kept.
+        __json_lines (bool): Whether the file holds JSON lines.
+        __to_console (bool): Whether the messages are printed as well.
+        __file (BinaryIO): The log file.
+        __size (int): The size of the log file.
+        __queue (queue.SimpleQueue): The records, flush requests and stop
+            request to handle, in order.
+        __thread (threading.Thread): The thread writing the records.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int,
+        backup_count: int,
+        json_lines: bool,
+        to_console: bool,
+    ) -> None:
+        """Opens the log file and starts the writing thread.
+
+        Args:
+            path (Path): The path to the log file.
+            max_bytes (int): Size in bytes past which the file is rotated,
+                never if 0.
+            backup_count (int): Number of rotated files kept.
+            json_lines (bool): Whether the file holds JSON lines.
+            to_console (bool): Whether the messages are printed as well.
+
+        Raises:
+            OSError: If the log file cannot be opened.
+        """
+        self.__path: Path = path
+        self.__max_bytes: int = max_bytes
+        self.__backup_count: int = backup_count
+        self.__json_lines: bool = json_lines
+        self.__to_console: bool = to_console
+        self.__file: BinaryIO = path.open(mode="ab")
+        self.__size: int = os.fstat(self.__file.fileno()).st_size
+        self.__queue: queue.SimpleQueue[_LogRecord | threading.Event | None] = (
+            queue.SimpleQueue()
+        )
+        self.__thread: threading.Thread = threading.Thread(
+            target=self.__run, name="DebugLogger", daemon=True
+        )
+        self.__thread.start()
+
+    # -------------------------------------------------------------------------
+    def put(self, record: _LogRecord) -> None:
+        """Queues a record, without waiting for it to be written."""
+        self.__queue.put(record)
+
+    # -------------------------------------------------------------------------
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits for the records queued so far to be written.
+
+        Args:
+            timeout (float | None): Delay in seconds to wait at most, no limit
+                if None. Defaults to None.
+
+        Returns:
+            bool: True if the records were written, false on timeout.
+        """
+        flushed = threading.Event()
+        self.__queue.put(flushed)
+        return flushed.wait(timeout)
+
+    # -------------------------------------------------------------------------
+    def close(self) -> None:
+        """Writes the records queued so far, then closes the log file."""
+        self.__queue.put(None)
+        self.__thread.join()
+
+    # -------------------------------------------------------------------------
+    def __run(self) -> None:
+        is_running = True
+        while is_running:
+            items = [self.__queue.get()]
+            with contextlib.suppress(queue.Empty):
+                while len(items) < MAX_BATCH_SIZE:
+                    items.append(self.__queue.get_nowait())
+
+            records = [item for item in items if isinstance(item, _LogRecord)]
+            if records:
+                self.__write(records)
+
+            for item in items:
+                if item is None:
+                    is_running = False
+                elif isinstance(item, threading.Event):
+                    item.set()
+
+        self.__file.close()
+
+    # -------------------------------------------------------------------------
+    def __write(self, records: list[_LogRecord]) -> None:
+        lines = [record.jsonLine() if self.__json_lines else record.text() for record in records]
+
+        try:
+            # The lines are written in one go, unless the file must be
+            # rotated in between
+            max_bytes = self.__max_bytes
+            chunk: list[bytes] = []
+            chunk_size = 0
+            for line in lines:
+                data = (line + "\n").encode("utf-8")
+                size = self.__size + chunk_size
+                if max_bytes > 0 and size > 0 and size + len(data) > max_bytes:
+                    self.__writeChunk(chunk, chunk_size)
+                    self.__rotate()
+                    chunk = []
+                    chunk_size = 0
+                chunk.append(data)
+                chunk_size += len(data)
+
+            self.__writeChunk(chunk, chunk_size)
+            self.__file.flush()
+        except (OSError, ValueError) as ex:
+            # The messages are lost, not the application
+            print(f"Cannot write the log file: {ex}", file=sys.stderr)  # noqa: T201
+
+        if self.__to_console:
+            texts = lines if not self.__json_lines else [record.text() for record in records]
+            sys.stdout.write("\n".join(texts) + "\n")
+
+    # -------------------------------------------------------------------------
+    def __writeChunk(self, chunk: list[bytes], chunk_size: int) -> None:
+        self.__file.write(b"".join(chunk))
+        self.__size += chunk_size
 
+    # -------------------------------------------------------------------------
+    def __rotate(self) -> None:
+        # log.txt becomes log.txt.1, log.txt.1 becomes log.txt.2 and so on,
+        # the oldest one being removed
+        self.__file.close()
+
+        path = str(self.__path)
+        try:
+            if self.__backup_count > 0:
+                for index in range(self.__backup_count - 1, 0, -1):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+                os.replace(path, f"{path}.1")
+        finally:
+            # Without backup, the file starts over
+            self.__file = self.__path.open(mode="ab" if self.__backup_count > 0 else "wb")
+            self.__size = os.fstat(self.__file.fileno()).st_size
+
+
+###############################################################################
 @final
 class DebugLogger:
     """Provide a centralized logging facility for Qt messages.
@@ -42,19 +278,24 @@ class DebugLogger:
     to the console in development environments.
 
     Attributes:
-        __log_file (TextIO | None): The file object used to write log
-            messages. None if logging is not active.
+        __writer (_LogWriter | None): Writes the log messages to the log
+            file. None if logging is not active.
+        __lock (threading.Lock): Guards the start and the stop of logging.
     """
 
-    __log_file: TextIO | None = None
+    __writer: _LogWriter | None = None
+    __lock: threading.Lock = threading.Lock()
 
     # -------------------------------------------------------------------------
     @classmethod
-    def start(cls, log_file_path: Path) -> bool:
+    def start(cls, log_file_path: Path, config: AppConfig) -> bool:
         """Start logging by opening the log file and installing handler.
 
         Args:
             log_file_path (Path): The path to the log file.
+            config (AppConfig): The configuration giving the rotation of the
+                log file, from LOG_MAX_BYTES and LOG_BACKUP_COUNT, and its
+                format, from LOG_JSON_LINES.
 
         Returns:
             bool: True if logging started successfully, false if already active.
@@ -63,32 +304,44 @@ class DebugLogger:
             OSError: If the log file cannot be opened.
             PermissionError: If access to the log file is denied.
         """
-        if cls.is_active():
-            return False
-
-        try:
-            cls.__log_file = log_file_path.open(mode="a", buffering=1, encoding="utf-8")
-        except OSError, PermissionError:
-            cls.__log_file = None
-            raise
-        else:
-            QtCore.qInstallMessageHandler(cls.q_message_handler)
-            return True
+        with cls.__lock:
+            if cls.__writer is not None:
+                return False
+
+            in_dev_mode = not getattr(sys, "frozen", False)
+            cls.__writer = _LogWriter(
+                log_file_path,
+                config.LOG_MAX_BYTES,
+                config.LOG_BACKUP_COUNT,
+                config.LOG_JSON_LINES,
+                in_dev_mode,
+            )
+
+        QtCore.qInstallMessageHandler(cls.q_message_handler)
+        # The queued messages are written even if stop is never called
+        atexit.register(cls.stop)
+        return True
 
     # -------------------------------------------------------------------------
     @classmethod
     def stop(cls) -> bool:
         """Stop logging and release associated resources.
 
+        The messages logged so far are written before the log file is closed.
+
         Returns:
             bool: True if logging was stopped, false if it was not active.
         """
-        if not cls.is_active():
-            return False
+        with cls.__lock:
+            writer = cls.__writer
+            if writer is None:
+                return False
 
-        QtCore.qInstallMessageHandler(None)
-        cls.__log_file.close()  # pyright: ignore[reportOptionalMemberAccess] with the first test, we know the var is not None
-        cls.__log_file = None
+            QtCore.qInstallMessageHandler(None)
+            cls.__writer = None
+
+        atexit.unregister(cls.stop)
+        writer.close()
         return True
 
     # -------------------------------------------------------------------------
@@ -99,7 +352,23 @@ class DebugLogger:
         Returns:
             bool: True if logging is active, false otherwise.
         """
-        return cls.__log_file is not None
+        return cls.__writer is not None
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def flush(cls, timeout: float | None = None) -> bool:
+        """Wait for the messages logged so far to be written.
+
+        Args:
+            timeout (float | None): Delay in seconds to wait at most, no limit
+                if None. Defaults to None.
+
+        Returns:
+            bool: True if the messages were written or logging is not active,
+            false on timeout.
+        """
+        writer = cls.__writer
+        return writer.flush(timeout) if writer is not None else True
 
     # -------------------------------------------------------------------------
     @classmethod
@@ -117,17 +386,15 @@ class DebugLogger:
                 file and line number.
             msg (str): The log message content.
         """
-        formated_msg = cls.__format_message(msg_type, msg_context.file, msg_context.line, msg)
-        cls.__log_message(msg_type, formated_msg)
+        record = cls.__make_record(msg_type, msg_context.file, msg_context.line, msg)
+        cls.__log_message(msg_type, record)
 
     # -------------------------------------------------------------------------
     @classmethod
-    def __format_message(cls, msg_type: QtMsgType, ctx_file: str, ctx_line: int, msg: str) -> str:
-        """Format a log message into a structured string.
-
-        !! Warning !! Since the display of "files" and "lines" only works by default when Qt
-        is in debug mode, we need to set QT_MESSAGELOGCONTEXT to enable them. But I haven't
-        figured out how to do that in Python environment.
+    def __make_record(
+        cls, msg_type: QtMsgType, ctx_file: str, ctx_line: int, msg: str
+    ) -> _LogRecord:
+        """Stamp a log message with its context, in the thread logging it.
 
         Args:
             msg_type (QtMsgType): The type/severity of the message.
@@ -136,37 +403,37 @@ class DebugLogger:
             msg (str): The log message content.
 
         Returns:
-            str: The formatted log message.
+            _LogRecord: The stamped message.
         """
-        timestamp = QDateTime.currentDateTime().toString(Qt.DateFormat.ISODateWithMs)
-        pid = os.getpid()
-        thread_id = hex(id(QThread.currentThread()))
-        level = cls.__msg_type_to_str(msg_type)
-        formated_msg = f"[{timestamp}][{pid},0x{thread_id}][{ctx_file}:{ctx_line}][{level}]: {msg}"
-        return formated_msg  # noqa: RET504
+        return _LogRecord(
+            timestamp=QDateTime.currentDateTime().toString(Qt.DateFormat.ISODateWithMs),
+            pid=os.getpid(),
+            thread_id=hex(id(QThread.currentThread())),
+            ctx_file=ctx_file,
+            ctx_line=ctx_line,
+            level=cls.__msg_type_to_str(msg_type),
+            msg=msg,
+        )
 
     # -------------------------------------------------------------------------
     @classmethod
-    def __log_message(cls, msg_type: QtMsgType, msg: str) -> None:
-        """Write a formatted message to the log file and optionally console.
+    def __log_message(cls, msg_type: QtMsgType, record: _LogRecord) -> None:
+        """Queue a stamped message for the log file and optionally console.
+
+        A fatal message is written before the application is aborted.
 
         Args:
             msg_type (QtMsgType): The type/severity of the message.
-            msg (str): The formatted log message.
+            record (_LogRecord): The stamped message.
         """
-        if not cls.is_active():
+        writer = cls.__writer
+        if writer is None:
             return
 
-        # Log in file
-        cls.__log_file.write(msg + "\n")  # pyright: ignore[reportOptionalMemberAccess] with the first test, we know the var is not None
-
-        # Log in console
-        in_dev_mode = not getattr(sys, "frozen", False)
-        if in_dev_mode:
-            print(msg)  # noqa: T201
+        writer.put(record)
 
         if msg_type == QtMsgType.QtFatalMsg:
-            cls.__log_file.flush()  # pyright: ignore[reportOptionalMemberAccess] with the first test, we know the var is not None
+            writer.flush(FATAL_FLUSH_TIMEOUT)
             os.abort()
 
     # -----------------------------------------------------------------------------
@@ -61,6 +61,7 @@ class UIStrings:
 
         HELP: Final = PACKY_TRANSLATE_NOOP("Menu", "Help")
         CLEAR: Final = PACKY_TRANSLATE_NOOP("Menu", "Clear")
+        COPY: Final = PACKY_TRANSLATE_NOOP("Menu", "Copy")
 
     class MessagesView:
         """Translatable strings for message display operations."""
@@ -80,6 +81,11 @@ class UIStrings:
         OP_PACK: Final = PACKY_TRANSLATE_NOOP("MessagesView", "Pack to file {}")
         OP_EXTRACT: Final = PACKY_TRANSLATE_NOOP("MessagesView", "Extract file {}")
         OP_TEST: Final = PACKY_TRANSLATE_NOOP("MessagesView", "Test file integrity {}")
+        SHOW_ALL: Final = PACKY_TRANSLATE_NOOP("MessagesView", "All messages")
+        SHOW_INFO: Final = PACKY_TRANSLATE_NOOP("MessagesView", "Without item details")
+        SHOW_SUCCESS: Final = PACKY_TRANSLATE_NOOP("MessagesView", "Successes and errors")
+        SHOW_ERROR: Final = PACKY_TRANSLATE_NOOP("MessagesView", "Errors")
+        SEARCH: Final = PACKY_TRANSLATE_NOOP("MessagesView", "Search messages")
 
     @staticmethod
     def tr(txt_constant: str, *args: object) -> str:
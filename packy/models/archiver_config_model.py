@@ -25,8 +25,9 @@ from PySide6.QtCore import (
 )
 
 # Standard library
+import dataclasses
 from dataclasses import dataclass
-from enum import IntEnum, auto, unique
+from enum import Enum, IntEnum, auto, unique
 from typing import TYPE_CHECKING, Any, ClassVar, Protocol, final, override
 
 if TYPE_CHECKING:
@@ -51,6 +52,9 @@ class ArchiveFormat(LabeledEnum):
     LZMA = (auto(), "lzma")
     TLZ = (auto(), "tlz")
     XZ = (auto(), "xz")
+    TXZ = (auto(), "txz")
+    ZST = (auto(), "zst")
+    TZST = (auto(), "tzst")
 
 
 ###############################################################################
@@ -122,12 +126,111 @@ class FormatOptions(Protocol):
         subclass = cls._registry.get(fmt)
         return subclass() if subclass else None
 
+    @classmethod
+    def deserialize(cls, fmt: ArchiveFormat, json_dict: dict[str, Any]) -> FormatOptions | None:
+        """Creates the options of an archive format from their JSON values.
+
+        The values missing keep their default, and the ones of other formats
+        are ignored.
+
+        Args:
+            fmt (ArchiveFormat): The archive format.
+            json_dict (dict[str, Any]): The option values, by name.
+
+        Returns:
+            FormatOptions | None: The format options, or None if no
+            implementation is registered.
+        """
+        options = cls.create(fmt)
+        if options is None:
+            return None
+
+        names = {option_field.name for option_field in dataclasses.fields(options)}
+        values = {name: value for name, value in json_dict.items() if name in names}
+        return dataclasses.replace(options, **values)
+
+    def serialize(self) -> dict[str, Any]:
+        """Converts the options to their JSON values.
+
+        Returns:
+            dict[str, Any]: The option values, by name.
+        """
+        return dataclasses.asdict(self)
+
 
 ###############################################################################
 @FormatOptions.register(ArchiveFormat.ZIP)
+@FormatOptions.register(ArchiveFormat.LZMA)
 @dataclass
 class ZipOptions(FormatOptions):
-    """Configuration options specific to ZIP archive generation."""
+    """Configuration options specific to ZIP archive generation.
+
+    Attributes:
+        workers (int): Number of threads compressing members concurrently.
+            0 uses one thread per available core.
+        store_incompressible (bool): Whether members which would not shrink,
+            such as media or nested archives, are stored uncompressed.
+    """
+
+    workers: int = 0
+    store_incompressible: bool = True
+
+
+###############################################################################
+@FormatOptions.register(ArchiveFormat.TGZ)
+@FormatOptions.register(ArchiveFormat.TBZ)
+@FormatOptions.register(ArchiveFormat.TXZ)
+@FormatOptions.register(ArchiveFormat.GZ)
+@FormatOptions.register(ArchiveFormat.BZ2)
+@FormatOptions.register(ArchiveFormat.XZ)
+@dataclass
+class CompressorOptions(FormatOptions):
+    """Configuration options specific to gzip, bzip2 and xz compression.
+
+    Attributes:
+        workers (int): Number of threads compressing blocks concurrently.
+            0 uses one thread per available core, 1 writes a single
+            standard stream.
+        block_size (int): Size in bytes of the blocks compressed
+            independently. 0 uses the codec default.
+        store_incompressible (bool): Whether blocks which would not shrink
+            are written with the fastest level of the codec. Only applies
+            to blocks compressed concurrently.
+    """
+
+    workers: int = 0
+    block_size: int = 0
+    store_incompressible: bool = True
+
+
+###############################################################################
+@FormatOptions.register(ArchiveFormat.ZST)
+@FormatOptions.register(ArchiveFormat.TZST)
+@dataclass
+class ZstdOptions(FormatOptions):
+    """Configuration options specific to Zstandard compression.
+
+    Attributes:
+        workers (int): Number of zstd worker threads. 0 uses one thread per
+            available core, 1 compresses on the packing thread.
+        long_distance_matching (bool): Whether matches are searched across
+            a large window, which improves the ratio on big trees with
+            repeated content.
+    """
+
+    workers: int = 0
+    long_distance_matching: bool = True
+
+
+###############################################################################
+@unique
+class ConfigSerialKeys(Enum):
+    """Keys of the archiver configuration in a session file."""
+
+    FORMAT = "type"
+    COMPRESSION = "compression_method"
+    COMPRESSION_LEVEL = "compression_level"
+    OPTIONS = "options"
 
 
 ###############################################################################
@@ -307,6 +410,42 @@ class ArchiverConfigModel(QAbstractListModel, ISettingsPersistable, metaclass=Fi
     def write_settings(self, settings: Settings) -> None:
         pass
 
+    # -------------------------------------------------------------------------
+    def serialize(self) -> dict[str, Any]:
+        """Converts the configuration to its JSON values.
+
+        Returns:
+            dict[str, Any]: The configuration values, by ConfigSerialKeys
+            value.
+        """
+        json_dict: dict[str, Any] = {
+            ConfigSerialKeys.FORMAT.value: self.__format.id,
+            ConfigSerialKeys.COMPRESSION.value: self.__compression.id,
+            ConfigSerialKeys.COMPRESSION_LEVEL.value: self.__compression_level.id,
+        }
+        if self.__options is not None:
+            json_dict[ConfigSerialKeys.OPTIONS.value] = self.__options.serialize()
+        return json_dict
+
+    # -------------------------------------------------------------------------
+    def deserialize(self, json_dict: dict[str, Any]) -> None:
+        """Applies the configuration read from a session file.
+
+        The sessions saved before the format options keep their defaults.
+
+        Args:
+            json_dict (dict[str, Any]): The configuration values, by
+                ConfigSerialKeys value.
+        """
+        self.format = ArchiveFormat(json_dict[ConfigSerialKeys.FORMAT.value])
+        self.compression = CompressionMethod(json_dict[ConfigSerialKeys.COMPRESSION.value])
+        self.compression_level = CompressionLevel(
+            json_dict[ConfigSerialKeys.COMPRESSION_LEVEL.value]
+        )
+
+        options_dict = json_dict.get(ConfigSerialKeys.OPTIONS.value, {})
+        self.options = FormatOptions.deserialize(self.__format, options_dict)
+
     # -------------------------------------------------------------------------
     @property
     def format(self) -> ArchiveFormat:
@@ -340,6 +479,35 @@ class ArchiverConfigModel(QAbstractListModel, ISettingsPersistable, metaclass=Fi
         )
         self.format_changed.emit(value)
 
+    # -------------------------------------------------------------------------
+    @property
+    def options(self) -> FormatOptions | None:
+        """The options specific to the current archive format.
+
+        Returns:
+            FormatOptions | None: The format options, or None if the format
+            has no specific options.
+        """
+        return self.__options
+
+    # -------------------------------------------------------------------------
+    @options.setter
+    def options(self, value: FormatOptions | None) -> None:
+        """Sets the options specific to the current archive format.
+
+        Args:
+            value (FormatOptions | None): The format options to apply.
+
+        Raises:
+            TypeError: If the options are not the ones of the current format.
+        """
+        if type(value) is not type(self.__options):
+            raise TypeError
+        if self.__options == value:
+            return
+        self.__options = value
+        self.options_changed.emit(value)
+
     # -------------------------------------------------------------------------
     @property
     def compression(self) -> CompressionMethod:
@@ -0,0 +1,144 @@
+"""Cooperative cancellation of the task runs.
+
+A run is cancelled by setting its token from the GUI thread. The packer
+checks the token between the members it packs, and the files it reads and
+writes check it at each chunk, so a run stops within the time taken to
+read, compress and write a chunk, whatever the size of the archive.
+
+Typical usage example:
+
+  cancel_token = CancellationToken()
+  with open(path, "wb") as dst_file:
+      shutil.copyfileobj(src_file, CancellableFile(dst_file, cancel_token))
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import threading
+from typing import TYPE_CHECKING, Any, final
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Buffer
+    from typing import BinaryIO
+
+    # PackY
+    from packy.models.throughput import ByteCounter
+
+
+###############################################################################
+class RunCancelledError(Exception):
+    """The run was cancelled by the user."""
+
+
+###############################################################################
+@final
+class CancellationToken:
+    """Flag telling the stages of a run to stop.
+
+    Attributes:
+        __event (threading.Event): Set once the run is cancelled.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self) -> None:
+        """Initializes the token, not cancelled."""
+        self.__event: threading.Event = threading.Event()
+
+    # -------------------------------------------------------------------------
+    @property
+    def is_cancelled(self) -> bool:
+        """Whether the run was cancelled."""
+        return self.__event.is_set()
+
+    # -------------------------------------------------------------------------
+    def cancel(self) -> None:
+        """Cancels the run. The stages stop at their next check."""
+        self.__event.set()
+
+    # -------------------------------------------------------------------------
+    def raiseIfCancelled(self) -> None:
+        """Stops the stage calling it if the run was cancelled.
+
+        Raises:
+            RunCancelledError: The run was cancelled.
+        """
+        if self.__event.is_set():
+            raise RunCancelledError("The run was cancelled")
+
+
+###############################################################################
+@final
+class CancellableFile:
+    """File object checking a cancellation token at each read and write.
+
+    The other attributes are the ones of the wrapped file, so the wrapper
+    can be handed to ``ZipFile``, ``TarFile`` or a compression stream. The
+    bytes read and written can be counted along, to report the progress of
+    the run.
+
+    The cancellation is raised once: the objects writing into the wrapper
+    may still write their trailer while they are closed, the output of a
+    cancelled run being removed anyway.
+
+    Attributes:
+        __file (BinaryIO): The wrapped file. It is not closed with the
+            wrapper.
+        __cancel_token (CancellationToken): The token of the run.
+        __byte_counter (ByteCounter | None): Counts the bytes read and
+            written.
+        __has_raised (bool): Whether the cancellation was raised.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        file: BinaryIO,
+        cancel_token: CancellationToken,
+        byte_counter: ByteCounter | None = None,
+    ) -> None:
+        """Initializes the wrapper.
+
+        Args:
+            file (BinaryIO): The file to wrap.
+            cancel_token (CancellationToken): The token of the run.
+            byte_counter (ByteCounter | None): Counts the bytes read and
+                written. Defaults to None.
+        """
+        self.__file: BinaryIO = file
+        self.__cancel_token: CancellationToken = cancel_token
+        self.__byte_counter: ByteCounter | None = byte_counter
+        self.__has_raised: bool = False
+
+    # -------------------------------------------------------------------------
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401 any attribute of the file
+        """Returns the attributes of the wrapped file."""
+        return getattr(self.__file, name)
+
+    # -------------------------------------------------------------------------
+    def read(self, size: int = -1) -> bytes:
+        """Reads from the wrapped file, unless the run was cancelled."""
+        self.__raiseIfCancelled()
+        data = self.__file.read(size)
+        if self.__byte_counter is not None:
+            self.__byte_counter.add(len(data))
+        return data
+
+    # -------------------------------------------------------------------------
+    def write(self, b: Buffer) -> int:
+        """Writes to the wrapped file, unless the run was cancelled."""
+        self.__raiseIfCancelled()
+        nb_bytes = self.__file.write(b)
+        if self.__byte_counter is not None:
+            self.__byte_counter.add(nb_bytes)
+        return nb_bytes
+
+    # -------------------------------------------------------------------------
+    def __raiseIfCancelled(self) -> None:
+        if not self.__has_raised and self.__cancel_token.is_cancelled:
+            self.__has_raised = True
+            self.__cancel_token.raiseIfCancelled()
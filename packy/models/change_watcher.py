@@ -0,0 +1,332 @@
+"""Live tracking of the changes made to the selected files.
+
+This module watches, through ``QFileSystemWatcher``, the paths whose changes
+may change the warnings of some task selections: their checked roots and the
+directories listed below them. The paths notified are gathered in a set of
+dirty paths per selection, and only these directories are compared to the
+selection, in a worker thread, once a burst of changes is over. The warnings
+are then always current, and a selection without dirty path needs no scan.
+The selections never compared to the file system, such as the ones read
+from a session, are left to a full integrity check, run once they are
+shown, and their changes are only compared after it.
+
+The dirty paths only tell which items were added or removed. A file
+rewritten in place changes no directory, so it is not notified. The packer
+therefore still reads the state of every selected file to find whether the
+archive of a task is current, the watcher only sparing the integrity checks.
+
+The number of paths the system can watch is limited, with inotify on Linux
+for instance. The paths which cannot be watched are polled instead, their
+modification time being read every ``POLL_INTERVAL`` milliseconds.
+
+Typical usage example:
+
+  change_watcher = ChangeWatcher(parent)
+  change_watcher.setSelections(task.filesSelected() for task in session.tasks())
+  change_watcher.changes_found.connect(on_changes_found)
+  if change_watcher.isUpToDate(task_selection):
+      ...
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, final
+
+# PyQt
+from PySide6.QtCore import QFileSystemWatcher, QObject, QThreadPool, QTimer, Signal
+
+# PackY
+from packy.models.integrity_check import IntegrityCheck
+from packy.models.integrity_scanner import IntegrityReport
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Iterable
+
+    # PackY
+    from packy.models.task_selection import TaskSelection
+
+# Delay in milliseconds gathering the notifications of a burst of changes
+PROCESS_DELAY = 500
+
+# Interval in milliseconds between two reads of the paths which cannot be watched
+POLL_INTERVAL = 5000
+
+# Modification time of a polled path which does not exist
+_MISSING_MTIME = -1
+
+
+###############################################################################
+@dataclass(slots=True, eq=False)
+class _WatchedSelection:
+    """The watch state of a task selection.
+
+    Attributes:
+        selection (TaskSelection): The task selection.
+        paths (set[str]): The paths whose changes may change its warnings.
+        revision (int | None): The revision of the selection the paths were
+            computed for, None if they never were.
+        dirty_paths (set[str]): The paths changed since they were compared.
+        check (IntegrityCheck | None): The check of the dirty paths running.
+    """
+
+    selection: TaskSelection
+    paths: set[str] = field(default_factory=set)
+    revision: int | None = None
+    dirty_paths: set[str] = field(default_factory=set)
+    check: IntegrityCheck | None = None
+
+    # -------------------------------------------------------------------------
+    @property
+    def is_stale(self) -> bool:
+        """Whether the selection changed since the paths were computed."""
+        return self.revision != self.selection.revision
+
+    # -------------------------------------------------------------------------
+    @property
+    def needs_check(self) -> bool:
+        """Whether some paths of the selection can be compared.
+
+        The paths of a selection never compared in full wait for its check.
+        """
+        return bool(self.dirty_paths) and self.selection.is_checked
+
+
+###############################################################################
+@final
+class ChangeWatcher(QObject):
+    """Keeps the warnings of some task selections current.
+
+    The selections are not thread safe, so they are only read and changed
+    in the thread of the watcher.
+
+    Attributes:
+        changes_found (Signal): Emitted with a task selection and the
+            IntegrityReport of the items newly added to its warnings.
+        __watched_selections (list[_WatchedSelection]): The selections
+            watched.
+        __watcher (QFileSystemWatcher): The watcher of the system.
+        __polled_paths (dict[str, int]): The modification time of the paths
+            which cannot be watched, by path.
+        __process_timer (QTimer): Compares the dirty paths once a burst of
+            changes is over.
+        __poll_timer (QTimer): Reads the modification time of the polled
+            paths.
+    """
+
+    changes_found = Signal(object, object)
+
+    # -------------------------------------------------------------------------
+    def __init__(self, parent: QObject | None = None) -> None:
+        """Initializes the watcher, watching nothing.
+
+        Args:
+            parent (QObject | None): The parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self.__watched_selections: list[_WatchedSelection] = []
+        self.__watcher: QFileSystemWatcher = QFileSystemWatcher(self)
+        self.__polled_paths: dict[str, int] = {}
+
+        self.__process_timer: QTimer = QTimer(self)
+        self.__process_timer.setSingleShot(True)
+        self.__process_timer.setInterval(PROCESS_DELAY)
+
+        self.__poll_timer: QTimer = QTimer(self)
+        self.__poll_timer.setInterval(POLL_INTERVAL)
+
+        self.__watcher.directoryChanged.connect(self.__pathChanged)
+        self.__watcher.fileChanged.connect(self.__pathChanged)
+        self.__process_timer.timeout.connect(self.__process)
+        self.__poll_timer.timeout.connect(self.__poll)
+
+    # -------------------------------------------------------------------------
+    @property
+    def polled_paths(self) -> frozenset[str]:
+        """The paths polled because the system cannot watch them."""
+        return frozenset(self.__polled_paths)
+
+    # -------------------------------------------------------------------------
+    def setSelections(self, selections: Iterable[TaskSelection]) -> None:
+        """Watches some task selections in place of the ones watched.
+
+        The selections never compared to the file system are not scanned:
+        their changes are compared once a full integrity check marked them
+        checked, and refresh is called.
+
+        Args:
+            selections (Iterable[TaskSelection]): The selections to watch.
+        """
+        for watched_selection in self.__watched_selections:
+            if watched_selection.check is not None:
+                watched_selection.check.cancel()
+
+        self.__watched_selections = [_WatchedSelection(selection) for selection in selections]
+        self.__updatePaths()
+
+    # -------------------------------------------------------------------------
+    def isUpToDate(self, selection: TaskSelection) -> bool:
+        """Checks whether the warnings of a selection are current.
+
+        A selection whose warnings are current needs no integrity check.
+
+        Args:
+            selection (TaskSelection): The task selection.
+
+        Returns:
+            bool: True if the selection is watched, was compared in full, did
+            not change since its paths are watched, and no change is waiting to
+            be compared, false otherwise.
+        """
+        watched_selection = self.__find(selection)
+        return (
+            watched_selection is not None
+            and not watched_selection.is_stale
+            and watched_selection.selection.is_checked
+            and not watched_selection.dirty_paths
+            and watched_selection.check is None
+        )
+
+    # -------------------------------------------------------------------------
+    def refresh(self) -> None:
+        """Watches the paths of the selections changed since they were watched.
+
+        The changes waiting are compared too. It can be connected to the
+        signals of a view changing a selection, or called once a selection
+        is checked.
+        """
+        self.__process_timer.start()
+
+    # -------------------------------------------------------------------------
+    def __find(self, selection: TaskSelection) -> _WatchedSelection | None:
+        return next(
+            (
+                watched
+                for watched in self.__watched_selections
+                if watched.selection is selection
+            ),
+            None,
+        )
+
+    # -------------------------------------------------------------------------
+    def __findCheck(self, signals: QObject) -> _WatchedSelection | None:
+        # The checks of the selections no longer watched are not found
+        return next(
+            (
+                watched
+                for watched in self.__watched_selections
+                if watched.check is not None and watched.check.signals is signals
+            ),
+            None,
+        )
+
+    # -------------------------------------------------------------------------
+    def __updatePaths(self) -> None:
+        for watched_selection in self.__watched_selections:
+            if watched_selection.is_stale:
+                watched_selection.paths = watched_selection.selection.watchedPaths()
+                watched_selection.revision = watched_selection.selection.revision
+
+        paths: set[str] = set()
+        for watched_selection in self.__watched_selections:
+            paths.update(watched_selection.paths)
+
+        # The system forgets the paths removed
+        watched_paths = set(self.__watcher.directories())
+        watched_paths.update(self.__watcher.files())
+
+        unwatched_paths = watched_paths - paths
+        if unwatched_paths:
+            self.__watcher.removePaths(list(unwatched_paths))
+
+        for path in self.__polled_paths.keys() - paths:
+            del self.__polled_paths[path]
+
+        new_paths = paths - watched_paths - self.__polled_paths.keys()
+        if new_paths:
+            for path in self.__watcher.addPaths(list(new_paths)):
+                self.__polled_paths[path] = self.__mtime(path)
+
+        if self.__polled_paths:
+            self.__poll_timer.start()
+        else:
+            self.__poll_timer.stop()
+
+    # -------------------------------------------------------------------------
+    def __startCheck(self, watched_selection: _WatchedSelection) -> None:
+        dir_paths = watched_selection.dirty_paths
+        watched_selection.dirty_paths = set()
+
+        # The slots of the watcher run in its thread
+        check = IntegrityCheck(watched_selection.selection.startIntegrityCheck(dir_paths))
+        check.signals.items_found.connect(self.__itemsFound)
+        check.signals.finished.connect(self.__checkFinished)
+        watched_selection.check = check
+
+        QThreadPool.globalInstance().start(check)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __mtime(path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return _MISSING_MTIME
+
+    ###########################################################################
+    # PRIVATE SLOTS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def __pathChanged(self, path: str) -> None:
+        for watched_selection in self.__watched_selections:
+            if path in watched_selection.paths:
+                watched_selection.dirty_paths.add(path)
+
+        self.__process_timer.start()
+
+    # -------------------------------------------------------------------------
+    def __poll(self) -> None:
+        for path, mtime_ns in self.__polled_paths.items():
+            new_mtime_ns = self.__mtime(path)
+            if new_mtime_ns != mtime_ns:
+                self.__polled_paths[path] = new_mtime_ns
+                self.__pathChanged(path)
+
+    # -------------------------------------------------------------------------
+    def __process(self) -> None:
+        self.__updatePaths()
+
+        # The changes made while a check runs wait for its end
+        for watched_selection in self.__watched_selections:
+            if watched_selection.needs_check and watched_selection.check is None:
+                self.__startCheck(watched_selection)
+
+    # -------------------------------------------------------------------------
+    def __itemsFound(self, added_items: list[str], removed_items: list[str]) -> None:
+        watched_selection = self.__findCheck(self.sender())
+        if watched_selection is None:
+            return
+
+        # The folders of the added items are watched once the check ends
+        new_items = watched_selection.selection.addIntegrityReport(
+            IntegrityReport(added_items, removed_items)
+        )
+        if new_items.added_items or new_items.removed_items:
+            self.changes_found.emit(watched_selection.selection, new_items)
+
+    # -------------------------------------------------------------------------
+    def __checkFinished(self, is_cancelled: bool) -> None:
+        watched_selection = self.__findCheck(self.sender())
+        if watched_selection is None:
+            return
+
+        watched_selection.check = None
+        if watched_selection.is_stale or watched_selection.needs_check:
+            self.__process_timer.start()
@@ -0,0 +1,85 @@
+"""Detection of content that does not shrink when compressed.
+
+This module tells whether a file or a block of data is worth compressing,
+from the file extension first, then from a trial compression of a small
+sample. Media, archives and encrypted data are already at maximum entropy,
+and compressing them only costs CPU time.
+
+Typical usage example:
+
+  if hasIncompressibleExtension(path) or isIncompressible(first_chunk):
+      compress_type = ZIP_STORED
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+import zlib
+
+# Extensions of formats which are compressed by design
+INCOMPRESSIBLE_EXTENSIONS = frozenset(
+    {
+        # Images
+        ".avif", ".gif", ".heic", ".heif", ".jpeg", ".jpg", ".jxl", ".png", ".webp",
+        # Audio and video
+        ".aac", ".avi", ".flac", ".m4a", ".m4v", ".mkv", ".mov", ".mp3", ".mp4", ".ogg",
+        ".opus", ".webm", ".wmv",
+        # Archives and compressed files
+        ".7z", ".bz2", ".cab", ".gz", ".lz", ".lz4", ".lzma", ".rar", ".tbz", ".tgz",
+        ".tlz", ".txz", ".tzst", ".xz", ".zip", ".zst",
+        # Packaged documents and applications
+        ".apk", ".docx", ".epub", ".jar", ".odp", ".ods", ".odt", ".pptx", ".whl", ".xlsx",
+        # Encrypted containers
+        ".gpg", ".kdbx", ".pgp",
+    }
+)  # fmt: skip
+
+SAMPLE_SIZE = 8 * 1024
+# Samples shorter than this are compressed whatever their content
+MIN_SAMPLE_SIZE = 512
+# Minimum relative saving on the sample for the content to be compressed
+MIN_SAVING = 0.03
+
+
+# -----------------------------------------------------------------------------
+def hasIncompressibleExtension(path: str) -> bool:
+    """Tells whether the extension of a file is one of a compressed format.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        bool: True if the file is known to be incompressible.
+    """
+    return os.path.splitext(path)[1].lower() in INCOMPRESSIBLE_EXTENSIONS
+
+
+# -----------------------------------------------------------------------------
+def isIncompressible(data: bytes, nb_windows: int = 1) -> bool:
+    """Tells whether data would not shrink, from a fast trial compression.
+
+    Only ``SAMPLE_SIZE`` bytes are compressed, taken from evenly spaced
+    windows of the data.
+
+    Args:
+        data (bytes): The data, or its first bytes.
+        nb_windows (int): Number of windows the sample is taken from.
+            Defaults to 1, the start of the data.
+
+    Returns:
+        bool: True if the sample does not shrink by ``MIN_SAVING``.
+    """
+    if len(data) < MIN_SAMPLE_SIZE:
+        return False
+
+    window_size = SAMPLE_SIZE // nb_windows
+    step = max(window_size, (len(data) - window_size) // max(nb_windows - 1, 1))
+    sample = b"".join(
+        data[offset : offset + window_size] for offset in range(0, len(data), step)[:nb_windows]
+    )
+
+    return len(zlib.compress(sample, 1)) > len(sample) * (1 - MIN_SAVING)
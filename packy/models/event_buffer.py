@@ -0,0 +1,207 @@
+"""Coalesced delivery of the messages of the task runs.
+
+A run may pack hundreds of thousands of files, and a message per file sent
+as a queued signal costs an event, a log record and a view update in the
+GUI thread each, which then paces the packing. The workers rather append
+their messages to a buffer shared with the GUI, without taking any lock,
+and the GUI drains it about twenty times per second, handling the messages
+of each drain as a single batch.
+
+The messages about each item packed are details, which can be dropped or
+sampled so only one in so many is kept.
+
+Typical usage example:
+
+  EventBuffer.default().post(f'Packing "{arcname}"', EventLevel.DETAIL)
+
+  event_pump = EventPump(EventBuffer.default(), parent)
+  event_pump.events_drained.connect(showEvents)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import itertools
+import threading
+from collections import deque
+from enum import IntEnum
+from typing import final
+
+# PyQt
+from PySide6.QtCore import QObject, QTimer, Signal
+
+# Interval in milliseconds between two drains of the buffer
+DRAIN_INTERVAL = 50
+
+# Maximum number of messages handled by the GUI at each drain
+MAX_DRAINED_EVENTS = 5000
+
+
+###############################################################################
+class EventLevel(IntEnum):
+    """Level of the messages of the runs.
+
+    Attributes:
+        DETAIL (int): A message about a single item, like a file packed.
+        INFO (int): A message about the run.
+    """
+
+    DETAIL = 1
+    INFO = 2
+
+
+###############################################################################
+@final
+class EventBuffer:
+    """Buffer of messages written by the workers and read by the GUI.
+
+    The appends and pops of a ``deque`` are atomic, so the workers posting
+    messages never wait for each other nor for the GUI.
+
+    Attributes:
+        __default (EventBuffer | None): The buffer of the application,
+            created when first used.
+        __default_lock (threading.Lock): Guards the creation of the default
+            buffer.
+        __events (deque[tuple[EventLevel, str]]): The messages posted and
+            not drained yet, from the oldest to the newest.
+        __detail_sampling (int): One detail message out of this number is
+            kept, none if 0.
+        __detail_count (itertools.count[int]): Counts the detail messages
+            posted.
+    """
+
+    __default: EventBuffer | None = None
+    __default_lock: threading.Lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def default(cls) -> EventBuffer:
+        """Returns the buffer of the application."""
+        with cls.__default_lock:
+            if cls.__default is None:
+                cls.__default = EventBuffer()
+            return cls.__default
+
+    # -------------------------------------------------------------------------
+    def __init__(self, detail_sampling: int = 1) -> None:
+        """Initializes an empty buffer.
+
+        Args:
+            detail_sampling (int): One detail message out of this number is
+                kept, none if 0. Defaults to 1, every message being kept.
+        """
+        self.__events: deque[tuple[EventLevel, str]] = deque()
+        self.__detail_sampling: int = detail_sampling
+        self.__detail_count: itertools.count[int] = itertools.count()
+
+    # -------------------------------------------------------------------------
+    @property
+    def detail_sampling(self) -> int:
+        """One detail message out of this number is kept, none if 0."""
+        return self.__detail_sampling
+
+    # -------------------------------------------------------------------------
+    def setDetailSampling(self, detail_sampling: int) -> None:
+        """Changes the share of the detail messages kept.
+
+        Args:
+            detail_sampling (int): One detail message out of this number is
+                kept, none if 0.
+        """
+        self.__detail_sampling = detail_sampling
+
+    # -------------------------------------------------------------------------
+    def post(self, message: str, level: EventLevel = EventLevel.INFO) -> None:
+        """Posts a message, unless it is a detail left out by the sampling.
+
+        It can be called from any thread.
+
+        Args:
+            message (str): The message.
+            level (EventLevel): The level of the message. Defaults to
+                ``EventLevel.INFO``.
+        """
+        if level == EventLevel.DETAIL:
+            detail_sampling = self.__detail_sampling
+            if detail_sampling <= 0:
+                return
+            if detail_sampling > 1 and next(self.__detail_count) % detail_sampling != 0:
+                return
+
+        self.__events.append((level, message))
+
+    # -------------------------------------------------------------------------
+    def drain(self, max_events: int | None = None) -> list[tuple[EventLevel, str]]:
+        """Removes the oldest messages posted.
+
+        Args:
+            max_events (int | None): The maximum number of messages removed,
+                all of them if None. Defaults to None.
+
+        Returns:
+            list[tuple[EventLevel, str]]: The levels and messages removed,
+            from the oldest to the newest.
+        """
+        events = self.__events
+        drained = []
+        for _ in range(len(events) if max_events is None else min(max_events, len(events))):
+            drained.append(events.popleft())
+
+        return drained
+
+
+###############################################################################
+@final
+class EventPump(QObject):
+    """Drains an event buffer at a steady pace in the thread of the pump.
+
+    Attributes:
+        events_drained (Signal): Emitted with the list of the levels and
+            messages of each drain not empty, from the oldest to the newest.
+        __event_buffer (EventBuffer): The buffer drained.
+        __timer (QTimer): Drains the buffer.
+    """
+
+    events_drained = Signal(list)
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        event_buffer: EventBuffer,
+        parent: QObject | None = None,
+        interval: int = DRAIN_INTERVAL,
+    ) -> None:
+        """Initializes the pump and starts draining.
+
+        Args:
+            event_buffer (EventBuffer): The buffer to drain.
+            parent (QObject | None): The parent object. Defaults to None.
+            interval (int): Interval in milliseconds between two drains.
+                Defaults to ``DRAIN_INTERVAL``.
+        """
+        super().__init__(parent)
+        self.__event_buffer: EventBuffer = event_buffer
+
+        self.__timer: QTimer = QTimer(self)
+        self.__timer.setInterval(interval)
+        self.__timer.timeout.connect(self.__drain)
+        self.__timer.start()
+
+    # -------------------------------------------------------------------------
+    def flush(self) -> None:
+        """Drains every message posted so far, at once."""
+        events = self.__event_buffer.drain()
+        if events:
+            self.events_drained.emit(events)
+
+    # -------------------------------------------------------------------------
+    def __drain(self) -> None:
+        # The messages beyond the maximum wait for the next drain, so the
+        # GUI stays responsive during a burst
+        events = self.__event_buffer.drain(MAX_DRAINED_EVENTS)
+        if events:
+            self.events_drained.emit(events)
@@ -2,8 +2,8 @@
 
 This model extends ``QFileSystemModel`` to add support for check states
 on files and directories, allowing users to select items within a
-directory tree. It also tracks differences between the current file
-system and the stored selection through a warnings system.
+directory tree. The selection itself and its warnings are held by a
+Qt-free ``TaskSelection``, so the model is only created to show it.
 
 Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
 All rights reserved.
@@ -12,7 +12,7 @@ See LICENCE.md file for more information.
 """
 
 # Local application
-from packy.models.warnings import Warnings
+from packy.models.task_selection import TaskSelection
 
 # Third-party
 from PySide6 import QtCore
@@ -21,28 +21,12 @@ from PySide6.QtWidgets import QFileSystemModel
 from __feature__ import snake_case, true_property
 
 # Standard library
-import os
-from enum import Enum
-from pathlib import Path
-from typing import Any, override
+from typing import TYPE_CHECKING, Any, override
 
-
-###############################################################################
-class FilesModelSerialKeys(Enum):
-    """Enumeration of keys used for FilesModel serialization.
-
-    These keys are used when converting a FilesModel instance to and from
-    a dictionary (e.g., for JSON serialization).
-
-    Attributes:
-        ROOT_PATH (str):
-            Key representing the root directory path of the model.
-        CHECK (str):
-            Key representing the mapping of file paths to their check states.
-    """
-
-    ROOT_PATH = "root_path"
-    CHECK = "check"
+if TYPE_CHECKING:
+    # Local application
+    from packy.models.selection_tree import SelectionTree
+    from packy.models.warnings import Warnings
 
 
 ###############################################################################
@@ -54,17 +38,20 @@ class FilesModel(QFileSystemModel):
     tree and keeps track of changes between the current file system and the
     stored selection using a warnings mechanism.
 
-    The model maintains an internal mapping of file paths to their check
-    states. Items not explicitly stored in this mapping are considered
-    unchecked by default.
+    The check states are kept in a sparse ``SelectionTree``: a checked
+    directory stands for everything below it, except the items explicitly
+    unchecked. The state of an item is resolved through its nearest marked
+    ancestor, and items without one are considered unchecked by default.
 
-    It also provides utilities to detect added or removed files relative
-    to the stored selection and to update the model accordingly.
+    The model shows a ``TaskSelection``, which outlives it: a task only
+    creates its model when it is shown.
 
     Attributes:
-        __check_state_items (dict[str, int]):
-            a dict with the check state for files and directories. If an item is not in the dict,
-            its value is Qt.CheckState.Unchecked.value by default.
+        __task_selection (TaskSelection):
+            the selection shown.
+        __selection (SelectionTree):
+            the explicit check states of files and directories. An item inherits the state of
+            its nearest marked ancestor, Qt.CheckState.Unchecked.value if there is none.
         __warnings (Warnings):
             an object which contains the modifications (added/removed items) between the model
             and the current selection.
@@ -73,34 +60,34 @@ class FilesModel(QFileSystemModel):
     # -------------------------------------------------------------------------
     def __init__(
         self,
-        json_dict: dict[str, Any] | None = None,
+        selection: TaskSelection | dict[str, Any] | None = None,
         parent: QObject | None = None,
     ) -> None:
         """Initializes the file system model.
 
         Args:
-            json_dict (dict, optional):
-                Serialized representation of the model used to restore its state.
-                Defaults to None.
+            selection (TaskSelection | dict, optional):
+                The selection to show, or the serialized representation of a new one.
+                Defaults to None, for a new empty selection.
             parent (QObject, optional):
                 Parent object passed to the underlying Qt model.
         """
         super().__init__(parent)
-        self.__check_state_items: dict[str, int] = {}
-        self.__warnings: Warnings = Warnings()
+        if not isinstance(selection, TaskSelection):
+            selection = TaskSelection(selection)
+
+        # The selection and its warnings are changed in place, so the
+        # references stay valid when the root folder changes
+        self.__task_selection: TaskSelection = selection
+        self.__selection: SelectionTree = selection.selection
+        self.__warnings: Warnings = selection.warnings
 
-        if json_dict is not None:
-            self.__json_init(json_dict)
+        if selection.rootPath():
+            super().set_root_path(selection.rootPath())
 
         self.__init_filter()
         self.rowsInserted.connect(self.__check_if_added_items)
 
-    # -------------------------------------------------------------------------
-    def __json_init(self, json_dict: dict[str, Any]) -> None:
-        self.set_root_path(json_dict[FilesModelSerialKeys.ROOT_PATH.value])
-        self.__check_state_items = json_dict[FilesModelSerialKeys.CHECK.value]
-        self.checkIntegrity()
-
     # -------------------------------------------------------------------------
     def __init_filter(self) -> None:
         file_filter = self.filter()
@@ -109,32 +96,31 @@ class FilesModel(QFileSystemModel):
     # -------------------------------------------------------------------------
     def __repr__(self) -> str:
         """Returns a string representation of the model."""
-        return f"files_model: root_path = {self.root_path()}, check = {{{self.__checks_to_str()}}}"
-
-    # -------------------------------------------------------------------------
-    def __checks_to_str(self) -> dict[str, int]:
-        return {str(key): value for key, value in self.__check_state_items.items()}
+        return f"files_model: root_path = {self.root_path()}, check = {{{self.checks}}}"
 
     # -------------------------------------------------------------------------
     def __eq__(self, other: object) -> bool:
         """Checks if two FilesModel instances are equal."""
         if not isinstance(other, FilesModel):
             return NotImplemented
-        return (
-            self.root_path() == other.root_path()
-            and self.__check_state_items == other.__check_state_items
-        )
+        return self.__task_selection == other.__task_selection
 
     # -------------------------------------------------------------------------
     def __hash__(self) -> int:
         """Returns the hash of the model."""
-        return hash((self.root_path(), tuple(sorted(self.__check_state_items.items()))))
+        return hash((self.root_path(), tuple(sorted(self.__selection.checks().items()))))
+
+    # -------------------------------------------------------------------------
+    @property
+    def task_selection(self) -> TaskSelection:
+        """Returns the selection shown."""
+        return self.__task_selection
 
     # -------------------------------------------------------------------------
     @property
     def checks(self) -> dict[str, int]:
-        """Returns the dictionary of check states."""
-        return self.__check_state_items
+        """Returns the dictionary of explicit check states."""
+        return self.__selection.checks()
 
     # -------------------------------------------------------------------------
     @property
@@ -168,11 +154,18 @@ class FilesModel(QFileSystemModel):
         match role:
             case Qt.ItemDataRole.CheckStateRole:
                 if index.column() == 0:
-                    self.__check_state_items[self.file_path(index)] = value
+                    file_path = self.file_path(index)
+                    changed_paths = self.__selection.set_state(file_path, value)
                     self.dataChanged.emit(index, index)
 
-                    self.__update_child_files(index, value, role)
-                    self.__update_parent_files(index, value)
+                    for path in changed_paths:
+                        changed_index = self.index(path)
+                        if changed_index.is_valid() and changed_index != index:
+                            self.dataChanged.emit(changed_index, changed_index)
+
+                    # The loaded children read their state from this item
+                    for dir_path in self.__selection.listed_directories(file_path):
+                        self.__emit_children_changed(self.index(dir_path))
 
                     return True
 
@@ -184,50 +177,14 @@ class FilesModel(QFileSystemModel):
                 return super().set_data(index, value, role)
 
     # -------------------------------------------------------------------------
-    def __update_child_files(
-        self,
-        index: QModelIndex | QPersistentModelIndex,
-        value: int,
-        role: Qt.ItemDataRole,
-    ) -> None:
-        if value != Qt.CheckState.PartiallyChecked.value:
-            for i in range(self.row_count(index)):
-                child_index = self.index(i, 0, index)
-                self.set_data(child_index, value, role)
-
-    # -------------------------------------------------------------------------
-    def __update_parent_files(self, index: QModelIndex | QPersistentModelIndex, value: int) -> None:
-        match value:
-            case Qt.CheckState.Checked.value:
-                self.__propagate_check_to_parents(index)
-            case Qt.CheckState.Unchecked.value:
-                self.__propagate_uncheck_to_parents(index)
-            case _:
-                QtCore.qDebug(
-                    f"The Qt.CheckState value {value} should not appear in this function.",
-                )
-
-    # -------------------------------------------------------------------------
-    def __propagate_check_to_parents(self, index: QModelIndex | QPersistentModelIndex) -> None:
-        index_parent = index.parent()
-
-        if index_parent == QModelIndex():
-            return
-        if self.file_path(index_parent) == self.root_path():
-            return
-
-        all_siblings_checked = True
-        for i in range(self.row_count(index_parent)):
-            index_sibling = self.index(i, 0, index_parent)
-            if self.__check_state(index_sibling) != Qt.CheckState.Checked.value:
-                all_siblings_checked = False
-
-        if all_siblings_checked:
-            self.__update_check_state(index_parent, Qt.CheckState.Checked)
-            self.__propagate_check_to_parents(index_parent)
-        elif self.__check_state(index_parent) == Qt.CheckState.Unchecked.value:
-            self.__update_check_state(index_parent, Qt.CheckState.PartiallyChecked)
-            self.__propagate_check_to_parents(index_parent)
+    def __emit_children_changed(self, index: QModelIndex) -> None:
+        nb_rows = self.row_count(index) if index.is_valid() else 0
+        if nb_rows:
+            self.dataChanged.emit(
+                self.index(0, 0, index),
+                self.index(nb_rows - 1, 0, index),
+                [Qt.ItemDataRole.CheckStateRole],
+            )
 
     # -------------------------------------------------------------------------
     def __check_state(self, item: QModelIndex | QPersistentModelIndex | str) -> int:
@@ -241,36 +198,7 @@ class FilesModel(QFileSystemModel):
 
     # -------------------------------------------------------------------------
     def __check_state_path(self, item_path: str) -> int:
-        if item_path in self.__check_state_items:
-            return self.__check_state_items[item_path]
-        return Qt.CheckState.Unchecked.value
-
-    # -------------------------------------------------------------------------
-    def __update_check_state(self, index: QModelIndex, check_state: Qt.CheckState) -> None:
-        self.__check_state_items[self.file_path(index)] = check_state.value
-        self.dataChanged.emit(index, index)
-
-    # -------------------------------------------------------------------------
-    def __propagate_uncheck_to_parents(self, index: QModelIndex | QPersistentModelIndex) -> None:
-        index_parent = index.parent()
-
-        if self.__check_state(index_parent) == Qt.CheckState.Unchecked.value:
-            return
-
-        at_least_one_selected_child: bool = False
-
-        for i in range(self.row_count(index_parent)):
-            index_child = self.index(i, 0, index_parent)
-            if self.__check_state(index_child) != Qt.CheckState.Unchecked.value:
-                at_least_one_selected_child = True
-                break
-
-        new_check_state = Qt.CheckState.Unchecked
-        if at_least_one_selected_child:
-            new_check_state = Qt.CheckState.PartiallyChecked
-
-        self.__update_check_state(index_parent, new_check_state)
-        self.__propagate_uncheck_to_parents(index_parent)
+        return self.__selection.state(item_path).value
 
     # -------------------------------------------------------------------------
     @override
@@ -280,73 +208,31 @@ class FilesModel(QFileSystemModel):
     # -------------------------------------------------------------------------
     @override
     def set_root_path(self, path: str) -> QModelIndex:
-        self.__check_state_items.clear()
-        self.__warnings.clear()
+        self.__task_selection.setRootPath(path)
 
         return super().set_root_path(path)
 
     # -------------------------------------------------------------------------
     def serialize(self) -> dict[str, Any]:
         """Serialize the current instance into a JSON-compatible dictionary."""
-        data_dict: dict[str, Any] = {}
-
-        data_dict[FilesModelSerialKeys.ROOT_PATH.value] = self.root_path()
-        data_dict[FilesModelSerialKeys.CHECK.value] = self.__checks_to_str()
-
-        return data_dict
+        return self.__task_selection.serialize()
 
     # -------------------------------------------------------------------------
     def checkIntegrity(self) -> None:
         """Check if checked items still exist and update warnings accordingly."""
-        for item in self.__check_state_items:
-            if self.__isItemChecked(item):
-                # Removed item?
-                if not self.__doesExists(item):
-                    self.__warnings.addRemovedItem(item)
-                # Added item?
-                elif Path(item).is_dir():
-                    self.listNewItems(item)
-                elif self.__warnings.isInAddedCandidateItems(item):
-                    self.__warnings.addAddedItem(item)
-
-    # -------------------------------------------------------------------------
-    def __isItemChecked(self, item: QModelIndex | str) -> bool:
-        return self.__check_state(item) == Qt.CheckState.Checked.value
-
-    # -------------------------------------------------------------------------
-    def __doesExists(self, item_path: str) -> bool:
-        return Path(item_path).exists()
-
-    # -------------------------------------------------------------------------
-    def listNewItems(self, dir_path: str) -> None:
-        """Scan the root directory to add new files to the model.
-
-        Identify untracked items and add them to warnings.
-        """
-        for root, _, files in os.walk(dir_path):
-            for name in files:
-                item = Path(root) / name
-                if str(item) not in self.__check_state_items:
-                    self.__warnings.addAddedItem(str(item))
+        self.__task_selection.checkIntegrity()
 
     # -------------------------------------------------------------------------
     def updateModel(self) -> None:
         """Update the internal state based on current warnings."""
-        removed_items = self.__warnings.removedItems()
-        for item in removed_items:
-            del self.__check_state_items[item]
-
-        added_items = self.__warnings.addedItems()
-        for item in added_items:
-            self.__check_state_items[item] = Qt.CheckState.Checked.value
-
-        self.__warnings.clear()
+        self.__task_selection.updateModel()
 
     # -------------------------------------------------------------------------
     @Slot(QModelIndex, int, int, result=None)
     def __check_if_added_items(self, parent: QModelIndex, first: int, last: int) -> None:
         for i in range(first, last + 1):
             child = self.index(i, 0, parent)
+            self.__selection.register(self.file_path(child))
             if self.__isItemUnchecked(child):
                 self.__warnings.addCandidateAddedItem(self.file_path(child))
 
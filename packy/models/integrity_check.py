@@ -0,0 +1,108 @@
+"""Integrity check of a selection run in a worker thread.
+
+This module runs an ``IntegrityScanner`` on a ``QThreadPool`` and streams
+the changes it finds to the GUI thread through Qt signals. The batches of the
+scanner are merged and emitted at most every ``EMIT_INTERVAL`` seconds, so a
+large tree does not flood the event loop.
+
+Typical usage example:
+
+  integrity_check = IntegrityCheck(task_selection.startIntegrityCheck())
+  integrity_check.signals.items_found.connect(dialog.addItems)
+  QThreadPool.globalInstance().start(integrity_check)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import time
+from typing import TYPE_CHECKING, final, override
+
+# PyQt
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+if TYPE_CHECKING:
+    # PackY
+    from packy.models.integrity_scanner import IntegrityScanner
+
+# Minimum delay in seconds between two emissions of found items
+EMIT_INTERVAL = 0.1
+
+
+###############################################################################
+@final
+class IntegrityCheckSignals(QObject):
+    """Signals emitted by an integrity check.
+
+    Attributes:
+        items_found (Signal): Emitted with the lists of added and removed
+            items found since the last emission.
+        progress_changed (Signal): Emitted with the number of directories
+            listed and the number of directories found so far.
+        finished (Signal): Emitted once the check stops, with True if it
+            was cancelled.
+    """
+
+    items_found = Signal(list, list)
+    progress_changed = Signal(int, int)
+    finished = Signal(bool)
+
+
+###############################################################################
+@final
+class IntegrityCheck(QRunnable):
+    """Runs an integrity scanner in a worker thread.
+
+    Attributes:
+        signals (IntegrityCheckSignals): The signals of the check, created in
+            the thread building the check.
+        __scanner (IntegrityScanner): The scanner to run.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, scanner: IntegrityScanner) -> None:
+        """Initializes the check.
+
+        Args:
+            scanner (IntegrityScanner): The scanner to run.
+        """
+        super().__init__()
+        self.signals: IntegrityCheckSignals = IntegrityCheckSignals()
+        self.__scanner: IntegrityScanner = scanner
+
+    # -------------------------------------------------------------------------
+    def cancel(self) -> None:
+        """Stops the check. It can be called from any thread."""
+        self.__scanner.cancel()
+
+    # -------------------------------------------------------------------------
+    @override
+    def run(self) -> None:
+        added_items: list[str] = []
+        removed_items: list[str] = []
+        last_emit_time = time.monotonic()
+
+        try:
+            for batch in self.__scanner.batches():
+                added_items.extend(batch.added_items)
+                removed_items.extend(batch.removed_items)
+
+                if time.monotonic() - last_emit_time >= EMIT_INTERVAL:
+                    self.__emitItems(added_items, removed_items)
+                    added_items, removed_items = [], []
+                    last_emit_time = time.monotonic()
+        finally:
+            self.__emitItems(added_items, removed_items)
+            self.signals.finished.emit(self.__scanner.is_cancelled)
+
+    # -------------------------------------------------------------------------
+    def __emitItems(self, added_items: list[str], removed_items: list[str]) -> None:
+        if added_items or removed_items:
+            self.signals.items_found.emit(added_items, removed_items)
+
+        self.signals.progress_changed.emit(
+            self.__scanner.nb_scanned_dirs, self.__scanner.nb_found_dirs
+        )
@@ -0,0 +1,331 @@
+"""Comparison of a selection against the file system.
+
+This module finds the items added to or removed from the checked part of a
+selection since its content was listed. The checked roots are walked once,
+each directory being listed with ``os.scandir`` on a pool of worker threads,
+and the listing is compared to the known children of the directory with
+hashed sets. A directory selected as a whole, whose content was never
+listed, has nothing to compare and is not walked.
+
+With a ``ScanCache``, a directory whose modification time did not change
+since a previous scan is compared to its cached listing instead of being
+read again. Modification times do not propagate to the parent folders, so
+each directory is still checked with a ``stat``, which is cheap compared to
+a listing.
+
+The scan can also be restricted to some directories known to be the only
+ones changed, such as the ones reported by a ``ChangeWatcher``. The changes
+can be read in batches while the scan runs, and the scan can be cancelled
+from another thread.
+
+Typical usage example:
+
+  report = IntegrityScanner(selection).scan()
+  for item in report.added_items:
+      ...
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, final
+
+# PackY
+from packy.models.scan_cache import MTIME_RESOLUTION_NS, UNKNOWN_MTIME, DirListing
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Iterable, Iterator
+
+    # PackY
+    from packy.models.scan_cache import ScanCache
+    from packy.models.selection_tree import SelectionTree
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class IntegrityReport:
+    """The differences between a selection and the file system.
+
+    Attributes:
+        added_items (list[str]): Sorted paths of the files added in the
+            listed directories.
+        removed_items (list[str]): Sorted paths of the checked items which
+            no longer exist.
+    """
+
+    added_items: list[str]
+    removed_items: list[str]
+
+
+###############################################################################
+@final
+class IntegrityScanner:
+    """Walks the checked part of a selection once to find the changes.
+
+    The known content of the selection is copied when the scanner is
+    created, so the selection can change while the scan runs in another
+    thread.
+
+    Attributes:
+        __workers (int | None): Number of listing threads, None for the
+            default of ``ThreadPoolExecutor``.
+        __cache (ScanCache | None): The listings of the previous scans.
+        __roots (list[str]): The topmost checked items.
+        __dir_paths (list[str] | None): The only directories to compare,
+            None to walk the checked roots.
+        __listings (dict[str, frozenset[str]]): The names of the known
+            children of each listed directory, by path.
+        __cancel_event (threading.Event): Set when the scan is cancelled.
+        __nb_scanned_dirs (int): Number of directories listed so far.
+        __nb_found_dirs (int): Number of directories found so far.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        selection: SelectionTree,
+        workers: int = 0,
+        cache: ScanCache | None = None,
+        dir_paths: Iterable[str] | None = None,
+    ) -> None:
+        """Initializes the scanner.
+
+        Args:
+            selection (SelectionTree): The selection to compare.
+            workers (int): Number of listing threads. 0 uses the default of
+                ``ThreadPoolExecutor``, suited to I/O bound tasks. Defaults
+                to 0.
+            cache (ScanCache | None): The listings of the previous scans,
+                updated with the directories read. Defaults to None.
+            dir_paths (Iterable[str] | None): The only directories to compare,
+                their known subdirectories being left out, when they are
+                known to be the only ones changed. The new subdirectories
+                are walked. None walks the checked roots. Defaults to None.
+        """
+        self.__workers: int | None = workers if workers > 0 else None
+        self.__cache: ScanCache | None = cache
+        self.__roots: list[str] = list(selection.checked_roots())
+        self.__dir_paths: list[str] | None = None if dir_paths is None else list(dir_paths)
+        self.__listings: dict[str, frozenset[str]] = {}
+
+        self.__cancel_event: threading.Event = threading.Event()
+        self.__nb_scanned_dirs: int = 0
+        self.__nb_found_dirs: int = 0
+
+        for root in self.__roots:
+            for dir_path in selection.listed_directories(root):
+                self.__listings[dir_path] = selection.known_children(dir_path)
+
+    # -------------------------------------------------------------------------
+    @property
+    def nb_scanned_dirs(self) -> int:
+        """Number of directories listed so far."""
+        return self.__nb_scanned_dirs
+
+    # -------------------------------------------------------------------------
+    @property
+    def nb_found_dirs(self) -> int:
+        """Number of directories found so far, listed or waiting to be."""
+        return self.__nb_found_dirs
+
+    # -------------------------------------------------------------------------
+    @property
+    def is_cancelled(self) -> bool:
+        """Whether the scan was cancelled."""
+        return self.__cancel_event.is_set()
+
+    # -------------------------------------------------------------------------
+    def cancel(self) -> None:
+        """Stops the scan after the directories being listed.
+
+        It can be called from any thread.
+        """
+        self.__cancel_event.set()
+
+    # -------------------------------------------------------------------------
+    def scan(self) -> IntegrityReport:
+        """Walks the checked roots and compares them to the selection.
+
+        Returns:
+            IntegrityReport: The added and removed items.
+        """
+        added_items: list[str] = []
+        removed_items: list[str] = []
+
+        for batch in self.batches():
+            added_items.extend(batch.added_items)
+            removed_items.extend(batch.removed_items)
+
+        added_items.sort()
+        removed_items.sort()
+
+        return IntegrityReport(added_items, removed_items)
+
+    # -------------------------------------------------------------------------
+    def batches(self) -> Iterator[IntegrityReport]:
+        """Walks the checked roots, yielding the changes as they are found.
+
+        A batch is yielded each time listings complete, possibly empty, so
+        the progress can be followed. Closing the iterator or cancelling
+        the scan drops the directories not listed yet. The directories read
+        are stored in the cache once the walk stops.
+
+        Returns:
+            Iterator[IntegrityReport]: The changes found in each batch.
+        """
+        self.__nb_scanned_dirs = 0
+        self.__nb_found_dirs = 0
+
+        start_paths = self.__roots if self.__dir_paths is None else self.__dir_paths
+        cached_listings = self.__cache.load(start_paths) if self.__cache is not None else {}
+        # The listings read from the file system, and the directories gone
+        new_listings: dict[str, DirListing] = {}
+        removed_dirs: list[str] = []
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.__workers, thread_name_prefix="integrity_scan"
+        )
+        # The directories being listed, with their known children. A new
+        # directory has none, so all its files are added.
+        pending: dict[Future[DirListing | None], tuple[str, frozenset[str]]] = {}
+
+        def submit(dir_path: str, known_names: frozenset[str]) -> None:
+            future = executor.submit(self.__listDir, dir_path, cached_listings.get(dir_path))
+            pending[future] = (dir_path, known_names)
+            self.__nb_found_dirs += 1
+
+        try:
+            removed_items: list[str] = []
+            roots = set(self.__roots)
+            for path in start_paths:
+                if not os.path.exists(path):
+                    # Other items gone are reported by the listing of their parent
+                    if path in roots:
+                        removed_items.extend(self.__knownItems(path))
+                        removed_dirs.append(path)
+                elif path in self.__listings:
+                    submit(path, self.__listings[path])
+                elif self.__dir_paths is not None and self.__isNewDir(path, roots):
+                    submit(path, frozenset())
+
+            yield IntegrityReport([], sorted(removed_items))
+
+            while pending and not self.__cancel_event.is_set():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                added_items: list[str] = []
+                removed_items = []
+
+                for future in done:
+                    dir_path, known_names = pending.pop(future)
+                    listing = future.result()
+                    self.__nb_scanned_dirs += 1
+                    # An unreadable directory tells nothing about its content
+                    if listing is None:
+                        removed_dirs.append(dir_path)
+                        continue
+
+                    cached_listing = cached_listings.get(dir_path)
+                    if listing is not cached_listing:
+                        new_listings[dir_path] = listing
+                        if cached_listing is not None:
+                            removed_dirs.extend(
+                                self.__join(dir_path, name)
+                                for name in cached_listing.dir_names - listing.dir_names
+                            )
+
+                    added_items.extend(
+                        self.__join(dir_path, name) for name in listing.file_names - known_names
+                    )
+
+                    for name in known_names.difference(
+                        listing.dir_names, listing.file_names, listing.link_names
+                    ):
+                        removed_items.extend(self.__knownItems(self.__join(dir_path, name)))
+
+                    for name in listing.dir_names:
+                        child_path = self.__join(dir_path, name)
+                        if name not in known_names:
+                            submit(child_path, frozenset())
+                        elif child_path in self.__listings and self.__dir_paths is None:
+                            submit(child_path, self.__listings[child_path])
+
+                yield IntegrityReport(sorted(added_items), sorted(removed_items))
+        finally:
+            executor.shutdown(cancel_futures=True)
+            if self.__cache is not None and (new_listings or removed_dirs):
+                self.__cache.update(new_listings, removed_dirs)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __listDir(dir_path: str, cached_listing: DirListing | None) -> DirListing | None:
+        dir_names: set[str] = set()
+        file_names: set[str] = set()
+        link_names: set[str] = set()
+
+        try:
+            # The time is read before the content, so a change made while
+            # the directory is read is seen by the next scan
+            listing_time_ns = time.time_ns()
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+            if cached_listing is not None and cached_listing.mtime_ns == mtime_ns:
+                return cached_listing
+
+            with os.scandir(dir_path) as it:
+                for dir_entry in it:
+                    if not dir_entry.is_dir():
+                        file_names.add(dir_entry.name)
+                    elif dir_entry.is_symlink():
+                        link_names.add(dir_entry.name)
+                    else:
+                        dir_names.add(dir_entry.name)
+        except OSError:
+            return None
+
+        # A directory changed just before it was read may change again
+        # without its modification time changing
+        if listing_time_ns - mtime_ns < MTIME_RESOLUTION_NS:
+            mtime_ns = UNKNOWN_MTIME
+
+        return DirListing(
+            mtime_ns, frozenset(dir_names), frozenset(file_names), frozenset(link_names)
+        )
+
+    # -------------------------------------------------------------------------
+    def __isNewDir(self, path: str, roots: set[str]) -> bool:
+        # A directory unknown to the selection, below a checked root
+        parent_path, _, name = path.rpartition("/")
+        if name in self.__listings.get(parent_path, ()) or not os.path.isdir(path):
+            return False
+
+        while parent_path:
+            if parent_path in roots:
+                return True
+            parent_path = parent_path.rpartition("/")[0]
+
+        return False
+
+    # -------------------------------------------------------------------------
+    def __knownItems(self, path: str) -> Iterator[str]:
+        # The item and its known descendants
+        stack = [path]
+        while stack:
+            item_path = stack.pop()
+            yield item_path
+            stack.extend(
+                self.__join(item_path, name) for name in self.__listings.get(item_path, ())
+            )
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __join(dir_path: str, name: str) -> str:
+        # The selection stores paths with forward slashes, as Qt does
+        return dir_path + name if dir_path.endswith("/") else f"{dir_path}/{name}"
@@ -6,21 +6,71 @@ See LICENCE.md file for more information.
 """
 
 # Python
+import contextlib
+import dataclasses
 import os
-import re
 import shutil
+import tempfile
+from collections.abc import Collection, Iterable, Iterator
+from dataclasses import dataclass
 
 # PyQt
-from PySide6.QtCore import Qt, QRunnable, QStandardPaths
+from PySide6.QtCore import QRunnable
 
 # PackY
-from packy.core.settings import PreferencesGeneral, PreferencesKeys, PreferencesTask
-from packy.models.tasks_model import TasksModel, TaskStatus
-# from packy.models.packer_signals import PackerSignals
+from packy.models.cancellation import CancellationToken, RunCancelledError
+from packy.models.event_buffer import EventBuffer, EventLevel
+from packy.models.packer_signals import PackerSignals
+from packy.models.retention import SnapshotPruner, pruneList
+from packy.models.run_plan import RunPlan
+from packy.models.snapshot_catalog import SnapshotCatalog
+from packy.models.snapshot_manifest import TOMBSTONE_ARCNAME, SnapshotManifest
+from packy.models.tasks_model import TaskStatus
+from packy.models.throughput import ByteCounter
 
 # Python debug
 # import debugpy
 
+# The snapshots are written under this suffix, and renamed once complete
+PARTIAL_SUFFIX = ".partial"
+
+
+###############################################################################
+class PackerError(Exception):
+    """The selection cannot be packed with the task settings."""
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class PackEntry:
+    """An item read from the source tree and written into the archive.
+
+    Attributes:
+        path (str): Absolute path of the item in the source tree.
+        arcname (str): Name of the item in the archive, relative to the
+            source root folder.
+        is_dir (bool): True if the item is a directory.
+    """
+
+    path: str
+    arcname: str
+    is_dir: bool
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class ReferenceSnapshot:
+    """A previous full snapshot whose members can be copied as they are.
+
+    Attributes:
+        path (str): Path of the snapshot.
+        unchanged (frozenset[str]): Archive names, with forward slashes, of
+            the files unchanged since the snapshot was packed.
+    """
+
+    path: str
+    unchanged: frozenset[str]
+
 
 ###############################################################################
 class Packer(QRunnable):
@@ -33,7 +83,15 @@ class Packer(QRunnable):
     ###########################################################################
     # PRIVATE MEMBER VARIABLES
     #
-    # __task:
+    # __plan: the run plan, the only input of the packer. It is built in the
+    #         GUI thread, so the worker never reads the task nor the settings.
+    # __cancel_token: set from the GUI thread to stop the run.
+    # __partial_file: the file written by this run, renamed to the
+    #                 destination once complete and removed if the run fails,
+    #                 so the previous snapshot is never lost.
+    # __byte_counter: counts the bytes read from the source tree, reported
+    #                 with the bytes_progress signal.
+    # __event_buffer: receives the messages of the run, drained by the GUI.
     ###########################################################################
 
     ###########################################################################
@@ -41,156 +99,440 @@ class Packer(QRunnable):
     ###########################################################################
 
     # -------------------------------------------------------------------------
-    def __init__(self, task: TasksModel):
+    def __init__(
+        self,
+        plan: RunPlan,
+        cancel_token: CancellationToken | None = None,
+        event_buffer: EventBuffer | None = None,
+    ):
         super(Packer, self).__init__()
 
-        # self.signals = PackerSignals()
-        self.__task = task
+        self.signals = PackerSignals()
+        self.__plan = plan
+        self.__cancel_token = cancel_token if cancel_token is not None else CancellationToken()
+        self.__partial_file = None
+        self.__byte_counter = ByteCounter(self.__reportBytes)
+        self.__event_buffer = event_buffer if event_buffer is not None else EventBuffer.default()
 
     ###########################################################################
     # PUBLIC MEMBER FUNCTIONS
     ###########################################################################
 
+    # -------------------------------------------------------------------------
+    def cancelToken(self) -> CancellationToken:
+        # Checked by every stage of the run, down to the chunks read and written
+        return self.__cancel_token
+
+    # -------------------------------------------------------------------------
+    def byteCounter(self) -> ByteCounter:
+        # Counts the bytes packed, whichever thread reads them
+        return self.__byte_counter
+
+    # -------------------------------------------------------------------------
+    def postEvent(self, message: str, level: EventLevel = EventLevel.INFO) -> None:
+        # The messages are not signals, so the GUI handles them in batches
+        self.__event_buffer.post(message, level)
+
     # -------------------------------------------------------------------------
     def run(self):
         try:
             # debugpy.debug_this_thread()
             self.__sendStartLog()
-            tmp_folder_path = self.__tmpFolderPath()
-
-            items_to_pack = self.__filterSelectedFiles()
-            self.signals.progress.emit(25)
-
-            self.__copyItemsToTmpFolder(items_to_pack, tmp_folder_path)
-            self.signals.progress.emit(50)
 
-            self.packTmpFolder(self.__task, tmp_folder_path)
-            self.signals.progress.emit(75)
+            # The suffix of the destination depends on the snapshots already
+            # written, so it was computed with the plan, before the new one exists.
+            destination_file = self.__plan.destination_file
+            entries = list(
+                self.__listEntries(self.__plan.selected_items, self.__plan.excluded_items)
+            )
+            self.__cancel_token.raiseIfCancelled()
+            manifest = SnapshotManifest.scan(entries, self.__configFingerprint())
+
+            previous_file = self.__previousSnapshot()
+            previous_manifest = None
+            if previous_file is not None:
+                previous_manifest = SnapshotManifest.load(SnapshotManifest.pathFor(previous_file))
+
+            if previous_manifest is not None and previous_manifest == manifest:
+                self.__reuseSnapshot(previous_file, destination_file)
+                manifest = manifest.derive(previous_manifest.base, previous_manifest.index)
+            else:
+                manifest = self.__packSnapshot(
+                    entries, manifest, previous_file, previous_manifest, destination_file
+                )
+
+            # The snapshot is complete once its manifest is saved, a cancel
+            # coming after the destination was replaced is too late
+            manifest.save(SnapshotManifest.pathFor(destination_file))
+            SnapshotCatalog.default().add(destination_file)
 
             self.__applySnapshotRetention()
-            self.__task.updateStatus(TaskStatus.SUCCESS)
-        except OSError as ex:
-            self.__task.updateStatus(TaskStatus.ERROR)
+            self.signals.status_changed.emit(self.__plan.task_id, TaskStatus.SUCCESS)
+        except RunCancelledError:
+            self.signals.status_changed.emit(self.__plan.task_id, TaskStatus.CANCELLED)
+            info_msg = f"Task {self.__plan.raw_dest_file} cancelled"
+            self.postEvent(info_msg)
+        except (OSError, PackerError) as ex:
+            self.signals.status_changed.emit(self.__plan.task_id, TaskStatus.ERROR)
             error_msg = type(ex).__name__ + ": " + str(ex)
             self.signals.error.emit(error_msg)
         finally:
-            self.__cleanTmpFolder(tmp_folder_path)
-            self.signals.progress.emit(100)
+            self.__removePartialOutput()
+            self.__byte_counter.finish()
             self.signals.finish.emit()
 
+    # -------------------------------------------------------------------------
+    def supportsIncremental(self) -> bool:
+        return True
+
     ###########################################################################
     # PRIVATE MEMBER FUNCTIONS
     ###########################################################################
 
+    # -------------------------------------------------------------------------
+    def __reportBytes(self, done: int, total: int) -> None:
+        self.signals.bytes_progress.emit(self.__plan.task_id, done, total)
+
+    # -------------------------------------------------------------------------
+    def __inputBytes(self, entries: Iterable[PackEntry], manifest: SnapshotManifest) -> int:
+        # The sizes were read by the scan, the files are not stat'ed again
+        total = 0
+        for entry in entries:
+            if not entry.is_dir:
+                record = manifest.records.get(SnapshotManifest.arcnameKey(entry.arcname))
+                total += record.size if record is not None else os.path.getsize(entry.path)
+
+        return total
+
+    # -------------------------------------------------------------------------
+    def __packTo(
+        self,
+        destination_file: str,
+        entries: list[PackEntry],
+        reference: ReferenceSnapshot | None = None,
+    ) -> None:
+        # The destination is only replaced once the new snapshot is complete,
+        # so a failed run leaves the previous one in place, even when it is
+        # rewritten under the same name.
+        partial_file = self.__startPartialOutput(destination_file)
+        self.packEntries(
+            dataclasses.replace(self.__plan, destination_file=partial_file), entries, reference
+        )
+        self.__cancel_token.raiseIfCancelled()
+        self.__commitPartialOutput(destination_file)
+
+    # -------------------------------------------------------------------------
+    def __startPartialOutput(self, destination_file: str) -> str:
+        # A file left by a run which crashed may be a hard link to an older
+        # snapshot, so it is removed rather than truncated
+        partial_file = destination_file + PARTIAL_SUFFIX
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(partial_file)
+        self.__partial_file = partial_file
+        return partial_file
+
+    # -------------------------------------------------------------------------
+    def __commitPartialOutput(self, destination_file: str) -> None:
+        # The manifest of the replaced snapshot must not describe the new one,
+        # and the destination is replaced in a single step, so there is always
+        # a snapshot under its name.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(SnapshotManifest.pathFor(destination_file))
+        os.replace(self.__partial_file, destination_file)
+        self.__partial_file = None
+
+    # -------------------------------------------------------------------------
+    def __removePartialOutput(self) -> None:
+        if self.__partial_file is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.__partial_file)
+            self.__partial_file = None
+
     # -------------------------------------------------------------------------
     def __sendStartLog(self) -> None:
-        info_msg = f"<b>Run task {self.__task.rawDestFile()}</b>"
-        self.signals.info.emit(info_msg)
+        info_msg = f"<b>Run task {self.__plan.raw_dest_file}</b>"
+        self.postEvent(info_msg)
 
         # -------------------------------------------------------------------------
 
-    def __tmpFolderPath(self) -> str:
-        destination_file = self.__task.destFile()
-        basename = os.path.basename(destination_file)
-        basename_no_ext = os.path.splitext(basename)[0]
+    def __listEntries(
+        self, items: Iterable[str], excluded_items: Collection[str] = ()
+    ) -> Iterator[PackEntry]:
+        # The selection is sparse: the items unchecked inside a checked
+        # directory are the only ones listed below it.
+        root_path = self.__plan.root_path
+        excluded_items = {self.__slashPath(item) for item in excluded_items}
 
-        tmp_location = QStandardPaths.StandardLocation.TempLocation
-        tmp_path = QStandardPaths.writableLocation(tmp_location)
-        packy_tmp_path = os.path.join(tmp_path, "packy_tmp")
-        tmp_task_path = os.path.join(packy_tmp_path, basename_no_ext)
+        for item in self.__topLevelItems(items, excluded_items):
+            arcname = os.path.relpath(item, root_path)
 
-        return tmp_task_path
+            if os.path.isdir(item):
+                yield PackEntry(item, arcname, True)
+                yield from self.__walkDir(item, arcname, excluded_items)
+            else:
+                yield PackEntry(item, arcname, False)
 
         # -------------------------------------------------------------------------
 
-    def __filterSelectedFiles(self):
-        checked_items = self.__task.filesSelected().checks()
-        items_to_pack = [k for k, v in checked_items.items() if v == Qt.CheckState.Checked.value]
+    def __configFingerprint(self) -> str:
+        compression = self.__plan.compression
+        return ":".join(
+            [
+                compression.format.label,
+                compression.compression.label,
+                compression.compression_level.label,
+                repr(compression.options),
+            ]
+        )
 
-        return items_to_pack
+        # -------------------------------------------------------------------------
+
+    def __reuseSnapshot(self, previous_file: str, destination_file: str) -> None:
+        previous_name = os.path.basename(previous_file)
+
+        if os.path.abspath(previous_file) == os.path.abspath(destination_file):
+            info_msg = f"Nothing changed since {previous_name}, packing skipped"
+        else:
+            partial_file = self.__startPartialOutput(destination_file)
+            try:
+                os.link(previous_file, partial_file)
+            except OSError:
+                # The file system does not support hard links
+                shutil.copyfile(previous_file, partial_file)
+            self.__commitPartialOutput(destination_file)
+            destination_name = os.path.basename(destination_file)
+            info_msg = f"Nothing changed since {previous_name}, linked as {destination_name}"
+
+        self.postEvent(info_msg)
 
         # -------------------------------------------------------------------------
 
-    def __copyItemsToTmpFolder(self, items: set, tmp_folder_path: str):
+    def __packSnapshot(
+        self,
+        entries: list[PackEntry],
+        manifest: SnapshotManifest,
+        previous_file: str | None,
+        previous_manifest: SnapshotManifest | None,
+        destination_file: str,
+    ) -> SnapshotManifest:
+        base = self.__incrementalBase(previous_file, previous_manifest, destination_file)
+        if base is None:
+            self.__packFullSnapshot(
+                entries, manifest, previous_file, previous_manifest, destination_file
+            )
+            return manifest
+
+        base_file, base_manifest, index = base
+        changed, deleted = manifest.diff(base_manifest)
+        changed_entries = [
+            entry for entry in entries if SnapshotManifest.arcnameKey(entry.arcname) in changed
+        ]
+
+        info_msg = (
+            f"Incremental snapshot over {os.path.basename(base_file)}: "
+            f"{len(changed_entries)} items changed, {len(deleted)} deleted"
+        )
+        self.postEvent(info_msg)
+
+        fd, tombstone_path = tempfile.mkstemp(prefix="packy_", suffix=".deleted")
         try:
-            root_path = self.__task.filesSelected().rootPath()
-            os.makedirs(tmp_folder_path)
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as tombstone_file:
+                tombstone_file.writelines(arcname + "\n" for arcname in deleted)
 
-            for item in items:
-                tmp_item_path = item.replace(root_path, tmp_folder_path)
+            packed_entries = [*changed_entries, PackEntry(tombstone_path, TOMBSTONE_ARCNAME, False)]
+            self.__byte_counter.setTotal(self.__inputBytes(packed_entries, manifest))
+            self.__packTo(destination_file, packed_entries)
+        finally:
+            os.remove(tombstone_path)
 
-                if os.path.isfile(item):
-                    parent_folders = os.path.dirname(tmp_item_path)
-                    if not os.path.exists(parent_folders):
-                        os.makedirs(parent_folders)
-                    shutil.copy2(item, tmp_item_path)
-                else:
-                    shutil.copytree(item, tmp_item_path, dirs_exist_ok=True)
+        return manifest.derive(os.path.basename(base_file), index)
 
-                info_msg = f'Copy "{item}" to "{tmp_folder_path}"'
-                self.signals.info.emit(info_msg)
+        # -------------------------------------------------------------------------
 
-        except OSError as ex:
-            raise ex
+    def __packFullSnapshot(
+        self,
+        entries: list[PackEntry],
+        manifest: SnapshotManifest,
+        previous_file: str | None,
+        previous_manifest: SnapshotManifest | None,
+        destination_file: str,
+    ) -> None:
+        # A snapshot rewritten in place is still read as the reference while
+        # the new one is written beside it
+        reference = self.__referenceSnapshot(manifest, previous_file, previous_manifest)
+
+        self.__byte_counter.setTotal(self.__inputBytes(entries, manifest))
+        self.__packTo(destination_file, entries, reference)
 
-            # -------------------------------------------------------------------------
+        # -------------------------------------------------------------------------
 
-    def __applySnapshotRetention(self):
-        settings = packySettings()
-        snapshot_retention = settings.value(PreferencesKeys.GENERAL_SR.value, type=int)
+    def __referenceSnapshot(
+        self,
+        manifest: SnapshotManifest,
+        previous_file: str | None,
+        previous_manifest: SnapshotManifest | None,
+    ) -> ReferenceSnapshot | None:
+        # The last full snapshot, with the files unchanged since it was packed
+        if previous_manifest is None:
+            return None
+
+        if previous_manifest.base is None:
+            reference_file = previous_file
+            reference_manifest = previous_manifest
+        else:
+            reference_file = os.path.join(os.path.dirname(previous_file), previous_manifest.base)
+            reference_manifest = SnapshotManifest.load(SnapshotManifest.pathFor(reference_file))
+
+        if (
+            reference_manifest is None
+            or reference_manifest.config != manifest.config
+            or not os.path.isfile(reference_file)
+        ):
+            return None
+
+        unchanged = frozenset(
+            arcname
+            for arcname, record in manifest.records.items()
+            if not record.is_dir and reference_manifest.records.get(arcname) == record
+        )
+
+        return ReferenceSnapshot(reference_file, unchanged) if unchanged else None
 
-        if snapshot_retention == PreferencesGeneral.SR_NB_SNAPSHOT.value:
-            snapshots = self.__findSnapshots()
-            self.__removeSnapshots(snapshots)
+        # -------------------------------------------------------------------------
 
-            # -------------------------------------------------------------------------
+    def __incrementalBase(
+        self,
+        previous_file: str | None,
+        previous_manifest: SnapshotManifest | None,
+        destination_file: str,
+    ) -> tuple[str, SnapshotManifest, int] | None:
+        # Returns the base full snapshot and the index of the new incremental
+        # one, or None when a full snapshot is due.
+        full_interval = self.__plan.retention.full_interval
+
+        if full_interval <= 1 or not self.supportsIncremental() or previous_manifest is None:
+            return None
+
+        if previous_manifest.base is None:
+            base_file = previous_file
+            index = 1
+        else:
+            base_file = os.path.join(os.path.dirname(previous_file), previous_manifest.base)
+            index = previous_manifest.index + 1
+
+        if index >= full_interval:
+            return None
+        # The base must survive the new snapshot, which cannot replace it
+        if os.path.abspath(base_file) == os.path.abspath(destination_file):
+            return None
+
+        base_manifest = SnapshotManifest.load(SnapshotManifest.pathFor(base_file))
+        if (
+            base_manifest is None
+            or base_manifest.base is not None
+            or base_manifest.config != self.__configFingerprint()
+            or not os.path.isfile(base_file)
+        ):
+            return None
+
+        return base_file, base_manifest, index
 
-    def __findSnapshots(self):
-        raw_dest_file = self.__task.rawDestFile()
-        suffix_pattern = self.__snapshotSuffixPattern()
-        file_ext = self.__task.destExtension()
+        # -------------------------------------------------------------------------
 
-        file_pattern = os.path.basename(raw_dest_file) + suffix_pattern + "." + file_ext
-        dirname = os.path.dirname(raw_dest_file)
+    def __previousSnapshot(self) -> str | None:
+        # The last successful run wrote the newest snapshot with a manifest
+        dirname = self.__plan.destination_dir
 
-        snapshots = [f for f in filter(re.compile(file_pattern).match, os.listdir(dirname))]
+        for snapshot in reversed(self.__findSnapshots()):
+            snapshot_path = os.path.join(dirname, snapshot)
+            if os.path.isfile(SnapshotManifest.pathFor(snapshot_path)):
+                return snapshot_path
 
-        return snapshots
+        return None
 
         # -------------------------------------------------------------------------
 
-    def __removeSnapshots(self, snapshots):
-        settings = packySettings()
-        nb_snapshot = settings.value(PreferencesKeys.GENERAL_NB_SNAPSHOT.value, type=int)
-
-        raw_dest_file = self.__task.rawDestFile()
-        dirname = os.path.dirname(raw_dest_file)
+    def __topLevelItems(
+        self, items: Iterable[str], excluded_items: Collection[str] = ()
+    ) -> list[str]:
+        # A checked directory already brings its whole content, so its checked
+        # descendants must not be packed a second time, unless an unchecked
+        # directory stands between them.
+        selected_items = set(items)
+        top_level_items = []
+
+        for item in selected_items:
+            parent = os.path.dirname(item)
+            while (
+                parent != os.path.dirname(parent)
+                and parent not in selected_items
+                and parent not in excluded_items
+            ):
+                parent = os.path.dirname(parent)
+
+            if parent not in selected_items:
+                top_level_items.append(item)
+
+        return sorted(top_level_items)
 
-        if len(snapshots) > nb_snapshot:
-            snapshots = sorted(snapshots, reverse=True)
-            for snapshot_path in snapshots[nb_snapshot:]:
-                os.remove(os.path.join(dirname, snapshot_path))
+        # -------------------------------------------------------------------------
 
-                info_msg = f"Remove {snapshot_path}"
-                self.signals.info.emit(info_msg)
+    def __walkDir(
+        self, dir_path: str, dir_arcname: str, excluded_items: Collection[str] = ()
+    ) -> Iterator[PackEntry]:
+        self.__cancel_token.raiseIfCancelled()
+        with os.scandir(dir_path) as it:
+            for dir_entry in it:
+                if excluded_items and self.__slashPath(dir_entry.path) in excluded_items:
+                    continue
+
+                arcname = os.path.join(dir_arcname, dir_entry.name)
+
+                if dir_entry.is_dir():
+                    yield PackEntry(dir_entry.path, arcname, True)
+                    if not dir_entry.is_symlink():
+                        yield from self.__walkDir(dir_entry.path, arcname, excluded_items)
+                else:
+                    yield PackEntry(dir_entry.path, arcname, False)
 
-                # -------------------------------------------------------------------------
+            # -------------------------------------------------------------------------
 
-    def __snapshotSuffixPattern(self) -> str:
-        settings = packySettings()
-        task_suffix = settings.value(PreferencesKeys.TASK_SUFFIX.value, type=int)
+    @staticmethod
+    def __slashPath(path: str) -> str:
+        # The selection stores paths with forward slashes, as Qt does
+        return path.replace(os.sep, "/") if os.sep != "/" else path
 
-        suffix_pattern = ""
-        match task_suffix:
-            case PreferencesTask.SUFFIX_CURR_DATE.value:
-                suffix_pattern = "_[0-9]{4}_[0-9]{2}_[0-9]{2}"
-            case PreferencesTask.SUFFIX_VERSION_NUM.value:
-                suffix_pattern = "_[0-9]+"
+            # -------------------------------------------------------------------------
 
-        return suffix_pattern
+    def __applySnapshotRetention(self):
+        retention = self.__plan.retention
+        if retention.keeps_all:
+            return
+
+        prune_list = pruneList(self.__plan.snapshots, retention)
+        for snapshot_path in prune_list.pinned:
+            info_msg = f"Keep {snapshot_path}, needed by incremental snapshots"
+            self.postEvent(info_msg)
+
+        if retention.dry_run:
+            for snapshot_path in prune_list.removed:
+                info_msg = f"Would remove {snapshot_path}"
+                self.postEvent(info_msg)
+            return
+
+        # The snapshots are removed once the task ends, the signals and the
+        # event buffer staying alive with the callbacks
+        signals = self.signals
+        event_buffer = self.__event_buffer
+        SnapshotPruner.default().prune(
+            self.__plan.destination_dir,
+            prune_list.removed,
+            lambda snapshot_path: event_buffer.post(f"Remove {snapshot_path}"),
+            signals.error.emit,
+        )
 
-        # -------------------------------------------------------------------------
+            # -------------------------------------------------------------------------
 
-    def __cleanTmpFolder(self, tmp_folder_path: str):
-        if os.path.exists(tmp_folder_path):
-            shutil.rmtree(tmp_folder_path)
+    def __findSnapshots(self) -> list[str]:
+        # From the oldest to the newest, by version number or by date
+        return SnapshotCatalog.default().snapshots(self.__plan.snapshots)
@@ -6,16 +6,30 @@ See LICENCE.md file for more information.
 """
 
 # PackY
-from packy.models.tasks_model import TasksModel
+from packy.models.archiver_config_model import ArchiveFormat
+from packy.models.cancellation import CancellationToken
+from packy.models.tar_packer import FilePacker, TarPacker
+from packy.models.run_plan import RunPlan
 from packy.models.zip_packer import ZipPacker
 
 
 # -----------------------------------------------------------------------------
-def createPacker(task: TasksModel):
-    extension = task.packerData().extension()
+def createPacker(plan: RunPlan, cancel_token: CancellationToken | None = None):
+    archive_format = plan.compression.format
 
-    match extension:
-        case "zip" | "lzma":
-            return ZipPacker(task)
+    match archive_format:
+        case ArchiveFormat.ZIP | ArchiveFormat.LZMA:
+            return ZipPacker(plan, cancel_token)
+        case (
+            ArchiveFormat.TAR
+            | ArchiveFormat.TGZ
+            | ArchiveFormat.TBZ
+            | ArchiveFormat.TXZ
+            | ArchiveFormat.TLZ
+            | ArchiveFormat.TZST
+        ):
+            return TarPacker(plan, cancel_token)
+        case ArchiveFormat.GZ | ArchiveFormat.BZ2 | ArchiveFormat.XZ | ArchiveFormat.ZST:
+            return FilePacker(plan, cancel_token)
         case _:
             raise Exception("[createPacker] extension not recognized.")
@@ -0,0 +1,45 @@
+"""Signals emitted by a packer running in a worker thread.
+
+The signals object is created in the thread building the packer, so the
+slots of the GUI objects connected to it run in the GUI thread. The messages
+about the run are not signals but go through the event buffer.
+
+Typical usage example:
+
+  packer = createPacker(run_plan)
+  packer.signals.error.connect(progression.errorReported)
+  QThreadPool.globalInstance().start(packer)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+from typing import final
+
+# PyQt
+from PySide6.QtCore import QObject, Signal
+
+
+###############################################################################
+@final
+class PackerSignals(QObject):
+    """Signals emitted by a packer.
+
+    Attributes:
+        error (Signal): Emitted with the message of the error ending the run.
+        bytes_progress (Signal): Emitted with the identifier of the task, the
+            bytes processed and the total bytes of the run, a few times per
+            second at most. Every byte is processed once the run ends.
+        status_changed (Signal): Emitted with the identifier of the task and
+            its new ``TaskStatus`` once the run ends.
+        finish (Signal): Emitted once the run ends, whatever its outcome.
+    """
+
+    error = Signal(str)
+    # The sizes may not fit in 32 bits
+    bytes_progress = Signal(int, "qint64", "qint64")
+    status_changed = Signal(int, object)
+    finish = Signal()
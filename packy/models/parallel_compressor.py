@@ -0,0 +1,288 @@
+"""Block-parallel gzip, bzip2 and xz compression streams.
+
+This module provides a write-only stream cutting its input into blocks,
+compressing the blocks on a pool of worker threads and writing them in
+order to the destination. Each block is an independent gzip member, bzip2
+stream or xz stream, and their concatenation is a valid multi-member
+``.gz``, multi-stream ``.bz2`` or multi-stream ``.xz`` file readable by
+the standard tools and modules.
+
+Typical usage example:
+
+  with open(path, "wb") as dst_file:
+      with ParallelCompressor(dst_file, Codec.GZIP, level=6, workers=8) as stream:
+          shutil.copyfileobj(src_file, stream)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import TYPE_CHECKING, BinaryIO, final, override
+
+# PackY
+from packy.models.compressibility import isIncompressible
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Buffer
+    from types import TracebackType
+
+# Dictionary size of each xz preset, from 0 to 9. The presets from 6 to 9
+# only differ by their dictionary size.
+_XZ_PRESET_DICT_SIZES = [
+    256 * 1024,
+    1024 * 1024,
+    2 * 1024 * 1024,
+    4 * 1024 * 1024,
+    4 * 1024 * 1024,
+    8 * 1024 * 1024,
+    8 * 1024 * 1024,
+    16 * 1024 * 1024,
+    32 * 1024 * 1024,
+    64 * 1024 * 1024,
+]
+
+# Smallest dictionary accepted by the xz encoder
+_XZ_MIN_DICT_SIZE = 4096
+
+
+###############################################################################
+class Codec(Enum):
+    """Compression codecs supporting concatenated independent blocks.
+
+    Attributes:
+        GZIP (int): Each block is a gzip member.
+        BZIP2 (int): Each block is a bzip2 stream.
+        XZ (int): Each block is an xz stream.
+    """
+
+    GZIP = 0
+    BZIP2 = 1
+    XZ = 2
+
+    # -------------------------------------------------------------------------
+    @property
+    def default_block_size(self) -> int:
+        """The block size giving a compression ratio close to a single stream.
+
+        Returns:
+            int: The block size in bytes.
+        """
+        match self:
+            case Codec.GZIP:
+                return 1024 * 1024
+            case Codec.BZIP2:
+                return 900 * 1000
+            case Codec.XZ:
+                return 8 * 1024 * 1024
+
+    # -------------------------------------------------------------------------
+    @property
+    def fastest_level(self) -> int:
+        """The level writing incompressible blocks with the least CPU time.
+
+        gzip stores the data as it is at level 0. bzip2 and xz have no such
+        level: their lowest presets still compress the data, only with much
+        less CPU time and memory than the higher ones.
+
+        Returns:
+            int: The compression level.
+        """
+        match self:
+            case Codec.GZIP | Codec.XZ:
+                return 0
+            case Codec.BZIP2:
+                return 1
+
+    # -------------------------------------------------------------------------
+    def compress(self, block: bytes, level: int) -> bytes:
+        """Compresses a block into an independent member or stream.
+
+        An xz dictionary larger than the block is never filled, so it is
+        shrunk to the block size: the block compresses the same, while the
+        encoder of each worker no longer allocates up to ten times a 64 MiB
+        dictionary at the highest preset.
+
+        Args:
+            block (bytes): The uncompressed data.
+            level (int): The compression level, from 0 to 9.
+
+        Returns:
+            bytes: The compressed block.
+        """
+        match self:
+            case Codec.GZIP:
+                return gzip.compress(block, compresslevel=level, mtime=0)
+            case Codec.BZIP2:
+                return bz2.compress(block, compresslevel=level)
+            case Codec.XZ:
+                dict_size = min(_XZ_PRESET_DICT_SIZES[level], max(len(block), _XZ_MIN_DICT_SIZE))
+                filters = [{"id": lzma.FILTER_LZMA2, "preset": level, "dict_size": dict_size}]
+                return lzma.compress(block, format=lzma.FORMAT_XZ, filters=filters)
+
+
+###############################################################################
+@final
+class ParallelCompressor(io.RawIOBase):
+    """Write-only stream compressing fixed-size blocks on a thread pool.
+
+    The compressors of the standard library release the GIL, so blocks are
+    compressed on as many cores as there are workers. At most two blocks per
+    worker are held in memory, and compressed blocks are written to the
+    destination in the order their data was written to the stream.
+
+    Attributes:
+        __dst_file (BinaryIO): The destination, written sequentially.
+        __codec (Codec): The codec compressing each block.
+        __level (int): The compression level.
+        __block_size (int): The size of the uncompressed blocks.
+        __store_incompressible (bool): Whether incompressible blocks are
+            written with the fastest level of the codec.
+        __buffer (bytearray): Data written but not submitted yet.
+        __nb_blocks (int): Number of blocks submitted so far.
+        __executor (ThreadPoolExecutor): The pool compressing the blocks.
+        __pending (deque[Future[bytes]]): Blocks submitted but not written
+            yet, in order.
+        __max_pending (int): Maximum number of blocks held in memory.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        dst_file: BinaryIO,
+        codec: Codec,
+        level: int,
+        workers: int = 0,
+        block_size: int = 0,
+        store_incompressible: bool = False,
+    ) -> None:
+        """Initializes the stream.
+
+        Args:
+            dst_file (BinaryIO): The destination file object. It is not
+                closed with the stream.
+            codec (Codec): The codec compressing each block.
+            level (int): The compression level, from 1 to 9.
+            workers (int): Number of compression threads. 0 uses one thread
+                per available core. Defaults to 0.
+            block_size (int): Size of the uncompressed blocks in bytes. 0
+                uses the codec default. Defaults to 0.
+            store_incompressible (bool): Whether blocks which would not
+                shrink, known from a sample of their content, are written
+                with the fastest level of the codec. Defaults to False.
+        """
+        super().__init__()
+
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+
+        self.__dst_file: BinaryIO = dst_file
+        self.__codec: Codec = codec
+        self.__level: int = level
+        self.__block_size: int = block_size if block_size > 0 else codec.default_block_size
+        self.__store_incompressible: bool = store_incompressible
+        self.__buffer: bytearray = bytearray()
+        self.__nb_blocks: int = 0
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="block_compress",
+        )
+        self.__pending: deque[Future[bytes]] = deque()
+        self.__max_pending: int = 2 * workers
+
+    # -------------------------------------------------------------------------
+    @override
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Writes the remaining blocks, or drops them if an error occurred."""
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    # -------------------------------------------------------------------------
+    @override
+    def writable(self) -> bool:
+        return True
+
+    # -------------------------------------------------------------------------
+    @override
+    def write(self, b: Buffer) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+
+        data = memoryview(b).cast("B")
+        self.__buffer += data
+
+        while len(self.__buffer) >= self.__block_size:
+            block = bytes(self.__buffer[: self.__block_size])
+            del self.__buffer[: self.__block_size]
+            self.__submit(block)
+
+        return len(data)
+
+    # -------------------------------------------------------------------------
+    @override
+    def close(self) -> None:
+        """Compresses the last block, writes all blocks and stops the workers."""
+        if self.closed:
+            return
+
+        try:
+            if self.__buffer or self.__nb_blocks == 0:
+                self.__submit(bytes(self.__buffer))
+                self.__buffer.clear()
+            self.__flush(0)
+        finally:
+            self.__executor.shutdown()
+            super().close()
+
+    # -------------------------------------------------------------------------
+    def abort(self) -> None:
+        """Drops the pending blocks and stops the workers."""
+        self.__executor.shutdown(cancel_futures=True)
+        self.__pending.clear()
+        self.__buffer.clear()
+        super().close()
+
+    # -------------------------------------------------------------------------
+    def __submit(self, block: bytes) -> None:
+        future = self.__executor.submit(
+            ParallelCompressor.__compress,
+            self.__codec,
+            block,
+            self.__level,
+            self.__store_incompressible,
+        )
+        self.__pending.append(future)
+        self.__nb_blocks += 1
+        self.__flush(self.__max_pending)
+
+    # -------------------------------------------------------------------------
+    def __flush(self, max_pending: int) -> None:
+        while len(self.__pending) > max_pending:
+            self.__dst_file.write(self.__pending.popleft().result())
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __compress(codec: Codec, block: bytes, level: int, detect_incompressible: bool) -> bytes:
+        # A block holds several tar members, so it is sampled at several places
+        if detect_incompressible and isIncompressible(block, nb_windows=4):
+            level = codec.fastest_level
+
+        return codec.compress(block, level)
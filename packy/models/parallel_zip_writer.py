@@ -0,0 +1,363 @@
+"""Parallel member compression for ZIP archives.
+
+This module provides a writer compressing ZIP members on a pool of worker
+threads while a single writer appends the finished members to the archive
+in the order they were submitted. Members of another archive can also be
+copied as they are, without being decompressed and compressed again. The
+output is a standard ZIP file.
+
+Typical usage example:
+
+  with ZipFile(path, mode="w", compression=ZIP_DEFLATED) as zip_file:
+      with ParallelZipWriter(zip_file, workers=8) as zip_writer:
+          zip_writer.write("/src/file.txt", "file.txt")
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import copy
+import os
+import struct
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, BinaryIO, Self, final
+from zipfile import ZIP64_LIMIT, ZIP_LZMA, ZIP_STORED, BadZipFile, ZipFile, ZipInfo
+
+# PackY
+from packy.models.compressibility import SAMPLE_SIZE, hasIncompressibleExtension, isIncompressible
+
+if TYPE_CHECKING:
+    # Python
+    from types import TracebackType
+
+    # PackY
+    from packy.models.cancellation import CancellationToken
+    from packy.models.throughput import ByteCounter
+
+# Members bigger than this are streamed by ZipFile.write instead of being
+# compressed in memory by a worker.
+LARGE_MEMBER_SIZE = 16 * 1024 * 1024
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Compressed data includes an end-of-stream marker (see ZipFile._open_to_write)
+_MASK_LZMA_EOS = 0x02
+# Sizes and CRC follow the data instead of being in the local header
+_MASK_USE_DATA_DESCRIPTOR = 0x08
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+_EXTRA_HEADER = struct.Struct("<HH")
+_EXTRA_ZIP64 = 0x0001
+
+
+###############################################################################
+@final
+class ParallelZipWriter:
+    """Compress ZIP members concurrently and write them in a deterministic order.
+
+    Files are compressed in memory by a pool of threads (zlib and lzma
+    release the GIL while compressing). The writer keeps a bounded window of
+    pending members and appends each one, local header then data, in
+    submission order. The central directory is written by the underlying
+    ``ZipFile`` when it is closed.
+
+    Attributes:
+        __zip_file (ZipFile): The archive opened in write mode.
+        __store_incompressible (bool): Whether incompressible files are
+            stored instead of compressed.
+        __cancel_token (CancellationToken | None): Checked by the workers at
+            each chunk read.
+        __byte_counter (ByteCounter | None): Counts the uncompressed bytes
+            of the members, as they are read.
+        __executor (ThreadPoolExecutor): The pool compressing the members.
+        __pending (deque[Future[tuple[ZipInfo, bytes]]]): Members submitted
+            but not written yet, in submission order.
+        __max_pending (int): Maximum number of members held in memory.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        zip_file: ZipFile,
+        workers: int = 0,
+        store_incompressible: bool = False,
+        cancel_token: CancellationToken | None = None,
+        byte_counter: ByteCounter | None = None,
+    ) -> None:
+        """Initializes the writer.
+
+        Args:
+            zip_file (ZipFile): The archive opened in write mode. Its
+                compression and compresslevel apply to every member.
+            workers (int): Number of compression threads. 0 uses one thread
+                per available core. Defaults to 0.
+            store_incompressible (bool): Whether files which would not shrink,
+                known by their extension or from a sample of their content,
+                are stored instead of compressed. Defaults to False.
+            cancel_token (CancellationToken | None): Stops the workers at the
+                next chunk read once the run is cancelled. Defaults to None.
+            byte_counter (ByteCounter | None): Counts the uncompressed bytes
+                of the members, as they are read. A copied member counts
+                once copied. Defaults to None.
+        """
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+
+        self.__zip_file: ZipFile = zip_file
+        self.__store_incompressible: bool = store_incompressible
+        self.__cancel_token: CancellationToken | None = cancel_token
+        self.__byte_counter: ByteCounter | None = byte_counter
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="zip_compress",
+        )
+        self.__pending: deque[Future[tuple[ZipInfo, bytes]]] = deque()
+        self.__max_pending: int = 2 * workers
+
+    # -------------------------------------------------------------------------
+    def __enter__(self) -> Self:
+        """Returns the writer itself."""
+        return self
+
+    # -------------------------------------------------------------------------
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Writes the pending members, or drops them if an error occurred."""
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    # -------------------------------------------------------------------------
+    def write(self, path: str, arcname: str) -> None:
+        """Submits a file or a directory to the archive.
+
+        Args:
+            path (str): Path of the item on disk.
+            arcname (str): Name of the item in the archive.
+        """
+        zinfo = ZipInfo.from_file(path, arcname)
+
+        if zinfo.is_dir():
+            zinfo.CRC = 0
+            zinfo.compress_size = 0
+            self.__pending.append(self.__completed(zinfo, b""))
+        else:
+            zinfo.compress_type = self.__zip_file.compression
+            detect = self.__store_incompressible and zinfo.compress_type != ZIP_STORED
+            if detect and hasIncompressibleExtension(path):
+                zinfo.compress_type = ZIP_STORED
+                detect = False
+
+            if zinfo.file_size > LARGE_MEMBER_SIZE:
+                if detect and ParallelZipWriter.__hasIncompressibleStart(path):
+                    zinfo.compress_type = ZIP_STORED
+                self.__flush(0)
+                self.__stream(path, zinfo)
+            else:
+                future = self.__executor.submit(
+                    ParallelZipWriter.__compress,
+                    path,
+                    zinfo,
+                    self.__zip_file.compresslevel,
+                    detect,
+                    self.__cancel_token,
+                    self.__byte_counter,
+                )
+                self.__pending.append(future)
+
+        self.__flush(self.__max_pending)
+
+    # -------------------------------------------------------------------------
+    def copy(self, source_file: BinaryIO, source_zinfo: ZipInfo) -> None:
+        """Submits a member of another archive, copied without recompression.
+
+        The compressed data is read as it is from the source archive, so the
+        member keeps its compression method and level.
+
+        Args:
+            source_file (BinaryIO): The source archive, opened for reading.
+            source_zinfo (ZipInfo): The member, read from the central
+                directory of the source archive.
+
+        Raises:
+            BadZipFile: The local header of the member is corrupted.
+        """
+        data_offset = ParallelZipWriter.__dataOffset(source_file, source_zinfo)
+
+        zinfo = copy.copy(source_zinfo)
+        zinfo.flag_bits &= ~_MASK_USE_DATA_DESCRIPTOR
+        zinfo.extra = ParallelZipWriter.__stripZip64Extra(source_zinfo.extra)
+
+        source_file.seek(data_offset)
+        if zinfo.compress_size > LARGE_MEMBER_SIZE:
+            self.__flush(0)
+            self.__writeHeader(zinfo)
+            remaining = zinfo.compress_size
+            while remaining > 0:
+                if self.__cancel_token is not None:
+                    self.__cancel_token.raiseIfCancelled()
+                chunk = source_file.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise BadZipFile(f"Truncated member {zinfo.filename}")
+                self.__zip_file.fp.write(chunk)  # pyright: ignore[reportOptionalMemberAccess] the archive is open in write mode
+                remaining -= len(chunk)
+            self.__register(zinfo)
+        else:
+            data = source_file.read(zinfo.compress_size)
+            if len(data) != zinfo.compress_size:
+                raise BadZipFile(f"Truncated member {zinfo.filename}")
+            self.__pending.append(self.__completed(zinfo, data))
+
+        if self.__byte_counter is not None:
+            self.__byte_counter.add(zinfo.file_size)
+        self.__flush(self.__max_pending)
+
+    # -------------------------------------------------------------------------
+    def close(self) -> None:
+        """Writes all pending members and stops the workers."""
+        try:
+            self.__flush(0)
+        finally:
+            self.__executor.shutdown()
+
+    # -------------------------------------------------------------------------
+    def abort(self) -> None:
+        """Drops the pending members and stops the workers."""
+        self.__executor.shutdown(cancel_futures=True)
+        self.__pending.clear()
+
+    # -------------------------------------------------------------------------
+    def __stream(self, path: str, zinfo: ZipInfo) -> None:
+        # Same as ZipFile.write, with the bytes counted at each chunk
+        zinfo._compresslevel = self.__zip_file.compresslevel  # noqa: SLF001 same as ZipFile.write
+        with open(path, "rb") as src_file, self.__zip_file.open(zinfo, "w") as dst_file:  # noqa: PTH123
+            while chunk := src_file.read(READ_CHUNK_SIZE):
+                dst_file.write(chunk)
+                if self.__byte_counter is not None:
+                    self.__byte_counter.add(len(chunk))
+
+    # -------------------------------------------------------------------------
+    def __flush(self, max_pending: int) -> None:
+        while len(self.__pending) > max_pending:
+            zinfo, data = self.__pending.popleft().result()
+            self.__append(zinfo, data)
+
+    # -------------------------------------------------------------------------
+    def __append(self, zinfo: ZipInfo, data: bytes) -> None:
+        self.__writeHeader(zinfo)
+        self.__zip_file.fp.write(data)  # pyright: ignore[reportOptionalMemberAccess] the archive is open in write mode
+        self.__register(zinfo)
+
+    # -------------------------------------------------------------------------
+    def __writeHeader(self, zinfo: ZipInfo) -> None:
+        zip_file = self.__zip_file
+        zip64 = zinfo.file_size > ZIP64_LIMIT or zinfo.compress_size > ZIP64_LIMIT
+
+        zinfo.header_offset = zip_file.fp.tell()  # pyright: ignore[reportOptionalMemberAccess] the archive is open in write mode
+        zip_file.fp.write(zinfo.FileHeader(zip64))  # pyright: ignore[reportOptionalMemberAccess]
+
+    # -------------------------------------------------------------------------
+    def __register(self, zinfo: ZipInfo) -> None:
+        zip_file = self.__zip_file
+        zip_file.filelist.append(zinfo)
+        zip_file.NameToInfo[zinfo.filename] = zinfo
+        zip_file.start_dir = zip_file.fp.tell()  # pyright: ignore[reportOptionalMemberAccess] the archive is open in write mode
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __completed(zinfo: ZipInfo, data: bytes) -> Future[tuple[ZipInfo, bytes]]:
+        future: Future[tuple[ZipInfo, bytes]] = Future()
+        future.set_result((zinfo, data))
+        return future
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __dataOffset(source_file: BinaryIO, zinfo: ZipInfo) -> int:
+        # The extra field of the local header may differ from the one of the
+        # central directory, so its length is read from the local header.
+        source_file.seek(zinfo.header_offset)
+        header = source_file.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size:
+            raise BadZipFile(f"Truncated header of member {zinfo.filename}")
+
+        fields = _LOCAL_HEADER.unpack(header)
+        if fields[0] != _LOCAL_HEADER_SIGNATURE:
+            raise BadZipFile(f"Bad magic number for member {zinfo.filename}")
+
+        filename_length, extra_length = fields[10], fields[11]
+        return zinfo.header_offset + _LOCAL_HEADER.size + filename_length + extra_length
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __stripZip64Extra(extra: bytes) -> bytes:
+        # ZipInfo.FileHeader and ZipFile.close add the zip64 field back when
+        # the sizes or offset of the new member need it.
+        fields = []
+        offset = 0
+        while offset + _EXTRA_HEADER.size <= len(extra):
+            field_id, field_size = _EXTRA_HEADER.unpack_from(extra, offset)
+            field_end = offset + _EXTRA_HEADER.size + field_size
+            if field_id != _EXTRA_ZIP64:
+                fields.append(extra[offset:field_end])
+            offset = field_end
+
+        return b"".join(fields)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __hasIncompressibleStart(path: str) -> bool:
+        with open(path, "rb") as file:  # noqa: PTH123
+            return isIncompressible(file.read(SAMPLE_SIZE))
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __compress(
+        path: str,
+        zinfo: ZipInfo,
+        compresslevel: int | None,
+        detect_incompressible: bool,
+        cancel_token: CancellationToken | None,
+        byte_counter: ByteCounter | None,
+    ) -> tuple[ZipInfo, bytes]:
+        crc = 0
+        file_size = 0
+        chunks: list[bytes] = []
+
+        with open(path, "rb") as file:  # noqa: PTH123
+            chunk = file.read(READ_CHUNK_SIZE)
+            if detect_incompressible and isIncompressible(chunk):
+                zinfo.compress_type = ZIP_STORED
+
+            compressor = zipfile._get_compressor(zinfo.compress_type, compresslevel)  # noqa: SLF001 same compressors as ZipFile.write
+            while chunk:
+                if cancel_token is not None:
+                    cancel_token.raiseIfCancelled()
+                if byte_counter is not None:
+                    byte_counter.add(len(chunk))
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                chunks.append(compressor.compress(chunk) if compressor else chunk)
+                chunk = file.read(READ_CHUNK_SIZE)
+
+        if compressor:
+            chunks.append(compressor.flush())
+
+        data = b"".join(chunks)
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = len(data)
+        if zinfo.compress_type == ZIP_LZMA:
+            zinfo.flag_bits |= _MASK_LZMA_EOS
+
+        return zinfo, data
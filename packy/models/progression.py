@@ -5,10 +5,16 @@ All rights reserved.
 See LICENCE.md file for more information.
 """
 
+# Python
+import time
+
 # PyQt
 from PySide6 import QtCore
 from PySide6.QtCore import QAbstractListModel
 
+# PackY
+from packy.models.throughput import ThroughputWindow
+
 
 ###############################################################################
 class Progression(QAbstractListModel):
@@ -19,7 +25,17 @@ class Progression(QAbstractListModel):
     # __nb_error:
     # __nb_task_finished:
     # __global_progress:
-    # __task_progress:
+    # __task_progress: the progress of the shown task.
+    # __shown_task: the identifier of the task whose progress is shown, the
+    #               first one reporting its bytes while none runs.
+    # __ended_tasks: the identifiers of the tasks whose run ended.
+    # __task_bytes: the bytes processed and the total bytes of each task
+    #               started, by task identifier.
+    # __throughput: the bytes processed by all the tasks over the last
+    #               seconds.
+    # __global_format: the text of the global progress bar.
+    # __message: shown instead of the progress bar texts when set.
+    # __clock: returns the current time, in seconds.
     ###########################################################################
 
     ###########################################################################
@@ -27,9 +43,11 @@ class Progression(QAbstractListModel):
     ###########################################################################
 
     # -------------------------------------------------------------------------
-    def __init__(self):
+    def __init__(self, clock=time.monotonic):
         super(Progression, self).__init__()
 
+        self.__clock = clock
+        self.__throughput = ThroughputWindow()
         self.init()
 
     ###########################################################################
@@ -40,6 +58,12 @@ class Progression(QAbstractListModel):
     def setNbTask(self, nb_task: int):
         self.__nb_task = nb_task
 
+    # -------------------------------------------------------------------------
+    def setMessage(self, message: str | None):
+        # Shown by both progress bars until the next run
+        self.__message = message
+        self.dataChanged.emit(self.index(2, 0), self.index(3, 0))
+
     ###########################################################################
     # PUBLIC MEMBER FUNCTIONS
     ###########################################################################
@@ -51,12 +75,19 @@ class Progression(QAbstractListModel):
         self.__nb_task_finished = 0
         self.__global_progress = 0
         self.__task_progress = 0
-        self.dataChanged.emit(self.index(0, 0), self.index(1, 0))
+        self.__shown_task = None
+        self.__ended_tasks = set()
+        self.__task_bytes = {}
+        self.__throughput.clear()
+        self.__global_format = "%p%"
+        self.__message = None
+        self.dataChanged.emit(self.index(0, 0), self.index(3, 0))
 
         # -------------------------------------------------------------------------
 
     def rowCount(self, index=None):
-        return 2
+        # The global and task progress, then the texts of their progress bars
+        return 4
 
         # -------------------------------------------------------------------------
 
@@ -66,6 +97,10 @@ class Progression(QAbstractListModel):
                 return self.__global_progress
             elif index.row() == 1:
                 return self.__task_progress
+            elif index.row() == 2:
+                return self.__message if self.__message is not None else self.__global_format
+            elif index.row() == 3:
+                return self.__message if self.__message is not None else "%p%"
 
                 # -------------------------------------------------------------------------
 
@@ -93,13 +128,87 @@ class Progression(QAbstractListModel):
 
         # -------------------------------------------------------------------------
 
-    def updateTaskProgress(self, progress: int):
-        self.__task_progress = progress
-        self.dataChanged.emit(self.index(1, 0), self.index(1, 0))
+    def updateTaskBytes(self, task_id: int, done: int, total: int):
+        self.__task_bytes[task_id] = (done, total)
+
+        # The runs progress concurrently, the task bar follows one of them
+        # until it ends
+        if self.__shown_task is None or (
+            self.__shown_task in self.__ended_tasks and task_id not in self.__ended_tasks
+        ):
+            self.__shown_task = task_id
+
+        if task_id == self.__shown_task:
+            self.__task_progress = self.__percent(done, total) if total > 0 else 100
+
+        self.__updateGlobalBytes()
+        self.dataChanged.emit(self.index(0, 0), self.index(2, 0))
+
+        # -------------------------------------------------------------------------
+
+    def taskEnded(self, task_id: int, status=None):
+        # Whatever its status, the next task running is shown from its next
+        # bytes report
+        self.__ended_tasks.add(task_id)
 
         # -------------------------------------------------------------------------
 
     def updateGlobalProgress(self):
         self.__nb_task_finished += 1
-        self.__global_progress = (self.__nb_task_finished / self.__nb_task) * 100
-        self.dataChanged.emit(self.index(0, 0), self.index(0, 0))
+        self.__updateGlobalBytes()
+        self.dataChanged.emit(self.index(0, 0), self.index(2, 0))
+
+    ###########################################################################
+    # PRIVATE MEMBER FUNCTIONS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def __updateGlobalBytes(self):
+        done = sum(task_done for task_done, _ in self.__task_bytes.values())
+        total = self.__estimatedTotalBytes()
+
+        if total > 0:
+            self.__global_progress = self.__percent(done, total)
+        elif self.__nb_task > 0:
+            # Nothing to pack so far, every task weighs the same
+            self.__global_progress = self.__percent(self.__nb_task_finished, self.__nb_task)
+
+        self.__throughput.add(self.__clock(), done)
+        self.__global_format = self.__formatThroughput(total - done)
+
+        # -------------------------------------------------------------------------
+
+    def __estimatedTotalBytes(self) -> int:
+        # The tasks not started yet are expected to weigh as much as the
+        # started ones on average.
+        known_total = sum(task_total for _, task_total in self.__task_bytes.values())
+        nb_known = len(self.__task_bytes)
+        nb_unknown = max(self.__nb_task - nb_known, 0)
+
+        if nb_known == 0:
+            return 0
+
+        return known_total + (nb_unknown * known_total) // nb_known
+
+        # -------------------------------------------------------------------------
+
+    def __formatThroughput(self, remaining: int) -> str:
+        rate = self.__throughput.rate()
+        if rate <= 0.0:
+            return "%p%"
+
+        text = f"%p% - {rate / 1e6:.1f} MB/s"
+        eta = self.__throughput.eta(remaining)
+        if eta is not None and remaining > 0:
+            minutes, seconds = divmod(round(eta), 60)
+            hours, minutes = divmod(minutes, 60)
+            text += f" - {hours}:{minutes:02}:{seconds:02} left"
+
+        return text
+
+        # -------------------------------------------------------------------------
+
+    @staticmethod
+    def __percent(done: int, total: int) -> int:
+        # Files may grow between the scan and the packing
+        return min(done * 100 // total, 100)
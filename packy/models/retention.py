@@ -0,0 +1,265 @@
+"""Retention of the snapshots of a task.
+
+This module selects the snapshots removed by a retention policy and removes
+them. Besides the latest snapshots, the policy keeps the newest snapshot of
+each of the last days, weeks, months and years, the grandfather-father-son
+scheme. All the tiers are evaluated in a single pass over the snapshots,
+from the newest to the oldest, with their times read from the snapshot
+catalog, so thousands of snapshots are sorted out without touching the disk.
+
+The full snapshots the kept incremental ones depend on are kept as well. The
+snapshots are then removed by a single background thread, so the removal
+does not delay the task, while the removals of the tasks never overlap.
+
+Typical usage example:
+
+  prune_list = pruneList(series, RetentionPolicy(daily=7, weekly=4))
+  SnapshotPruner.default().prune(series.dir_path, prune_list.removed)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import contextlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, final
+
+# PackY
+from packy.models.snapshot_catalog import SnapshotCatalog
+from packy.models.snapshot_manifest import SnapshotManifest
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Callable, Hashable, Iterable, Sequence
+    from concurrent.futures import Future
+    from datetime import datetime
+
+    # PackY
+    from packy.models.run_plan import RetentionPolicy
+    from packy.models.snapshot_catalog import SnapshotSeries
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class PruneList:
+    """The snapshots of a series sorted out by a retention policy.
+
+    Attributes:
+        kept (tuple[str, ...]): The snapshots kept by the policy, from the
+            oldest to the newest.
+        removed (tuple[str, ...]): The snapshots to remove, from the oldest
+            to the newest.
+        pinned (tuple[str, ...]): The snapshots left out by the policy but
+            kept because kept incremental snapshots depend on them.
+    """
+
+    kept: tuple[str, ...]
+    removed: tuple[str, ...]
+    pinned: tuple[str, ...] = ()
+
+
+# -----------------------------------------------------------------------------
+def selectSnapshots(
+    snapshots: Sequence[tuple[str, datetime]], policy: RetentionPolicy
+) -> PruneList:
+    """Sorts out the snapshots of a series with a retention policy.
+
+    A snapshot is kept if it is among the latest ones or if it is the newest
+    snapshot of one of the periods kept by a tier.
+
+    Args:
+        snapshots (Sequence[tuple[str, datetime]]): The names and times of the
+            snapshots, from the oldest to the newest.
+        policy (RetentionPolicy): The retention policy.
+
+    Returns:
+        PruneList: The snapshots kept and removed, without any pinned.
+    """
+    if policy.keeps_all:
+        return PruneList(tuple(name for name, _ in snapshots), ())
+
+    tiers: list[tuple[int, Callable[[datetime], Hashable]]] = [
+        (policy.daily, lambda time: time.date()),
+        (policy.weekly, lambda time: time.isocalendar()[:2]),
+        (policy.monthly, lambda time: (time.year, time.month)),
+        (policy.yearly, lambda time: time.year),
+    ]
+    tiers = [(count, period) for count, period in tiers if count > 0]
+    remaining = [count for count, _ in tiers]
+    last_periods: list[Hashable] = [None] * len(tiers)
+    nb_latest = max(policy.nb_snapshots or 0, 1)
+
+    kept = []
+    removed = []
+    for index, (name, time) in enumerate(reversed(snapshots)):
+        is_kept = index < nb_latest
+
+        # The first snapshot met in a period is its newest one
+        for tier, (_, period) in enumerate(tiers):
+            if remaining[tier] == 0:
+                continue
+            period_key = period(time)
+            if period_key != last_periods[tier]:
+                last_periods[tier] = period_key
+                remaining[tier] -= 1
+                is_kept = True
+
+        (kept if is_kept else removed).append(name)
+
+    return PruneList(tuple(reversed(kept)), tuple(reversed(removed)))
+
+
+# -----------------------------------------------------------------------------
+def pruneList(
+    series: SnapshotSeries, policy: RetentionPolicy, catalog: SnapshotCatalog | None = None
+) -> PruneList:
+    """Sorts out the snapshots of a series, keeping the ones still needed.
+
+    Nothing is removed, so the list can be shown before removing anything.
+
+    Args:
+        series (SnapshotSeries): The snapshots of the task.
+        policy (RetentionPolicy): The retention policy.
+        catalog (SnapshotCatalog | None): The catalog listing the snapshots,
+            the catalog of the application by default.
+
+    Returns:
+        PruneList: The snapshots kept, removed and pinned.
+    """
+    catalog = catalog if catalog is not None else SnapshotCatalog.default()
+    prune_list = selectSnapshots(catalog.times(series), policy)
+
+    bases = _snapshotBases(series.dir_path, prune_list.kept)
+    if not bases.intersection(prune_list.removed):
+        return prune_list
+
+    return PruneList(
+        prune_list.kept,
+        tuple(name for name in prune_list.removed if name not in bases),
+        tuple(name for name in prune_list.removed if name in bases),
+    )
+
+
+# -----------------------------------------------------------------------------
+def unlinkSnapshot(snapshot_path: str, catalog: SnapshotCatalog | None = None) -> None:
+    """Removes a snapshot and its manifest.
+
+    Args:
+        snapshot_path (str): The path of the snapshot.
+        catalog (SnapshotCatalog | None): The catalog listing the snapshot,
+            the catalog of the application by default.
+    """
+    # The snapshot may be a hard link shared with an older one, which must
+    # not be truncated, and its manifest must not outlive it.
+    for path in [SnapshotManifest.pathFor(snapshot_path), snapshot_path]:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+    catalog = catalog if catalog is not None else SnapshotCatalog.default()
+    catalog.remove(snapshot_path)
+
+
+# -----------------------------------------------------------------------------
+def _snapshotBases(dir_path: str, snapshots: Iterable[str]) -> set[str]:
+    # Full snapshots the given incremental ones depend on
+    bases = set()
+    for snapshot in snapshots:
+        manifest_path = SnapshotManifest.pathFor(os.path.join(dir_path, snapshot))
+        manifest = SnapshotManifest.load(manifest_path, with_records=False)
+        if manifest is not None and manifest.base is not None:
+            bases.add(manifest.base)
+
+    return bases
+
+
+###############################################################################
+@final
+class SnapshotPruner:
+    """Removes snapshots in a background thread.
+
+    The snapshots are removed one list after the other, in the order the
+    lists were given.
+
+    Attributes:
+        __default (SnapshotPruner | None): The pruner of the application,
+            created when first used.
+        __default_lock (threading.Lock): Guards the creation of the default
+            pruner.
+        __executor (ThreadPoolExecutor): The thread removing the snapshots.
+    """
+
+    __default: SnapshotPruner | None = None
+    __default_lock: threading.Lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def default(cls) -> SnapshotPruner:
+        """Returns the pruner of the application."""
+        with cls.__default_lock:
+            if cls.__default is None:
+                cls.__default = SnapshotPruner()
+            return cls.__default
+
+    # -------------------------------------------------------------------------
+    def __init__(self) -> None:
+        """Initializes the pruner and its thread."""
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="SnapshotPruner"
+        )
+
+    # -------------------------------------------------------------------------
+    def prune(
+        self,
+        dir_path: str,
+        names: Iterable[str],
+        on_removed: Callable[[str], None] | None = None,
+        on_error: Callable[[str], None] | None = None,
+    ) -> Future[None]:
+        """Removes snapshots and their manifests in the background.
+
+        A snapshot which cannot be removed is skipped.
+
+        Args:
+            dir_path (str): The folder holding the snapshots.
+            names (Iterable[str]): The names of the snapshots.
+            on_removed (Callable[[str], None] | None): Called, from the
+                background thread, with the name of each snapshot removed.
+            on_error (Callable[[str], None] | None): Called, from the
+                background thread, with the message of each error.
+
+        Returns:
+            Future[None]: Done once the snapshots are removed.
+        """
+        return self.__executor.submit(
+            self.__prune, dir_path, tuple(names), on_removed, on_error
+        )
+
+    # -------------------------------------------------------------------------
+    def wait(self) -> None:
+        """Blocks until the snapshots given so far are removed."""
+        self.__executor.submit(lambda: None).result()
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __prune(
+        dir_path: str,
+        names: tuple[str, ...],
+        on_removed: Callable[[str], None] | None,
+        on_error: Callable[[str], None] | None,
+    ) -> None:
+        for name in names:
+            try:
+                unlinkSnapshot(os.path.join(dir_path, name))
+            except OSError as ex:
+                if on_error is not None:
+                    on_error(type(ex).__name__ + ": " + str(ex))
+                continue
+
+            if on_removed is not None:
+                on_removed(name)
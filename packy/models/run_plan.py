@@ -0,0 +1,180 @@
+"""Immutable description of a task run, built before packing starts.
+
+This module gathers everything a packer reads while it runs: the items
+selected, the destination of the snapshot, the compression parameters and
+the retention policy. The plan is built in the GUI thread from the task and
+the settings, then handed to the packer, which never reads a Qt object nor
+a setting. A plan holds plain Python values only, so it can be pickled and
+run in another process.
+
+Typical usage example:
+
+  run_plan = task.runPlan(RetentionPolicy(nb_snapshots=3))
+  packer = createPacker(run_plan)
+  QThreadPool.globalInstance().start(packer)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import copy
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Self
+
+# PackY
+from packy.models.selection_tree import CheckState
+from packy.models.snapshot_catalog import SnapshotSeries
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Mapping
+
+    # PackY
+    from packy.models.archiver_config_model import (
+        ArchiveFormat,
+        ArchiverConfigModel,
+        CompressionLevel,
+        CompressionMethod,
+        FormatOptions,
+    )
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class CompressionSettings:
+    """The archive format and compression parameters of a run.
+
+    Attributes:
+        format (ArchiveFormat): The archive format.
+        compression (CompressionMethod): The compression method.
+        compression_level (CompressionLevel): The compression level.
+        options (FormatOptions | None): The options specific to the format,
+            a copy the task can no longer change.
+    """
+
+    format: ArchiveFormat
+    compression: CompressionMethod
+    compression_level: CompressionLevel
+    options: FormatOptions | None
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def fromConfig(cls, packer_data: ArchiverConfigModel) -> Self:
+        """Copies the parameters of an archiver configuration.
+
+        Args:
+            packer_data (ArchiverConfigModel): The configuration of the task.
+
+        Returns:
+            Self: The compression settings.
+        """
+        return cls(
+            packer_data.format,
+            packer_data.compression,
+            packer_data.compression_level,
+            copy.deepcopy(packer_data.options),
+        )
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class RetentionPolicy:
+    """The snapshots kept and the way they are packed.
+
+    Besides the latest snapshots, the newest snapshot of each of the last
+    days, weeks, months and years may be kept, the tiers adding up. The
+    newest snapshot is always kept.
+
+    Attributes:
+        nb_snapshots (int | None): Number of latest snapshots to keep, None
+            to keep them all unless a tier is set.
+        full_interval (int): Number of snapshots packed from a full snapshot
+            to the next, 1 to only pack full snapshots.
+        daily (int): Number of days whose newest snapshot is kept.
+        weekly (int): Number of weeks whose newest snapshot is kept.
+        monthly (int): Number of months whose newest snapshot is kept.
+        yearly (int): Number of years whose newest snapshot is kept.
+        dry_run (bool): Whether the snapshots to remove are only listed.
+    """
+
+    nb_snapshots: int | None = None
+    full_interval: int = 1
+    daily: int = 0
+    weekly: int = 0
+    monthly: int = 0
+    yearly: int = 0
+    dry_run: bool = False
+
+    # -------------------------------------------------------------------------
+    @property
+    def keeps_all(self) -> bool:
+        """Whether no snapshot is ever removed."""
+        return self.nb_snapshots is None and not (
+            self.daily or self.weekly or self.monthly or self.yearly
+        )
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class RunPlan:
+    """Everything a packer needs to write the snapshot of a task.
+
+    Attributes:
+        task_id (int): The identifier of the task.
+        raw_dest_file (str): The destination chosen by the user, without
+            suffix nor extension.
+        destination_file (str): The snapshot to write, whose suffix was
+            computed when the plan was built.
+        snapshots (SnapshotSeries): The snapshots of the task, whose names
+            are read from the snapshot catalog.
+        root_path (str): The root folder of the selection.
+        selected_items (tuple[str, ...]): The checked items, sorted.
+        excluded_items (frozenset[str]): The unchecked items, which are left
+            out of the checked directories holding them.
+        compression (CompressionSettings): The compression parameters.
+        retention (RetentionPolicy): The retention policy.
+    """
+
+    task_id: int
+    raw_dest_file: str
+    destination_file: str
+    snapshots: SnapshotSeries
+    root_path: str
+    selected_items: tuple[str, ...]
+    excluded_items: frozenset[str]
+    compression: CompressionSettings
+    retention: RetentionPolicy
+
+    # -------------------------------------------------------------------------
+    @property
+    def destination_dir(self) -> str:
+        """The folder holding the snapshots of the task."""
+        return os.path.dirname(self.destination_file)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def resolveItems(checks: Mapping[str, int]) -> tuple[tuple[str, ...], frozenset[str]]:
+        """Splits the explicit check states of a selection.
+
+        The partially checked items bring nothing by themselves: their
+        checked descendants are listed too.
+
+        Args:
+            checks (Mapping[str, int]): The explicit check states, by path.
+
+        Returns:
+            tuple[tuple[str, ...], frozenset[str]]: The checked items, sorted,
+            and the unchecked ones.
+        """
+        selected_items = tuple(
+            sorted(item for item, state in checks.items() if state == CheckState.CHECKED)
+        )
+        excluded_items = frozenset(
+            item for item, state in checks.items() if state == CheckState.UNCHECKED
+        )
+
+        return selected_items, excluded_items
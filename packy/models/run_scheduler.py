@@ -0,0 +1,398 @@
+"""Scheduling of the task runs over the cores and the disks.
+
+This module starts the runs of the tasks as the resources they need become
+available, instead of pushing them all into a thread pool:
+
+- Each disk, identified by the ``st_dev`` of the sources and of the
+  destination of a run, has a number of I/O slots, one by default, so two
+  runs never seek back and forth on the same spinning disk.
+- The cores are shared as a budget of CPU tokens. A run takes one token per
+  compression worker it asks for, at least one, and its compressors are
+  sized to the tokens granted, so runs compressing in parallel never
+  oversubscribe the cores. A run leaving the number of workers to the
+  default asks for its share of the cores among the runs waiting, so the
+  runs on different disks still start together.
+- The runs waiting are ordered by priority, then the longest first, from
+  the duration of their previous run, so a long run does not start last.
+
+The scheduler lives in the GUI thread: the runs are started and released
+from the signals of their packers.
+
+Typical usage example:
+
+  scheduler = RunScheduler()
+  scheduler.run_started.connect(connectPacker)
+  scheduler.submit(task.runPlan(retention), task.priority.value)
+  scheduler.start()
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import dataclasses
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, final
+
+# PyQt
+from PySide6.QtCore import QObject, QThreadPool, Signal, Slot
+
+# PackY
+from packy.models.cancellation import CancellationToken
+from packy.models.packer_factory import createPacker
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Callable, Mapping
+
+    # PackY
+    from packy.models.packer import Packer
+    from packy.models.packer_signals import PackerSignals
+    from packy.models.run_plan import RunPlan
+
+
+###############################################################################
+@final
+class CpuBudget:
+    """The CPU tokens shared by the runs and their compressors.
+
+    Attributes:
+        __default (CpuBudget | None): The budget of the application, created
+            when first used.
+        __default_lock (threading.Lock): Guards the creation of the default
+            budget.
+        __lock (threading.Lock): Guards the tokens.
+        __capacity (int): Number of tokens, one per core by default.
+        __available (int): Number of tokens not granted.
+    """
+
+    __default: CpuBudget | None = None
+    __default_lock: threading.Lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def default(cls) -> CpuBudget:
+        """Returns the budget of the application."""
+        with cls.__default_lock:
+            if cls.__default is None:
+                cls.__default = CpuBudget()
+            return cls.__default
+
+    # -------------------------------------------------------------------------
+    def __init__(self, nb_tokens: int = 0) -> None:
+        """Initializes the budget.
+
+        Args:
+            nb_tokens (int): Number of tokens. 0 uses one token per available
+                core. Defaults to 0.
+        """
+        if nb_tokens <= 0:
+            nb_tokens = os.cpu_count() or 1
+
+        self.__lock: threading.Lock = threading.Lock()
+        self.__capacity: int = nb_tokens
+        self.__available: int = nb_tokens
+
+    # -------------------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        """Number of tokens."""
+        return self.__capacity
+
+    # -------------------------------------------------------------------------
+    @property
+    def available(self) -> int:
+        """Number of tokens not granted."""
+        with self.__lock:
+            return self.__available
+
+    # -------------------------------------------------------------------------
+    def acquire(self, wanted: int) -> int:
+        """Grants tokens without waiting.
+
+        Args:
+            wanted (int): Number of tokens asked for, at least one.
+
+        Returns:
+            int: Number of tokens granted, fewer than asked for if the others
+            are granted already, 0 if none is available.
+        """
+        with self.__lock:
+            granted = min(max(wanted, 1), self.__available)
+            self.__available -= granted
+            return granted
+
+    # -------------------------------------------------------------------------
+    def release(self, nb_tokens: int) -> None:
+        """Gives tokens back.
+
+        Args:
+            nb_tokens (int): Number of tokens granted before.
+        """
+        with self.__lock:
+            self.__available = min(self.__available + nb_tokens, self.__capacity)
+
+
+###############################################################################
+@dataclass(slots=True)
+class _Run:
+    """A run waiting or running.
+
+    Attributes:
+        plan (RunPlan): The plan of the run.
+        priority (int): The priority of the run, the highest first.
+        expected_duration (float): Duration of the previous run of the task,
+            in seconds, 0 if unknown.
+        order (int): Number of the run in submission order.
+        devices (frozenset[int]): The disks holding the sources and the
+            destination.
+        tokens (int): Number of CPU tokens granted.
+        start_time (float): Time the run started, from ``time.monotonic``.
+        signals (PackerSignals | None): The signals of the packer, once
+            started.
+        cancel_token (CancellationToken): Stops the packer once started.
+    """
+
+    plan: RunPlan
+    priority: int
+    expected_duration: float
+    order: int
+    devices: frozenset[int]
+    tokens: int = 0
+    start_time: float = 0.0
+    signals: PackerSignals | None = None
+    cancel_token: CancellationToken = field(default_factory=CancellationToken)
+
+    # -------------------------------------------------------------------------
+    @property
+    def sort_key(self) -> tuple[int, float, int]:
+        """Key sorting the runs from the first to start to the last."""
+        return (-self.priority, -self.expected_duration, self.order)
+
+
+###############################################################################
+@final
+class RunScheduler(QObject):
+    """Starts the runs of the tasks as their disks and the cores are free.
+
+    Attributes:
+        run_started (Signal): Emitted with the packer of a run just before it
+            starts, so its signals can be connected.
+        all_finished (Signal): Emitted once no run is waiting nor running.
+        __cpu_budget (CpuBudget): The CPU tokens shared by the runs.
+        __io_slots (int): Number of runs using a disk at the same time.
+        __thread_pool (QThreadPool): The pool running the packers.
+        __packer_factory (Callable[[RunPlan, CancellationToken], Packer]):
+            Creates the packer of a plan.
+        __waiting (list[_Run]): The runs waiting, in start order.
+        __running (list[_Run]): The runs started and not finished yet.
+        __busy_devices (dict[int, int]): Number of runs using each disk.
+        __durations (dict[str, float]): Duration of the previous run of each
+            task, in seconds, by destination chosen by the user.
+        __counter (itertools.count): Numbers the runs in submission order.
+    """
+
+    run_started = Signal(object)
+    all_finished = Signal()
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        cpu_budget: CpuBudget | None = None,
+        io_slots: int = 1,
+        thread_pool: QThreadPool | None = None,
+        packer_factory: Callable[[RunPlan, CancellationToken], Packer] = createPacker,
+        parent: QObject | None = None,
+    ) -> None:
+        """Initializes the scheduler, without any run.
+
+        Args:
+            cpu_budget (CpuBudget | None): The CPU tokens shared by the runs,
+                the budget of the application by default.
+            io_slots (int): Number of runs using a disk at the same time.
+                Defaults to 1.
+            thread_pool (QThreadPool | None): The pool running the packers,
+                a pool with a thread per CPU token by default.
+            packer_factory (Callable[[RunPlan, CancellationToken], Packer]):
+                Creates the packer of a plan, stopped by the token. Defaults
+                to ``createPacker``.
+            parent (QObject | None): The parent object.
+        """
+        super().__init__(parent)
+
+        if cpu_budget is None:
+            cpu_budget = CpuBudget.default()
+        self.__cpu_budget: CpuBudget = cpu_budget
+        self.__io_slots: int = max(io_slots, 1)
+        if thread_pool is None:
+            thread_pool = QThreadPool(self)
+            thread_pool.setMaxThreadCount(self.__cpu_budget.capacity)
+        self.__thread_pool: QThreadPool = thread_pool
+        self.__packer_factory: Callable[[RunPlan, CancellationToken], Packer] = packer_factory
+        self.__waiting: list[_Run] = []
+        self.__running: list[_Run] = []
+        self.__busy_devices: dict[int, int] = {}
+        self.__durations: dict[str, float] = {}
+        self.__counter: itertools.count = itertools.count()
+
+    # -------------------------------------------------------------------------
+    def durations(self) -> dict[str, float]:
+        """Returns the duration of the previous run of each task.
+
+        Returns:
+            dict[str, float]: The durations in seconds, by destination chosen
+            by the user.
+        """
+        return dict(self.__durations)
+
+    # -------------------------------------------------------------------------
+    def setDurations(self, durations: Mapping[str, float]) -> None:
+        """Sets the durations of the previous runs, saved by a former session.
+
+        Args:
+            durations (Mapping[str, float]): The durations in seconds, by
+                destination chosen by the user.
+        """
+        self.__durations = dict(durations)
+
+    # -------------------------------------------------------------------------
+    def setIoSlots(self, io_slots: int) -> None:
+        """Sets the number of runs using a disk at the same time.
+
+        Args:
+            io_slots (int): Number of runs, at least 1.
+        """
+        self.__io_slots = max(io_slots, 1)
+
+    # -------------------------------------------------------------------------
+    def isIdle(self) -> bool:
+        """Whether no run is waiting nor running."""
+        return not self.__waiting and not self.__running
+
+    # -------------------------------------------------------------------------
+    def submit(self, plan: RunPlan, priority: int = 0) -> None:
+        """Queues a run, started by the next call to ``start``.
+
+        Args:
+            plan (RunPlan): The plan of the run.
+            priority (int): The priority of the run, the highest first.
+                Defaults to 0.
+        """
+        run = _Run(
+            plan,
+            priority,
+            self.__durations.get(plan.raw_dest_file, 0.0),
+            next(self.__counter),
+            self.__devices(plan),
+        )
+        self.__waiting.append(run)
+        self.__waiting.sort(key=lambda waiting_run: waiting_run.sort_key)
+
+    # -------------------------------------------------------------------------
+    def start(self) -> None:
+        """Starts the runs waiting whose disks and CPU tokens are free.
+
+        A run whose disks are busy lets the next ones start, while the runs
+        wait once the CPU tokens are all granted.
+        """
+        for run in list(self.__waiting):
+            if self.__cpu_budget.available == 0:
+                break
+
+            if any(self.__busy_devices.get(dev, 0) >= self.__io_slots for dev in run.devices):
+                continue
+
+            self.__waiting.remove(run)
+            self.__startRun(run)
+
+    # -------------------------------------------------------------------------
+    def cancel(self) -> None:
+        """Drops the runs waiting and stops the runs started.
+
+        The runs started stop at their next check of the cancellation, and
+        give their resources back once their packer finishes.
+        """
+        self.__waiting.clear()
+        for run in self.__running:
+            run.cancel_token.cancel()
+
+        if not self.__running:
+            self.all_finished.emit()
+
+    # -------------------------------------------------------------------------
+    def __startRun(self, run: _Run) -> None:
+        run.tokens = self.__cpu_budget.acquire(self.__wantedTokens(run))
+        for dev in run.devices:
+            self.__busy_devices[dev] = self.__busy_devices.get(dev, 0) + 1
+        self.__running.append(run)
+
+        packer = self.__packer_factory(self.__grant(run.plan, run.tokens), run.cancel_token)
+        run.signals = packer.signals
+        self.run_started.emit(packer)
+        # Bound to the scheduler, so the run is released in the GUI thread,
+        # once the slots connected to the packer are done
+        packer.signals.finish.connect(self.__onRunFinished)
+
+        run.start_time = time.monotonic()
+        self.__thread_pool.start(packer)
+
+    # -------------------------------------------------------------------------
+    @Slot()
+    def __onRunFinished(self) -> None:
+        sender = self.sender()
+        run = next((run for run in self.__running if run.signals is sender), None)
+        if run is None:
+            return
+
+        self.__running.remove(run)
+        self.__durations[run.plan.raw_dest_file] = time.monotonic() - run.start_time
+        self.__cpu_budget.release(run.tokens)
+        for dev in run.devices:
+            self.__busy_devices[dev] -= 1
+            if self.__busy_devices[dev] == 0:
+                del self.__busy_devices[dev]
+
+        self.start()
+        if self.isIdle():
+            self.all_finished.emit()
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __devices(plan: RunPlan) -> frozenset[int]:
+        # A folder missing makes the run fail, whatever disk it waits for
+        devices = set()
+        for path in [plan.root_path, plan.destination_dir]:
+            try:
+                devices.add(os.stat(path).st_dev)
+            except OSError:
+                continue
+
+        return frozenset(devices)
+
+    # -------------------------------------------------------------------------
+    def __wantedTokens(self, run: _Run) -> int:
+        workers = getattr(run.plan.compression.options, "workers", 1)
+        if workers > 0:
+            return workers
+
+        # The run shares the cores with the runs still waiting
+        return max(self.__cpu_budget.capacity // (len(self.__waiting) + 1), 1)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __grant(plan: RunPlan, tokens: int) -> RunPlan:
+        # The compressors run as many workers as tokens granted
+        options = plan.compression.options
+        if getattr(options, "workers", None) in (None, tokens):
+            return plan
+
+        compression = dataclasses.replace(
+            plan.compression, options=dataclasses.replace(options, workers=tokens)
+        )
+        return dataclasses.replace(plan, compression=compression)
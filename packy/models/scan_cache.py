@@ -0,0 +1,234 @@
+"""Persistent cache of the directory listings read by integrity scans.
+
+This module stores, in a SQLite file, the entries of each directory listed
+by an integrity scan with the modification time the directory had. Adding,
+removing or renaming an entry changes the modification time of its
+directory, so a directory whose time did not change since it was listed can
+be compared from the cache without reading it again. Reopening a session
+then costs a ``stat`` per directory instead of a full listing.
+
+A cache which cannot be read or written behaves as an empty one: the scans
+are slower, never wrong.
+
+Typical usage example:
+
+  ScanCache.set_default(ScanCache(config.SCAN_CACHE_PATH))
+  report = IntegrityScanner(selection, cache=ScanCache.default()).scan()
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, final
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+
+# Modification time of a listing which must not be reused, as the directory
+# may change again without its modification time changing
+UNKNOWN_MTIME = -1
+
+# Delay in nanoseconds after which a change to a directory is sure to change
+# its modification time, the coarsest file systems storing it to 2 seconds
+MTIME_RESOLUTION_NS = 2_000_000_000
+
+# The cached listings are dropped when their layout changes
+SCHEMA_VERSION = 1
+
+# Delay in seconds to wait for the database when another scan writes to it
+LOCK_TIMEOUT = 5.0
+
+# Names cannot contain a slash, on any platform
+_NAMES_SEPARATOR = "/"
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class DirListing:
+    """The content of a directory read from the file system.
+
+    Attributes:
+        mtime_ns (int): Modification time of the directory before it was
+            read, in nanoseconds, or ``UNKNOWN_MTIME``.
+        dir_names (frozenset[str]): Names of the subdirectories to walk.
+        file_names (frozenset[str]): Names of the files.
+        link_names (frozenset[str]): Names of the links to directories, which
+            are not walked.
+    """
+
+    mtime_ns: int
+    dir_names: frozenset[str]
+    file_names: frozenset[str]
+    link_names: frozenset[str]
+
+
+###############################################################################
+@final
+class ScanCache:
+    """The directory listings of the previous scans, stored on disk.
+
+    A connection is opened by each call, so a cache can be shared by scans
+    running in different threads.
+
+    Attributes:
+        __default (ScanCache | None): The cache used by the integrity checks
+            of the application, if any.
+        __db_path (Path): The path to the SQLite file.
+    """
+
+    __default: ScanCache | None = None
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def default(cls) -> ScanCache | None:
+        """Returns the cache used by the integrity checks of the application.
+
+        Returns:
+            ScanCache | None: The default cache, None if the scans are not
+            cached.
+        """
+        return cls.__default
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def set_default(cls, cache: ScanCache | None) -> None:
+        """Sets the cache used by the integrity checks of the application.
+
+        Args:
+            cache (ScanCache | None): The default cache, None to stop caching
+                the scans.
+        """
+        cls.__default = cache
+
+    # -------------------------------------------------------------------------
+    def __init__(self, db_path: Path) -> None:
+        """Initializes the cache, creating its file if needed.
+
+        Args:
+            db_path (Path): The path to the SQLite file.
+        """
+        self.__db_path: Path = db_path
+
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self.__connect()) as connection, connection:
+                self.__createSchema(connection)
+        except (OSError, sqlite3.Error):
+            pass
+
+    # -------------------------------------------------------------------------
+    @property
+    def db_path(self) -> Path:
+        """The path to the SQLite file."""
+        return self.__db_path
+
+    # -------------------------------------------------------------------------
+    def load(self, roots: Iterable[str]) -> dict[str, DirListing]:
+        """Reads the cached listings of some folders and of their descendants.
+
+        Args:
+            roots (Iterable[str]): The paths of the folders.
+
+        Returns:
+            dict[str, DirListing]: The cached listings, by directory path.
+        """
+        listings: dict[str, DirListing] = {}
+
+        try:
+            with closing(self.__connect()) as connection:
+                for root in roots:
+                    rows = connection.execute(
+                        "SELECT path, mtime_ns, dir_names, file_names, link_names "
+                        "FROM directories WHERE path = ? OR (path >= ? AND path < ?)",
+                        (root, *self.__descendantsRange(root)),
+                    )
+                    for path, mtime_ns, dir_names, file_names, link_names in rows:
+                        listings[path] = DirListing(
+                            mtime_ns,
+                            self.__splitNames(dir_names),
+                            self.__splitNames(file_names),
+                            self.__splitNames(link_names),
+                        )
+        except sqlite3.Error:
+            return {}
+
+        return listings
+
+    # -------------------------------------------------------------------------
+    def update(self, listings: Mapping[str, DirListing], removed_dirs: Iterable[str]) -> None:
+        """Stores new listings and forgets the directories which are gone.
+
+        Both are written in a single transaction.
+
+        Args:
+            listings (Mapping[str, DirListing]): The listings read, by
+                directory path.
+            removed_dirs (Iterable[str]): The directories to forget, with
+                their descendants.
+        """
+        try:
+            with closing(self.__connect()) as connection, connection:
+                for dir_path in removed_dirs:
+                    connection.execute(
+                        "DELETE FROM directories WHERE path = ? OR (path >= ? AND path < ?)",
+                        (dir_path, *self.__descendantsRange(dir_path)),
+                    )
+
+                connection.executemany(
+                    "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (
+                            dir_path,
+                            listing.mtime_ns,
+                            _NAMES_SEPARATOR.join(listing.dir_names),
+                            _NAMES_SEPARATOR.join(listing.file_names),
+                            _NAMES_SEPARATOR.join(listing.link_names),
+                        )
+                        for dir_path, listing in listings.items()
+                    ),
+                )
+        except sqlite3.Error:
+            pass
+
+    # -------------------------------------------------------------------------
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.__db_path, timeout=LOCK_TIMEOUT)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __createSchema(connection: sqlite3.Connection) -> None:
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            connection.execute("DROP TABLE IF EXISTS directories")
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS directories ("
+            "path TEXT PRIMARY KEY, "
+            "mtime_ns INTEGER NOT NULL, "
+            "dir_names TEXT NOT NULL, "
+            "file_names TEXT NOT NULL, "
+            "link_names TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __descendantsRange(dir_path: str) -> tuple[str, str]:
+        # The paths starting with "dir_path/" sort between it and "dir_path0",
+        # "0" following "/", so the primary key index finds them
+        prefix = dir_path if dir_path.endswith("/") else dir_path + "/"
+        return prefix, prefix[:-1] + "0"
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __splitNames(names: str) -> frozenset[str]:
+        return frozenset(names.split(_NAMES_SEPARATOR)) if names else frozenset()
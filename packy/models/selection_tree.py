@@ -0,0 +1,530 @@
+"""Check states of the items selected in a directory tree.
+
+This module stores the check state of files and directories in a path trie.
+The selection is sparse: a checked directory means everything below it,
+except the items explicitly unchecked, and the other way around. Only these
+explicit marks are stored, so checking the root of a large tree records a
+single item. The state of an item resolves through its nearest marked
+ancestor, and each node counts the marks below it, so the ancestors of a
+changed item are updated in O(depth).
+
+The module does not depend on Qt, so a selection can be read and changed
+outside of the GUI thread.
+
+Typical usage example:
+
+  selection = SelectionTree("/home/user/documents")
+  changed_paths = selection.set_state("/home/user/documents/report.txt", CheckState.CHECKED)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+from collections.abc import Iterator
+from enum import IntEnum
+from typing import final
+
+
+###############################################################################
+class CheckState(IntEnum):
+    """Check state of an item, with the values of ``Qt.CheckState``."""
+
+    UNCHECKED = 0
+    PARTIALLY_CHECKED = 1
+    CHECKED = 2
+
+
+###############################################################################
+@final
+class _Node:
+    """An item of the tree.
+
+    Attributes:
+        name (str): Name of the item in its parent directory.
+        parent (_Node | None): The parent directory, None for the tree root.
+        children (dict[str, _Node]): The children created so far, by name.
+        mark (CheckState | None): The explicit state, always different from
+            the inherited one, None if the item inherits its state.
+        known (bool): True if the item was seen in the file system.
+        nb_known (int): Number of children seen in the file system.
+        nb_marks (int): Number of marks below the item.
+        nb_clean_checked (int): Number of children marked as checked with no
+            mark below them.
+        nb_clean_unchecked (int): Number of children marked as unchecked with
+            no mark below them.
+    """
+
+    __slots__ = (
+        "children",
+        "known",
+        "mark",
+        "name",
+        "nb_clean_checked",
+        "nb_clean_unchecked",
+        "nb_known",
+        "nb_marks",
+        "parent",
+    )
+
+    # -------------------------------------------------------------------------
+    def __init__(self, name: str, parent: _Node | None) -> None:
+        self.name: str = name
+        self.parent: _Node | None = parent
+        self.children: dict[str, _Node] = {}
+        self.mark: CheckState | None = None
+        self.known: bool = False
+        self.nb_known: int = 0
+        self.nb_marks: int = 0
+        self.nb_clean_checked: int = 0
+        self.nb_clean_unchecked: int = 0
+
+
+###############################################################################
+@final
+class SelectionTree:
+    """Check states of the items of a directory tree.
+
+    An item inherits the state of its nearest marked ancestor, and is
+    unchecked if there is none. An item with marks below it is partially
+    checked. Checking or unchecking an item drops the marks below it, and a
+    directory whose children are all known and marked the same way takes
+    their state, up to the root folder, which itself is never marked. The
+    items read from a sparse selection are not known, so a directory holding
+    some never takes their state: its other items may have another one.
+
+    Paths are stored with forward slashes, as ``QFileSystemModel`` returns
+    them.
+
+    Attributes:
+        __root_path (str): The root folder of the selection.
+        __tree_root (_Node): The node above the first path component.
+        __revision (int): Number of changes made to the selection.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, root_path: str = "") -> None:
+        """Initializes an empty selection.
+
+        Args:
+            root_path (str): The root folder of the selection. Defaults to "".
+        """
+        self.__root_path: str = self.__normalize(root_path)
+        self.__tree_root: _Node = _Node("", None)
+        self.__revision: int = 0
+
+    # -------------------------------------------------------------------------
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SelectionTree):
+            return NotImplemented
+
+        return self.__root_path == other.__root_path and self.checks() == other.checks()
+
+    # -------------------------------------------------------------------------
+    __hash__ = None  # pyright: ignore[reportAssignmentType] mutable content
+
+    # -------------------------------------------------------------------------
+    @property
+    def root_path(self) -> str:
+        """The root folder of the selection."""
+        return self.__root_path
+
+    # -------------------------------------------------------------------------
+    @property
+    def revision(self) -> int:
+        """Number of changes made so far, to tell whether the selection changed."""
+        return self.__revision
+
+    # -------------------------------------------------------------------------
+    def reset(self, root_path: str) -> None:
+        """Clears the selection and changes its root folder.
+
+        Args:
+            root_path (str): The new root folder.
+        """
+        self.__root_path = self.__normalize(root_path)
+        self.__tree_root = _Node("", None)
+        self.__revision += 1
+
+    # -------------------------------------------------------------------------
+    def state(self, path: str) -> CheckState:
+        """Returns the check state of an item.
+
+        Args:
+            path (str): Path of the item.
+
+        Returns:
+            CheckState: The state of the item, resolved through its ancestors.
+        """
+        node = self.__tree_root
+        state = CheckState.UNCHECKED
+
+        for name in self.__components(path):
+            node = node.children.get(name)
+            if node is None:
+                return state
+            if node.mark is not None:
+                state = node.mark
+
+        return CheckState.PARTIALLY_CHECKED if node.nb_marks else state
+
+    # -------------------------------------------------------------------------
+    def is_known(self, path: str) -> bool:
+        """Tells whether an item was seen in the file system.
+
+        Args:
+            path (str): Path of the item.
+
+        Returns:
+            bool: True if the item was registered or loaded from a listing.
+        """
+        node = self.__find(path)
+        return node is not None and node.known
+
+    # -------------------------------------------------------------------------
+    def is_listed(self, path: str) -> bool:
+        """Tells whether the content of a directory is known.
+
+        A directory selected as a whole whose content was never shown has no
+        known children.
+
+        Args:
+            path (str): Path of the directory.
+
+        Returns:
+            bool: True if at least one child of the directory is known.
+        """
+        node = self.__find(path)
+        return node is not None and node.nb_known > 0
+
+    # -------------------------------------------------------------------------
+    def register(self, path: str) -> None:
+        """Records that an item was seen in the file system.
+
+        Args:
+            path (str): Path of the item.
+        """
+        node = self.__find(path, create=True)
+        if not node.known:
+            self.__set_known(node)
+            self.__revision += 1
+
+    # -------------------------------------------------------------------------
+    def set_state(self, path: str, state: CheckState | int) -> list[str]:
+        """Checks or unchecks an item, with everything below it.
+
+        A partially checked state only results from the states below an
+        item, so setting it changes nothing.
+
+        Args:
+            path (str): Path of the item.
+            state (CheckState | int): The new state.
+
+        Returns:
+            list[str]: Paths of the item and of its ancestors below the root
+            folder whose state changed, from the item up.
+        """
+        state = CheckState(state)
+        if state == CheckState.PARTIALLY_CHECKED:
+            return []
+
+        node = self.__find(path, create=True)
+        self.__revision += 1
+        chain = self.__chain(node)
+        previous_states = self.__chain_states(chain)
+
+        self.__apply(node, state)
+
+        # A directory whose children are all marked the same way takes
+        # their state, so the marks stay as few as possible. Its listing
+        # must be complete, the other items inheriting the new state too.
+        root_node = self.__find(self.__root_path) if self.__root_path else None
+        parent = node.parent
+        while (
+            parent is not None
+            and parent.parent is not None
+            and parent is not root_node
+            and parent.nb_known == len(parent.children)
+            and self.__nb_clean(parent, state) == len(parent.children)
+        ):
+            self.__apply(parent, state)
+            parent = parent.parent
+
+        changed_paths = []
+        for chain_node, previous_state, new_state in zip(
+            reversed(chain), reversed(previous_states), reversed(self.__chain_states(chain))
+        ):
+            # The root folder and its ancestors are not part of the selection
+            if chain_node is root_node:
+                break
+            if previous_state != new_state:
+                changed_paths.append(self.__path(chain_node))
+
+        return changed_paths
+
+    # -------------------------------------------------------------------------
+    def remove(self, path: str) -> None:
+        """Forgets an item and the marks below it.
+
+        Args:
+            path (str): Path of the item.
+        """
+        node = self.__find(path)
+        if node is None or node.parent is None:
+            return
+
+        self.__clear_marks(node)
+        self.__set_mark(node, None)
+        if node.known:
+            node.parent.nb_known -= 1
+        del node.parent.children[node.name]
+        self.__revision += 1
+
+    # -------------------------------------------------------------------------
+    def checks(self) -> dict[str, int]:
+        """Returns the explicit states.
+
+        Returns:
+            dict[str, int]: The state value of each marked item, by path.
+        """
+        checks = {}
+        stack = [self.__tree_root]
+
+        while stack:
+            node = stack.pop()
+            if node.mark is not None:
+                checks[self.__path(node)] = int(node.mark)
+            stack.extend(
+                child
+                for child in node.children.values()
+                if child.mark is not None or child.nb_marks
+            )
+
+        return checks
+
+    # -------------------------------------------------------------------------
+    def checked_roots(self) -> Iterator[str]:
+        """Yields the topmost fully checked items.
+
+        Everything below these items is checked, and they do not overlap.
+        The checked content of a partially checked directory is only
+        covered through its known children.
+
+        Returns:
+            Iterator[str]: The paths of the checked items without marks
+            below them nor a checked ancestor.
+        """
+        stack = [(child, CheckState.UNCHECKED) for child in self.__tree_root.children.values()]
+
+        while stack:
+            node, inherited_state = stack.pop()
+            state = inherited_state if node.mark is None else node.mark
+
+            # Below an item without marks, everything has its state
+            if not node.nb_marks:
+                if state == CheckState.CHECKED:
+                    yield self.__path(node)
+                continue
+
+            stack.extend((child, state) for child in node.children.values())
+
+    # -------------------------------------------------------------------------
+    def known_children(self, path: str) -> frozenset[str]:
+        """Returns the names of the known children of a directory.
+
+        Args:
+            path (str): Path of the directory.
+
+        Returns:
+            frozenset[str]: The names, empty if the content is not known.
+        """
+        node = self.__find(path)
+        if node is None:
+            return frozenset()
+
+        return frozenset(name for name, child in node.children.items() if child.known)
+
+    # -------------------------------------------------------------------------
+    def listed_directories(self, path: str) -> Iterator[str]:
+        """Yields a directory and its subdirectories with known children.
+
+        Args:
+            path (str): Path of the directory.
+
+        Returns:
+            Iterator[str]: The paths of the directories.
+        """
+        node = self.__find(path)
+        stack = [node] if node is not None else []
+
+        while stack:
+            node = stack.pop()
+            if any(child.known for child in node.children.values()):
+                yield self.__path(node)
+            stack.extend(child for child in node.children.values() if child.children)
+
+    # -------------------------------------------------------------------------
+    def load(self, checks: dict[str, int], sparse: bool = True) -> None:
+        """Records the states read from a serialized selection.
+
+        Args:
+            checks (dict[str, int]): The state value of items, by path.
+            sparse (bool): False if the states were written for every item
+                shown at the time, which are then known. Defaults to True.
+        """
+        # Parents first, so the marks of their children are compared to
+        # the state they inherit
+        for path, value in sorted(checks.items(), key=lambda item: len(self.__components(item[0]))):
+            node = self.__find(path, create=True)
+            if not sparse and not node.known:
+                self.__set_known(node)
+
+            state = CheckState(value)
+            if state != CheckState.PARTIALLY_CHECKED:
+                self.__set_mark(node, None if self.__inherited(node) == state else state)
+
+        self.__revision += 1
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __normalize(path: str) -> str:
+        if os.sep != "/":
+            path = path.replace(os.sep, "/")
+        return path.rstrip("/") if path != "/" else path
+
+    # -------------------------------------------------------------------------
+    def __components(self, path: str) -> list[str]:
+        path = self.__normalize(path)
+        # A leading slash gives an empty first component, the POSIX root
+        return path.split("/") if path != "/" else [""]
+
+    # -------------------------------------------------------------------------
+    def __find(self, path: str, create: bool = False) -> _Node | None:
+        node = self.__tree_root
+
+        for name in self.__components(path):
+            child = node.children.get(name)
+            if child is None:
+                if not create:
+                    return None
+                child = _Node(name, node)
+                node.children[name] = child
+            node = child
+
+        return node
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __path(node: _Node) -> str:
+        names = []
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+
+        path = "/".join(reversed(names))
+        return path if path else "/"
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __chain(node: _Node) -> list[_Node]:
+        # The node and its ancestors, from the first path component down
+        chain = []
+        while node.parent is not None:
+            chain.append(node)
+            node = node.parent
+
+        chain.reverse()
+        return chain
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __chain_states(chain: list[_Node]) -> list[CheckState]:
+        states = []
+        inherited_state = CheckState.UNCHECKED
+
+        for node in chain:
+            if node.mark is not None:
+                inherited_state = node.mark
+            states.append(CheckState.PARTIALLY_CHECKED if node.nb_marks else inherited_state)
+
+        return states
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __inherited(node: _Node) -> CheckState:
+        ancestor = node.parent
+        while ancestor is not None:
+            if ancestor.mark is not None:
+                return ancestor.mark
+            ancestor = ancestor.parent
+
+        return CheckState.UNCHECKED
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __nb_clean(node: _Node, state: CheckState) -> int:
+        if state == CheckState.CHECKED:
+            return node.nb_clean_checked
+        return node.nb_clean_unchecked
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __set_known(node: _Node) -> None:
+        node.known = True
+        if node.parent is not None:
+            node.parent.nb_known += 1
+
+    # -------------------------------------------------------------------------
+    def __apply(self, node: _Node, state: CheckState) -> None:
+        self.__clear_marks(node)
+        self.__set_mark(node, None if self.__inherited(node) == state else state)
+
+    # -------------------------------------------------------------------------
+    def __clear_marks(self, node: _Node) -> None:
+        # Only the branches holding marks are visited
+        stack = [
+            child for child in node.children.values() if child.mark is not None or child.nb_marks
+        ]
+
+        while stack:
+            descendant = stack.pop()
+            stack.extend(
+                child
+                for child in descendant.children.values()
+                if child.mark is not None or child.nb_marks
+            )
+            self.__set_mark(descendant, None)
+
+    # -------------------------------------------------------------------------
+    def __set_mark(self, node: _Node, mark: CheckState | None) -> None:
+        if node.mark == mark:
+            return
+
+        delta = (mark is not None) - (node.mark is not None)
+
+        self.__count_clean(node, -1)
+        node.mark = mark
+        self.__count_clean(node, 1)
+
+        if delta:
+            ancestor = node.parent
+            while ancestor is not None:
+                self.__count_clean(ancestor, -1)
+                ancestor.nb_marks += delta
+                self.__count_clean(ancestor, 1)
+                ancestor = ancestor.parent
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __count_clean(node: _Node, increment: int) -> None:
+        parent = node.parent
+        if parent is None or node.mark is None or node.nb_marks:
+            return
+
+        if node.mark == CheckState.CHECKED:
+            parent.nb_clean_checked += increment
+        else:
+            parent.nb_clean_unchecked += increment
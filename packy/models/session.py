@@ -95,7 +95,7 @@ class Session(QAbstractTableModel):
 
     def taskRowById(self, id: int) -> int:
         for row_num, task in enumerate(self.__tasks):
-            if task.id() == id:
+            if task.id == id:
                 return row_num
 
         return -1
@@ -214,7 +214,7 @@ class Session(QAbstractTableModel):
 
         task_id = 0
         if len(self.__tasks) > 0:
-            task_id = self.__tasks[-1].id() + 1
+            task_id = self.__tasks[-1].id + 1
 
         task = TasksModel(task_id)
         self.__tasks.append(task)
@@ -252,6 +252,14 @@ class Session(QAbstractTableModel):
             col = 1
             self.dataChanged.emit(self.index(row, col), self.index(row, col))
 
+    # -------------------------------------------------------------------------
+    def emitSelectionChanged(self, task_selection) -> None:
+        # The warnings of the selection changed, the row of its task is repainted
+        for task in self.__tasks:
+            if task.filesSelected() is task_selection:
+                self.emitDataChanged(task.id)
+                break
+
             # -------------------------------------------------------------------------
 
     def emitSuffixChanged(self) -> None:
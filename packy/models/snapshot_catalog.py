@@ -0,0 +1,334 @@
+"""Index of the snapshots written in the destination folders.
+
+This module lists each destination folder once and keeps, for each series
+of snapshots of a task, their names sorted by version number or by date. The
+index is updated by the packers creating and deleting snapshots, so naming
+the next snapshot or finding the oldest ones no longer lists the folder.
+The time of each snapshot, read from its date suffix, or else from the run
+time recorded in its manifest or its modification time, is kept as well once
+asked for by the retention policy.
+
+A folder changed by another program is listed again: its modification time
+is compared, with a single ``stat``, each time the index is read. A folder
+changed just before is listed again until its modification time is sure to
+change with its content.
+
+Typical usage example:
+
+  catalog = SnapshotCatalog.default()
+  last_id = catalog.lastVersion(series)
+  catalog.add(destination_file)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import bisect
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import final
+
+# PackY
+from packy.core.settings import PreferencesTask
+from packy.models.scan_cache import MTIME_RESOLUTION_NS, UNKNOWN_MTIME
+from packy.models.snapshot_manifest import SnapshotManifest
+
+# Sort key of the snapshots of a series without suffix
+_NO_SUFFIX_KEY = ""
+
+# Format of the date suffix of the snapshots
+_DATE_SUFFIX_FORMAT = "%Y_%m_%d"
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class SnapshotSeries:
+    """The snapshots of a task, named after the same destination.
+
+    Attributes:
+        dir_path (str): The folder holding the snapshots.
+        raw_basename (str): The name chosen by the user, without suffix nor
+            extension.
+        suffix (PreferencesTask): The kind of suffix added to the name.
+        extension (str): The extension of the snapshots, without the dot.
+    """
+
+    dir_path: str
+    raw_basename: str
+    suffix: PreferencesTask
+    extension: str
+
+    # -------------------------------------------------------------------------
+    @property
+    def pattern(self) -> str:
+        """Regular expression fully matching the names of the snapshots.
+
+        The suffix is captured, so the manifests next to the snapshots are
+        left out by a full match.
+        """
+        match self.suffix:
+            case PreferencesTask.SUFFIX_CURR_DATE:
+                suffix_pattern = "_([0-9]{4}_[0-9]{2}_[0-9]{2})"
+            case PreferencesTask.SUFFIX_VERSION_NUM:
+                suffix_pattern = "_([0-9]+)"
+            case _:
+                suffix_pattern = "()"
+
+        return re.escape(self.raw_basename) + suffix_pattern + re.escape("." + self.extension)
+
+    # -------------------------------------------------------------------------
+    def sortKey(self, suffix: str) -> int | str:
+        """Returns the key sorting a snapshot from the oldest to the newest.
+
+        Args:
+            suffix (str): The suffix captured by the pattern.
+
+        Returns:
+            int | str: The version number, the date, which sorts as a string,
+            or an empty string for a series without suffix.
+        """
+        match self.suffix:
+            case PreferencesTask.SUFFIX_VERSION_NUM:
+                return int(suffix)
+            case PreferencesTask.SUFFIX_CURR_DATE:
+                return suffix
+            case _:
+                return _NO_SUFFIX_KEY
+
+    # -------------------------------------------------------------------------
+    def time(self, sort_key: int | str, path: str) -> datetime | None:
+        """Returns the time a snapshot was written.
+
+        Args:
+            sort_key (int | str): The sort key of the snapshot.
+            path (str): The path of the snapshot.
+
+        Returns:
+            datetime | None: The date of its suffix, or else the time of the
+            run recorded in its manifest, or else its modification time. None
+            if the snapshot no longer exists.
+        """
+        if self.suffix == PreferencesTask.SUFFIX_CURR_DATE:
+            return datetime.strptime(str(sort_key), _DATE_SUFFIX_FORMAT)
+
+        # A snapshot linked to an older one when nothing changed shares its
+        # modification time, but not its manifest
+        manifest = SnapshotManifest.load(SnapshotManifest.pathFor(path), with_records=False)
+        if manifest is not None and manifest.run_time is not None:
+            return datetime.fromtimestamp(manifest.run_time)
+
+        try:
+            return datetime.fromtimestamp(os.stat(path).st_mtime)
+        except OSError:
+            return None
+
+
+###############################################################################
+@dataclass(slots=True)
+class _IndexedFolder:
+    """The snapshots found in a destination folder.
+
+    Attributes:
+        mtime_ns (int): Modification time of the folder when it was last
+            listed or changed by the catalog, or ``UNKNOWN_MTIME``.
+        names (set[str]): The names of the entries of the folder.
+        series (dict[SnapshotSeries, list[tuple[int | str, str]]]): The sort
+            key and name of the snapshots of each series read, sorted.
+        times (dict[str, datetime]): The time of the snapshots read, by name.
+    """
+
+    mtime_ns: int
+    names: set[str]
+    series: dict[SnapshotSeries, list[tuple[int | str, str]]] = field(default_factory=dict)
+    times: dict[str, datetime] = field(default_factory=dict)
+
+
+###############################################################################
+@final
+class SnapshotCatalog:
+    """The snapshots of the destination folders, sorted by series.
+
+    The catalog is shared by the views naming the snapshots and by the
+    packers running in worker threads, so its methods are thread safe.
+
+    Attributes:
+        __default (SnapshotCatalog | None): The catalog of the application,
+            created when first used.
+        __default_lock (threading.Lock): Guards the creation of the default
+            catalog.
+        __lock (threading.Lock): Guards the folders.
+        __folders (dict[str, _IndexedFolder]): The folders listed, by
+            normalized path.
+    """
+
+    __default: SnapshotCatalog | None = None
+    __default_lock: threading.Lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def default(cls) -> SnapshotCatalog:
+        """Returns the catalog of the application."""
+        with cls.__default_lock:
+            if cls.__default is None:
+                cls.__default = SnapshotCatalog()
+            return cls.__default
+
+    # -------------------------------------------------------------------------
+    def __init__(self) -> None:
+        """Initializes the catalog, without any folder listed."""
+        self.__lock: threading.Lock = threading.Lock()
+        self.__folders: dict[str, _IndexedFolder] = {}
+
+    # -------------------------------------------------------------------------
+    def snapshots(self, series: SnapshotSeries) -> list[str]:
+        """Returns the names of the snapshots of a series.
+
+        Args:
+            series (SnapshotSeries): The series.
+
+        Returns:
+            list[str]: The names, from the oldest snapshot to the newest.
+        """
+        with self.__lock:
+            return [name for _, name in self.__series(series)]
+
+    # -------------------------------------------------------------------------
+    def lastVersion(self, series: SnapshotSeries) -> int:
+        """Returns the highest version number of a numbered series.
+
+        Args:
+            series (SnapshotSeries): The series, numbered.
+
+        Returns:
+            int: The version number of the newest snapshot, -1 if there is
+            none.
+        """
+        with self.__lock:
+            snapshots = self.__series(series)
+            return snapshots[-1][0] if snapshots else -1
+
+    # -------------------------------------------------------------------------
+    def times(self, series: SnapshotSeries) -> list[tuple[str, datetime]]:
+        """Returns the names of the snapshots of a series with their time.
+
+        The times are read once, the first time they are asked for, so a
+        series pruned at each run is not read again.
+
+        Args:
+            series (SnapshotSeries): The series.
+
+        Returns:
+            list[tuple[str, datetime]]: The names and times, from the oldest
+            snapshot to the newest, without the snapshots deleted meanwhile.
+        """
+        with self.__lock:
+            snapshots = self.__series(series)
+            times = self.__folders[os.path.normpath(series.dir_path)].times
+
+            result = []
+            for sort_key, name in snapshots:
+                snapshot_time = times.get(name)
+                if snapshot_time is None:
+                    snapshot_time = series.time(sort_key, os.path.join(series.dir_path, name))
+                    if snapshot_time is None:
+                        continue
+                    times[name] = snapshot_time
+                result.append((name, snapshot_time))
+
+            return result
+
+    # -------------------------------------------------------------------------
+    def add(self, path: str) -> None:
+        """Records a snapshot written by the application.
+
+        Args:
+            path (str): The path of the snapshot.
+        """
+        self.__update(path, is_added=True)
+
+    # -------------------------------------------------------------------------
+    def remove(self, path: str) -> None:
+        """Forgets a snapshot deleted by the application.
+
+        Args:
+            path (str): The path of the snapshot.
+        """
+        self.__update(path, is_added=False)
+
+    # -------------------------------------------------------------------------
+    def __update(self, path: str, is_added: bool) -> None:
+        dir_path, name = os.path.split(os.path.normpath(path))
+
+        with self.__lock:
+            # A folder never read is listed when it is
+            folder = self.__folders.get(dir_path)
+            if folder is None:
+                return
+
+            if is_added:
+                folder.names.add(name)
+            else:
+                folder.names.discard(name)
+            folder.times.pop(name, None)
+
+            for series, snapshots in folder.series.items():
+                match = re.fullmatch(series.pattern, name)
+                if match is None:
+                    continue
+
+                entry = (series.sortKey(match.group(1)), name)
+                index = bisect.bisect_left(snapshots, entry)
+                is_found = index < len(snapshots) and snapshots[index] == entry
+                if is_added and not is_found:
+                    snapshots.insert(index, entry)
+                elif not is_added and is_found:
+                    del snapshots[index]
+
+            folder.mtime_ns = self.__stamp(dir_path)
+
+    # -------------------------------------------------------------------------
+    def __series(self, series: SnapshotSeries) -> list[tuple[int | str, str]]:
+        dir_path = os.path.normpath(series.dir_path)
+        folder = self.__folders.get(dir_path)
+        mtime_ns = self.__stamp(dir_path)
+
+        if folder is None or folder.mtime_ns == UNKNOWN_MTIME or folder.mtime_ns != mtime_ns:
+            folder = _IndexedFolder(mtime_ns, self.__listDir(dir_path))
+            self.__folders[dir_path] = folder
+
+        snapshots = folder.series.get(series)
+        if snapshots is None:
+            pattern = re.compile(series.pattern)
+            matches = filter(None, map(pattern.fullmatch, folder.names))
+            snapshots = sorted((series.sortKey(m.group(1)), m.group(0)) for m in matches)
+            folder.series[series] = snapshots
+
+        return snapshots
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __listDir(dir_path: str) -> set[str]:
+        try:
+            return set(os.listdir(dir_path))
+        except OSError:
+            return set()
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def __stamp(dir_path: str) -> int:
+        # A folder changed just before it was read may change again without
+        # its modification time changing
+        stamp_time_ns = time.time_ns()
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return UNKNOWN_MTIME
+
+        return UNKNOWN_MTIME if stamp_time_ns - mtime_ns < MTIME_RESOLUTION_NS else mtime_ns
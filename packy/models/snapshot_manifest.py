@@ -0,0 +1,318 @@
+"""Manifest of the source tree packed into a snapshot.
+
+This module provides a compact record of every item packed into a snapshot,
+with the metadata telling whether it changed since: size, modification time
+and inode. The manifest is written next to the snapshot, so the next run can
+compare a fresh walk of the source tree against it without reading any file
+content.
+
+A snapshot is either full, or incremental: it then only holds the items
+added or modified since a base full snapshot, and the list of the items
+deleted since, stored in the archive under ``TOMBSTONE_ARCNAME``. The
+manifest always records the whole source tree, whatever the snapshot kind.
+
+Typical usage example:
+
+  manifest = SnapshotManifest.scan(entries, config)
+  if manifest == SnapshotManifest.load(SnapshotManifest.pathFor(previous_file)):
+      ...
+  manifest.save(SnapshotManifest.pathFor(destination_file))
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import gzip
+import io
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Self, final
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Iterable
+
+    # PackY
+    from packy.models.packer import PackEntry
+
+MANIFEST_EXTENSION = ".manifest"
+MANIFEST_VERSION = 1
+
+# Member of an incremental snapshot listing the items deleted since its base
+TOMBSTONE_ARCNAME = ".packy_deleted"
+
+
+###############################################################################
+@dataclass(frozen=True, slots=True)
+class ManifestRecord:
+    """Metadata of an item of the source tree at packing time.
+
+    Attributes:
+        size (int): Size in bytes, 0 for a directory.
+        mtime_ns (int): Modification time in nanoseconds.
+        inode (int): Inode number, which changes when the item is replaced.
+        is_dir (bool): True if the item is a directory.
+    """
+
+    size: int
+    mtime_ns: int
+    inode: int
+    is_dir: bool
+
+
+###############################################################################
+@final
+class SnapshotManifest:
+    """The items packed into a snapshot and the settings used to pack them.
+
+    Two manifests are equal when the same items, with the same metadata, were
+    packed with the same archiver configuration. The snapshot of one can then
+    stand in for the other.
+
+    The manifest is stored as gzip-compressed JSON lines: a header line
+    followed by one line per item, so the header can be read on its own.
+
+    Attributes:
+        __config (str): Fingerprint of the archiver configuration.
+        __records (dict[str, ManifestRecord]): The records by archive name.
+        __base (str | None): File name of the base full snapshot, None if the
+            snapshot is full.
+        __index (int): Number of incremental snapshots since the base, this
+            one included. 0 if the snapshot is full.
+        __run_time (float | None): Time of the run packing the snapshot, in
+            seconds since the epoch, None if unknown.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        config: str,
+        records: dict[str, ManifestRecord],
+        base: str | None = None,
+        index: int = 0,
+        run_time: float | None = None,
+    ) -> None:
+        """Initializes the manifest.
+
+        Args:
+            config (str): Fingerprint of the archiver configuration.
+            records (dict[str, ManifestRecord]): The records by archive name.
+            base (str | None): File name of the base full snapshot, None if
+                the snapshot is full. Defaults to None.
+            index (int): Number of incremental snapshots since the base, this
+                one included. Defaults to 0.
+            run_time (float | None): Time of the run packing the snapshot, in
+                seconds since the epoch, None if unknown. Defaults to None.
+        """
+        self.__config: str = config
+        self.__records: dict[str, ManifestRecord] = records
+        self.__base: str | None = base
+        self.__index: int = index
+        self.__run_time: float | None = run_time
+
+    # -------------------------------------------------------------------------
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SnapshotManifest):
+            return NotImplemented
+
+        return self.__config == other.__config and self.__records == other.__records
+
+    # -------------------------------------------------------------------------
+    __hash__ = None  # pyright: ignore[reportAssignmentType] mutable content
+
+    # -------------------------------------------------------------------------
+    @property
+    def config(self) -> str:
+        """Fingerprint of the archiver configuration."""
+        return self.__config
+
+    # -------------------------------------------------------------------------
+    @property
+    def records(self) -> dict[str, ManifestRecord]:
+        """The records by archive name."""
+        return self.__records
+
+    # -------------------------------------------------------------------------
+    @property
+    def base(self) -> str | None:
+        """File name of the base full snapshot, None if the snapshot is full."""
+        return self.__base
+
+    # -------------------------------------------------------------------------
+    @property
+    def index(self) -> int:
+        """Number of incremental snapshots since the base, 0 if full."""
+        return self.__index
+
+    # -------------------------------------------------------------------------
+    @property
+    def run_time(self) -> float | None:
+        """Time of the run packing the snapshot, None if unknown.
+
+        A snapshot linked to an older one shares its modification time, so
+        the time of the run is recorded here.
+        """
+        return self.__run_time
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def pathFor(snapshot_path: str) -> str:
+        """Returns the path of the manifest written next to a snapshot.
+
+        Args:
+            snapshot_path (str): Path of the snapshot.
+
+        Returns:
+            str: Path of its manifest.
+        """
+        return snapshot_path + MANIFEST_EXTENSION
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def arcnameKey(arcname: str) -> str:
+        """Returns the key of an archive name in the records.
+
+        Args:
+            arcname (str): Name of the item in the archive.
+
+        Returns:
+            str: The name with forward slashes, whatever the platform.
+        """
+        return arcname.replace(os.sep, "/")
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def scan(cls, entries: Iterable[PackEntry], config: str) -> Self:
+        """Reads the metadata of the entries from the source tree.
+
+        Args:
+            entries (Iterable[PackEntry]): The entries to pack.
+            config (str): Fingerprint of the archiver configuration.
+
+        Returns:
+            SnapshotManifest: The manifest of a full snapshot of the entries,
+            packed by a run starting now.
+        """
+        run_time = time.time()
+        records: dict[str, ManifestRecord] = {}
+
+        for entry in entries:
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                # Dangling link, packed as a link by the tar packers
+                stat = os.lstat(entry.path)
+
+            size = 0 if entry.is_dir else stat.st_size
+            records[cls.arcnameKey(entry.arcname)] = ManifestRecord(
+                size, stat.st_mtime_ns, stat.st_ino, entry.is_dir
+            )
+
+        return cls(config, records, run_time=run_time)
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def load(cls, path: str, with_records: bool = True) -> Self | None:
+        """Reads a manifest written by save.
+
+        Args:
+            path (str): Path of the manifest.
+            with_records (bool): False to only read the header, leaving the
+                records empty. Defaults to True.
+
+        Returns:
+            SnapshotManifest | None: The manifest, or None if it is missing,
+            unreadable or written by an unknown version.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                header = json.loads(file.readline())
+                if not isinstance(header, dict) or header.get("version") != MANIFEST_VERSION:
+                    return None
+
+                records: dict[str, ManifestRecord] = {}
+                if with_records:
+                    for line in file:
+                        arcname, size, mtime_ns, inode, is_dir = json.loads(line)
+                        records[arcname] = ManifestRecord(size, mtime_ns, inode, bool(is_dir))
+
+                return cls(
+                    header["config"],
+                    records,
+                    header.get("base"),
+                    header.get("index", 0),
+                    header.get("run_time"),
+                )
+        except (OSError, EOFError, KeyError, TypeError, ValueError):
+            return None
+
+    # -------------------------------------------------------------------------
+    def derive(self, base: str | None, index: int) -> Self:
+        """Returns the same records as another kind of snapshot.
+
+        Args:
+            base (str | None): File name of the base full snapshot, None if
+                the snapshot is full.
+            index (int): Number of incremental snapshots since the base.
+
+        Returns:
+            SnapshotManifest: The new manifest.
+        """
+        return type(self)(self.__config, self.__records, base, index, self.__run_time)
+
+    # -------------------------------------------------------------------------
+    def diff(self, base: SnapshotManifest) -> tuple[set[str], list[str]]:
+        """Compares the source tree against the one of a base snapshot.
+
+        Args:
+            base (SnapshotManifest): The manifest of the base snapshot.
+
+        Returns:
+            tuple[set[str], list[str]]: The archive names of the items added
+            or modified since the base, and the sorted archive names of the
+            items deleted since.
+        """
+        changed = {
+            arcname
+            for arcname, record in self.__records.items()
+            if base.__records.get(arcname) != record
+        }
+        deleted = sorted(base.__records.keys() - self.__records.keys())
+
+        return changed, deleted
+
+    # -------------------------------------------------------------------------
+    def save(self, path: str) -> None:
+        """Writes the manifest.
+
+        The manifest is written to a temporary file first, so an interrupted
+        run never leaves a truncated manifest behind.
+
+        Args:
+            path (str): Path of the manifest.
+        """
+        header = {
+            "version": MANIFEST_VERSION,
+            "config": self.__config,
+            "base": self.__base,
+            "index": self.__index,
+            "run_time": self.__run_time,
+        }
+
+        tmp_path = path + ".tmp"
+        with (
+            open(tmp_path, "wb") as raw_file,  # noqa: PTH123
+            gzip.GzipFile(fileobj=raw_file, mode="wb", mtime=0) as gz_file,
+            io.TextIOWrapper(gz_file, encoding="utf-8", newline="\n") as file,
+        ):
+            file.write(json.dumps(header, separators=(",", ":")) + "\n")
+            for arcname, record in self.__records.items():
+                line = [arcname, record.size, record.mtime_ns, record.inode, int(record.is_dir)]
+                file.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+        os.replace(tmp_path, path)
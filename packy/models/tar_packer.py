@@ -0,0 +1,289 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tarfile
+from collections.abc import Iterable
+from contextlib import nullcontext
+from typing import BinaryIO
+
+try:
+    from compression import zstd
+except ImportError:  # Python built without libzstd
+    zstd = None
+
+# PackY
+from packy.models.cancellation import CancellableFile, CancellationToken
+from packy.models.event_buffer import EventBuffer, EventLevel
+from packy.models.packer import PackEntry, Packer, PackerError, ReferenceSnapshot
+from packy.models.archiver_config_model import (
+    ArchiveFormat,
+    CompressionLevel,
+    CompressorOptions,
+    ZstdOptions,
+)
+from packy.models.parallel_compressor import Codec, ParallelCompressor
+from packy.models.run_plan import CompressionSettings, RunPlan
+
+
+# -----------------------------------------------------------------------------
+def compressLevel(compression: CompressionSettings) -> int:
+    match compression.compression_level:
+        case CompressionLevel.MAXIMUM:
+            return 9
+        case CompressionLevel.FAST:
+            return 3
+        case CompressionLevel.FASTEST:
+            return 1
+        case _:
+            return 6
+
+
+# -----------------------------------------------------------------------------
+def zstdLevel(compression: CompressionSettings) -> int:
+    match compression.compression_level:
+        case CompressionLevel.MAXIMUM:
+            return 19
+        case CompressionLevel.FAST:
+            return 2
+        case CompressionLevel.FASTEST:
+            return 1
+        case _:
+            return 3
+
+
+# -----------------------------------------------------------------------------
+def openZstdStream(dst_file: BinaryIO, compression: CompressionSettings):
+    if zstd is None:
+        raise PackerError("Zstandard compression is not available in this Python build")
+
+    options = compression.options
+    if not isinstance(options, ZstdOptions):
+        options = ZstdOptions()
+
+    workers = options.workers if options.workers > 0 else os.cpu_count() or 1
+    # The library caps the worker threads, and only accepts 0 if it was built
+    # without them
+    min_workers, max_workers = zstd.CompressionParameter.nb_workers.bounds()
+    workers = max(min_workers, min(workers if workers > 1 else 0, max_workers))
+    parameters = {
+        zstd.CompressionParameter.compression_level: zstdLevel(compression),
+        zstd.CompressionParameter.nb_workers: workers,
+        zstd.CompressionParameter.enable_long_distance_matching: options.long_distance_matching,
+    }
+
+    return zstd.ZstdFile(dst_file, mode="wb", options=parameters)
+
+
+# -----------------------------------------------------------------------------
+def parallelCodec(compression: CompressionSettings) -> Codec | None:
+    options = compression.options
+    if not isinstance(options, CompressorOptions) or options.workers == 1:
+        return None
+
+    match compression.format:
+        case ArchiveFormat.TGZ | ArchiveFormat.GZ:
+            return Codec.GZIP
+        case ArchiveFormat.TBZ | ArchiveFormat.BZ2:
+            return Codec.BZIP2
+        case ArchiveFormat.TXZ | ArchiveFormat.XZ:
+            return Codec.XZ
+        case _:
+            return None
+
+
+# -----------------------------------------------------------------------------
+def openCompressedStream(dst_file: BinaryIO, compression: CompressionSettings, filename: str = ""):
+    """Wraps the destination file into a write-only compression stream.
+
+    The stream never seeks, so the destination can be written sequentially.
+    Unless the task options ask for a single worker, gzip, bzip2 and xz
+    streams are compressed block by block on several cores. Zstandard
+    streams use the native zstd worker threads instead.
+
+    Incompressible content is only detected in the blocks compressed
+    concurrently: a single standard stream cannot change its level midway,
+    so it compresses every member at the level of the task.
+    """
+    c_level = compressLevel(compression)
+    codec = parallelCodec(compression)
+
+    if codec is not None:
+        options = compression.options
+        return ParallelCompressor(
+            dst_file,
+            codec,
+            c_level,
+            options.workers,
+            options.block_size,
+            options.store_incompressible,
+        )
+
+    match compression.format:
+        case ArchiveFormat.TAR:
+            return nullcontext(dst_file)
+        case ArchiveFormat.TGZ | ArchiveFormat.GZ:
+            return gzip.GzipFile(filename, mode="wb", compresslevel=c_level, fileobj=dst_file)
+        case ArchiveFormat.TBZ | ArchiveFormat.BZ2:
+            return bz2.BZ2File(dst_file, mode="wb", compresslevel=c_level)
+        case ArchiveFormat.TXZ | ArchiveFormat.XZ:
+            return lzma.LZMAFile(dst_file, mode="wb", format=lzma.FORMAT_XZ, preset=c_level)
+        case ArchiveFormat.TLZ:
+            return lzma.LZMAFile(dst_file, mode="wb", format=lzma.FORMAT_ALONE, preset=c_level)
+        case ArchiveFormat.TZST | ArchiveFormat.ZST:
+            return openZstdStream(dst_file, compression)
+        case _:
+            raise PackerError(f"Format {compression.format.label} is not a stream format")
+
+
+###############################################################################
+class TarPacker(Packer):
+    ###########################################################################
+    # SPECIAL METHODS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        plan: RunPlan,
+        cancel_token: CancellationToken | None = None,
+        event_buffer: EventBuffer | None = None,
+    ):
+        super(TarPacker, self).__init__(plan, cancel_token, event_buffer)
+
+    ###########################################################################
+    # PUBLIC MEMBER FUNCTIONS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def packEntries(
+        self,
+        plan: RunPlan,
+        entries: Iterable[PackEntry],
+        reference: ReferenceSnapshot | None = None,
+    ):
+        # The members of a compressed tar stream cannot be copied one by one,
+        # so every entry is packed again whatever the reference snapshot.
+        try:
+            destination_filename = plan.destination_file
+            compression = plan.compression
+
+            # The cancellation is checked by the member loop and the source
+            # reads, so the stream can still write its trailer once cancelled
+            with (
+                open(destination_filename, "wb") as dst_file,
+                openCompressedStream(dst_file, compression) as dst_stream,
+                tarfile.open(fileobj=dst_stream, mode="w|") as m_tar,
+            ):
+                self.__packEntries(m_tar, entries)
+        except OSError as ex:
+            raise ex
+
+    ###########################################################################
+    # PRIVATE MEMBER FUNCTIONS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def __packEntries(self, m_tar: tarfile.TarFile, entries: Iterable[PackEntry]):
+        cancel_token = self.cancelToken()
+        try:
+            for entry in entries:
+                cancel_token.raiseIfCancelled()
+                info_msg: str = f'Packing "{entry.arcname}"'
+                self.postEvent(info_msg, EventLevel.DETAIL)
+
+                # Same as TarFile.add, with the content read chunk by chunk
+                # until the run is cancelled
+                tarinfo = m_tar.gettarinfo(entry.path, entry.arcname)
+                if tarinfo is None:
+                    continue
+                if tarinfo.isreg():
+                    with open(entry.path, "rb") as src_file:
+                        m_tar.addfile(
+                            tarinfo, CancellableFile(src_file, cancel_token, self.byteCounter())
+                        )
+                else:
+                    m_tar.addfile(tarinfo)
+
+                # TarFile keeps every written member in memory, which is only
+                # needed to read the archive back.
+                m_tar.members.clear()
+        except OSError as ex:
+            raise ex
+
+
+###############################################################################
+class FilePacker(Packer):
+    ###########################################################################
+    # SPECIAL METHODS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        plan: RunPlan,
+        cancel_token: CancellationToken | None = None,
+        event_buffer: EventBuffer | None = None,
+    ):
+        super(FilePacker, self).__init__(plan, cancel_token, event_buffer)
+
+    ###########################################################################
+    # PUBLIC MEMBER FUNCTIONS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def packEntries(
+        self,
+        plan: RunPlan,
+        entries: Iterable[PackEntry],
+        reference: ReferenceSnapshot | None = None,
+    ):
+        try:
+            destination_filename = plan.destination_file
+            compression = plan.compression
+            entry = self.__selectedFile(entries)
+
+            info_msg: str = f'Packing "{entry.arcname}"'
+            self.postEvent(info_msg)
+
+            with (
+                open(entry.path, "rb") as src_file,
+                open(destination_filename, "wb") as dst_file,
+                openCompressedStream(
+                    dst_file, compression, os.path.basename(entry.path)
+                ) as dst_stream,
+            ):
+                shutil.copyfileobj(
+                    CancellableFile(src_file, self.cancelToken(), self.byteCounter()), dst_stream
+                )
+        except OSError as ex:
+            raise ex
+
+    # -------------------------------------------------------------------------
+    def supportsIncremental(self) -> bool:
+        # A compressed file holds a single file, there is nothing to leave out
+        return False
+
+    ###########################################################################
+    # PRIVATE MEMBER FUNCTIONS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    def __selectedFile(self, entries: Iterable[PackEntry]) -> PackEntry:
+        files = [entry for entry in entries if not entry.is_dir]
+
+        if len(files) != 1:
+            raise PackerError(
+                f"A single file must be selected to create a compressed file, {len(files)} found"
+            )
+
+        return files[0]
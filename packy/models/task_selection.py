@@ -0,0 +1,260 @@
+"""Items selected in the source folder of a task.
+
+This module holds the selection of a task, its root folder and the warnings
+about the differences between the selection and the file system, without
+any Qt object. A session loads one per task, while a ``FilesModel`` showing
+a selection in a view is only created for the task shown.
+
+Typical usage example:
+
+  task_selection = TaskSelection(json_dict)
+  if not task_selection.is_checked:
+      task_selection.checkIntegrity()
+  files_model = FilesModel(task_selection)
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+from enum import Enum
+from typing import TYPE_CHECKING, Any, final
+
+# PackY
+from packy.models.integrity_scanner import IntegrityReport, IntegrityScanner
+from packy.models.scan_cache import ScanCache
+from packy.models.selection_tree import CheckState, SelectionTree
+from packy.models.warnings import Warnings
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Iterable
+
+
+###############################################################################
+class SelectionSerialKeys(Enum):
+    """Enumeration of keys used for TaskSelection serialization.
+
+    Attributes:
+        ROOT_PATH (str):
+            Key representing the root directory path of the selection.
+        CHECK (str):
+            Key representing the mapping of file paths to their check states.
+        SPARSE (str):
+            Key telling whether only the explicit check states were written. Sessions
+            written before it hold the state of every item shown at the time.
+    """
+
+    ROOT_PATH = "root_path"
+    CHECK = "check"
+    SPARSE = "sparse"
+
+
+###############################################################################
+@final
+class TaskSelection:
+    """The selection of a task with its warnings.
+
+    Attributes:
+        __selection (SelectionTree): The check states of the items.
+        __warnings (Warnings): The added and removed items found since the
+            selection was last updated.
+        __nb_warnings_changes (int): Number of changes made to the warnings
+            by the integrity checks.
+        __is_checked (bool): Whether the warnings were compared to the file
+            system since the selection was read.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, json_dict: dict[str, Any] | None = None) -> None:
+        """Initializes the selection.
+
+        A selection read from a session is not compared to the file system
+        yet, so that loading a session does not scan every tree: its check
+        is left to the caller, in the background or once it is shown.
+
+        Args:
+            json_dict (dict[str, Any] | None): Serialized representation of
+                the selection. Defaults to None.
+        """
+        self.__selection: SelectionTree = SelectionTree()
+        self.__warnings: Warnings = Warnings()
+        self.__nb_warnings_changes: int = 0
+        self.__is_checked: bool = json_dict is None
+
+        if json_dict is not None:
+            self.__selection.reset(json_dict[SelectionSerialKeys.ROOT_PATH.value])
+            self.__selection.load(
+                json_dict[SelectionSerialKeys.CHECK.value],
+                json_dict.get(SelectionSerialKeys.SPARSE.value, False),
+            )
+
+    # -------------------------------------------------------------------------
+    def __repr__(self) -> str:
+        """Returns a string representation of the selection."""
+        return f"task_selection: root_path = {self.rootPath()}, check = {{{self.checks}}}"
+
+    # -------------------------------------------------------------------------
+    def __eq__(self, other: object) -> bool:
+        """Checks if two selections have the same root folder and states."""
+        if not isinstance(other, TaskSelection):
+            return NotImplemented
+        return self.__selection == other.__selection
+
+    # -------------------------------------------------------------------------
+    __hash__ = None  # pyright: ignore[reportAssignmentType] mutable content
+
+    # -------------------------------------------------------------------------
+    @property
+    def selection(self) -> SelectionTree:
+        """The check states of the items."""
+        return self.__selection
+
+    # -------------------------------------------------------------------------
+    @property
+    def checks(self) -> dict[str, int]:
+        """Returns the dictionary of explicit check states."""
+        return self.__selection.checks()
+
+    # -------------------------------------------------------------------------
+    @property
+    def warnings(self) -> Warnings:
+        """Returns the warnings object."""
+        return self.__warnings
+
+    # -------------------------------------------------------------------------
+    @property
+    def is_checked(self) -> bool:
+        """Whether the whole selection was compared to the file system."""
+        return self.__is_checked
+
+    # -------------------------------------------------------------------------
+    @property
+    def revision(self) -> int:
+        """Number of changes made to the selection and to its warnings."""
+        return self.__selection.revision + self.__nb_warnings_changes
+
+    # -------------------------------------------------------------------------
+    def rootPath(self) -> str:
+        """Returns the root folder of the selection."""
+        return self.__selection.root_path
+
+    # -------------------------------------------------------------------------
+    def setRootPath(self, path: str) -> None:
+        """Changes the root folder, clearing the selection and the warnings.
+
+        Args:
+            path (str): The new root folder.
+        """
+        self.__selection.reset(path)
+        self.__warnings.clear()
+        self.__is_checked = True
+
+    # -------------------------------------------------------------------------
+    def serialize(self) -> dict[str, Any]:
+        """Serialize the current instance into a JSON-compatible dictionary."""
+        data_dict: dict[str, Any] = {}
+
+        data_dict[SelectionSerialKeys.ROOT_PATH.value] = self.rootPath()
+        data_dict[SelectionSerialKeys.CHECK.value] = self.checks
+        data_dict[SelectionSerialKeys.SPARSE.value] = True
+
+        return data_dict
+
+    # -------------------------------------------------------------------------
+    def checkIntegrity(self) -> None:
+        """Check if checked items still exist and update warnings accordingly."""
+        scanner = self.startIntegrityCheck()
+        self.addIntegrityReport(scanner.scan())
+        self.markChecked()
+
+    # -------------------------------------------------------------------------
+    def markChecked(self) -> None:
+        """Records that a check of the whole selection completed.
+
+        It is called once the scanner of startIntegrityCheck, run without
+        directories, went through without being cancelled.
+        """
+        self.__is_checked = True
+
+    # -------------------------------------------------------------------------
+    def startIntegrityCheck(self, dir_paths: Iterable[str] | None = None) -> IntegrityScanner:
+        """Start an integrity check whose scan can run in another thread.
+
+        The checked files seen appearing in the view are added to the warnings
+        right away. The scanner reuses the listings of the default scan cache.
+
+        Args:
+            dir_paths (Iterable[str] | None): The only directories to compare,
+                None to compare all the checked items. Defaults to None.
+
+        Returns:
+            IntegrityScanner: The scanner of the checked items, whose reports are
+            given to addIntegrityReport.
+        """
+        for item in self.__selection.checked_roots():
+            if self.__warnings.isInAddedCandidateItems(item):
+                self.__warnings.addAddedItem(item)
+
+        return IntegrityScanner(self.__selection, cache=ScanCache.default(), dir_paths=dir_paths)
+
+    # -------------------------------------------------------------------------
+    def addIntegrityReport(self, report: IntegrityReport) -> IntegrityReport:
+        """Add the items found by an integrity scan to the warnings.
+
+        Returns:
+            IntegrityReport: The items which were not in the warnings yet.
+        """
+        warnings = self.__warnings
+        removed_items = [item for item in report.removed_items if warnings.addRemovedItem(item)]
+        added_items = [item for item in report.added_items if warnings.addAddedItem(item)]
+
+        if added_items or removed_items:
+            self.__nb_warnings_changes += 1
+
+        return IntegrityReport(added_items, removed_items)
+
+    # -------------------------------------------------------------------------
+    def watchedPaths(self) -> set[str]:
+        """Paths whose changes may change the warnings.
+
+        These are the checked roots, the directories listed below them, and
+        the new folders holding the added items, up to the listed directory
+        they appeared in. The content of a directory never listed is not
+        compared by the integrity checks, being packed as a whole, so it is
+        not watched.
+
+        Returns:
+            set[str]: The paths to watch.
+        """
+        paths: set[str] = set()
+        for root in self.__selection.checked_roots():
+            paths.add(root)
+            paths.update(self.__selection.listed_directories(root))
+
+        # A new folder may only hold folders, whose new items are found
+        # from its own changes
+        for item in self.__warnings.addedItems():
+            folder = item.rpartition("/")[0]
+            while folder and folder not in paths:
+                paths.add(folder)
+                folder = folder.rpartition("/")[0]
+
+        return paths
+
+    # -------------------------------------------------------------------------
+    def updateModel(self) -> None:
+        """Update the internal state based on current warnings."""
+        removed_items = self.__warnings.removedItems()
+        for item in removed_items:
+            self.__selection.remove(item)
+
+        added_items = self.__warnings.addedItems()
+        for item in added_items:
+            self.__selection.register(item)
+            self.__selection.set_state(item, CheckState.CHECKED)
+
+        self.__warnings.clear()
+        self.__nb_warnings_changes += 1
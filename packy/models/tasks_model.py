@@ -11,7 +11,6 @@ See LICENCE.md file for more information.
 from dataclasses import dataclass
 import os
 from pathlib import Path
-import re
 from datetime import date
 from enum import Enum, auto
 from typing import final
@@ -19,7 +18,10 @@ from PySide6 import QtCore
 from PySide6.QtCore import Qt, QStandardPaths, QAbstractListModel, Signal
 from packy.core.isettings_persistable import ISettingsPersistable
 from packy.models.files_model import FilesModel
+from packy.models.task_selection import TaskSelection
 from packy.models.archiver_config_model import ArchiverConfigModel
+from packy.models.run_plan import CompressionSettings, RetentionPolicy, RunPlan
+from packy.models.snapshot_catalog import SnapshotCatalog, SnapshotSeries
 from packy.core.settings import PreferencesTask, PreferencesKeys, QObject
 
 
@@ -31,6 +33,7 @@ class TaskSerialKeys(Enum):
     FILES_SELECTED = "files_model"
     DEST_RAW_BASENAME = "dst_raw_basename"
     DEST_FOLDER = "dst_folder"
+    PRIORITY = "priority"
 
 
 ###############################################################################
@@ -47,6 +50,13 @@ class TaskStatus(Enum):
     WAITING = 0
     SUCCESS = auto()
     ERROR = auto()
+    CANCELLED = auto()
+
+###############################################################################
+class TaskPriority(Enum):
+    LOW = -1
+    NORMAL = 0
+    HIGH = 1
 
 ###############################################################################
 class FinalMeta(type(QAbstractListModel), type(ISettingsPersistable)):  # pyright: ignore[reportGeneralTypeIssues]  # noqa: D101
@@ -62,7 +72,7 @@ class ArchiveTask:
     __task_id: int
     __is_enabled: bool
     __destination_path: Path
-    __source_files: FilesModel
+    __source_files: TaskSelection
 
 
 ###############################################################################
@@ -74,14 +84,17 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
     # __u_dash: dash unicode character to represent the waiting status.
     # __u_check: check unicode character to represent the success status.
     # __u_cross: cross unicode charater to represent the failed status.
+    # __u_cancel: circled dash unicode character to represent the cancelled
+    #             status.
     # __id: an integer.
     # __status: the current status of the task.
+    # __priority: the runs of the highest priority start first.
     # __checked: a flag indicating if the task is selected for running.
     # __packer_data: info about the packer.
     # __files_selected: items selected to be packed.
+    # __files_model: the view of the selection, only created when shown.
     # __dest_raw_basename: the output filename chosen by the user.
     # __dest_folder: the destination folder of the archive.
-    # __files_selected:
     ###########################################################################
 
     statusChanged = Signal(int)
@@ -93,9 +106,12 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
         self.__u_dash = "\u2014"
         self.__u_check = "\u2713"
         self.__u_cross = "\u2715"
+        self.__u_cancel = "\u2296"
 
         self.__id = id
         self.__status = TaskStatus.WAITING
+        self.__priority = TaskPriority.NORMAL
+        self.__files_model: FilesModel | None = None
 
         self.initStaticMembers()
 
@@ -117,25 +133,34 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
 
         self.__checked = Qt.CheckState.Checked.value
         self.__packer_data = ArchiverConfigModel()
-        self.__files_selected = FilesModel()
+        self.__files_selected = TaskSelection()
         self.__dest_raw_basename = "output"
         self.__dest_folder = QStandardPaths.writableLocation(qt_folder_location)
-        self.__files_selected.set_root_path(self.__dest_folder)
+        self.__files_selected.setRootPath(self.__dest_folder)
 
     # -------------------------------------------------------------------------
     def deserialization(self, json_dict: dict) -> None:
         self.__id = json_dict[TaskSerialKeys.ID.value]
         self.__checked = json_dict[TaskSerialKeys.CHECKED.value]
-        self.__packer_data = ArchiverConfigModel(json_dict[TaskSerialKeys.PACKER_DATA.value])
-        self.__files_selected = FilesModel(json_dict[TaskSerialKeys.FILES_SELECTED.value])
+        self.__packer_data = ArchiverConfigModel()
+        self.__packer_data.deserialize(json_dict[TaskSerialKeys.PACKER_DATA.value])
+        self.__files_selected = TaskSelection(json_dict[TaskSerialKeys.FILES_SELECTED.value])
         self.__dest_raw_basename = json_dict[TaskSerialKeys.DEST_RAW_BASENAME.value]
         self.__dest_folder = json_dict[TaskSerialKeys.DEST_FOLDER.value]
+        # The sessions saved before the priorities run at the normal one
+        priority = json_dict.get(TaskSerialKeys.PRIORITY.value, TaskPriority.NORMAL.value)
+        self.__priority = TaskPriority(priority)
 
     # -------------------------------------------------------------------------
     @property
     def id(self) -> int:
         return self.__id
 
+    # -------------------------------------------------------------------------
+    @property
+    def priority(self) -> TaskPriority:
+        return self.__priority
+
     # -------------------------------------------------------------------------
     def statusUnicode(self) -> str:
         match self.__status:
@@ -145,6 +170,8 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
                 return self.__u_check
             case TaskStatus.ERROR:
                 return self.__u_cross
+            case TaskStatus.CANCELLED:
+                return self.__u_cancel
 
     # -------------------------------------------------------------------------
     def destFile(self) -> str:
@@ -166,20 +193,62 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
         return self.__packer_data.extension()
 
     # -------------------------------------------------------------------------
-    def filesSelected(self):
+    def filesSelected(self) -> TaskSelection:
         return self.__files_selected
 
+    # -------------------------------------------------------------------------
+    def filesModel(self) -> FilesModel:
+        # The file system model and its gatherer thread only exist for the
+        # task shown
+        if self.__files_model is None:
+            self.__files_model = FilesModel(self.__files_selected, self)
+        return self.__files_model
+
+    # -------------------------------------------------------------------------
+    def releaseFilesModel(self) -> None:
+        if self.__files_model is not None:
+            self.__files_model.deleteLater()
+            self.__files_model = None
+
     # -------------------------------------------------------------------------
     def packerData(self):
         return self.__packer_data
 
+    # -------------------------------------------------------------------------
+    def snapshotSeries(self) -> SnapshotSeries:
+        return SnapshotSeries(
+            self.__dest_folder,
+            self.__dest_raw_basename,
+            TasksModel.dstSuffix,
+            self.destExtension(),
+        )
+
+    # -------------------------------------------------------------------------
+    def runPlan(self, retention: RetentionPolicy) -> RunPlan:
+        # Everything the packer reads is resolved here, in the GUI thread.
+        # The suffix of the destination depends on the snapshots already
+        # written, so it is computed once, before the new one exists.
+        selected_items, excluded_items = RunPlan.resolveItems(self.__files_selected.checks)
+
+        return RunPlan(
+            task_id=self.__id,
+            raw_dest_file=self.rawDestFile(),
+            destination_file=self.destFile(),
+            snapshots=self.snapshotSeries(),
+            root_path=self.__files_selected.rootPath(),
+            selected_items=selected_items,
+            excluded_items=excluded_items,
+            compression=CompressionSettings.fromConfig(self.__packer_data),
+            retention=retention,
+        )
+
     # -------------------------------------------------------------------------
     def isChecked(self) -> Qt.CheckState:
         return self.__checked
 
     # -------------------------------------------------------------------------
     def warnings(self):
-        return self.__files_selected.warnings()
+        return self.__files_selected.warnings
 
     ###########################################################################
     # SETTERS
@@ -195,31 +264,41 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
         self.dataChanged.emit(self.index(first_row, 0), self.index(last_row, 0))
 
     # -------------------------------------------------------------------------
-    def setFilesSelected(self, files_selected):
+    def setFilesSelected(self, files_selected: TaskSelection) -> None:
+        self.releaseFilesModel()
         self.__files_selected = files_selected
 
     # -------------------------------------------------------------------------
     def setChecked(self, value):
         self.__checked = value
 
+    # -------------------------------------------------------------------------
+    def setPriority(self, value: TaskPriority) -> None:
+        self.__priority = value
+
     # -------------------------------------------------------------------------
     @staticmethod
     def updateDestSuffix(value):
+        dst_suffix = PreferencesTask.SUFFIX_CURR_DATE
         func_dst_suffix = TasksModel.__suffixTimeStamp
 
         match value:
             case PreferencesTask.SUFFIX_CURR_DATE:
                 func_dst_suffix = TasksModel.__suffixTimeStamp
             case PreferencesTask.SUFFIX_VERSION_NUM:
+                dst_suffix = value
                 func_dst_suffix = TasksModel.__suffixId
             case PreferencesTask.SUFFIX_NOTHING:
+                dst_suffix = value
                 func_dst_suffix = TasksModel.__suffixNothing
             case _:
                 msg = "value not recognized."
                 QtCore.qWarning(msg)
 
+        TasksModel.dstSuffix = dst_suffix
         TasksModel.funcDstSuffix = func_dst_suffix
 
+
     ###########################################################################
     # PUBLIC MEMBER FUNCTIONS
     ###########################################################################
@@ -278,6 +357,7 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
         dict[TaskSerialKeys.PACKER_DATA.value] = self.__packer_data
         dict[TaskSerialKeys.DEST_RAW_BASENAME.value] = self.__dest_raw_basename
         dict[TaskSerialKeys.DEST_FOLDER.value] = self.__dest_folder
+        dict[TaskSerialKeys.PRIORITY.value] = self.__priority.value
 
         return dict
 
@@ -287,24 +367,13 @@ class TasksModel(QAbstractListModel, ISettingsPersistable, metaclass=FinalMeta):
 
     # -------------------------------------------------------------------------
     def __suffixId(self) -> str:
-        last_id = self.__findLastSuffixId()
+        # It is called on each repaint of the task, so the destination folder
+        # is read from the catalog instead of being listed
+        last_id = SnapshotCatalog.default().lastVersion(self.snapshotSeries())
         suffix = "_" + str(last_id + 1)
 
         return suffix
 
-    # -------------------------------------------------------------------------
-    def __findLastSuffixId(self) -> int:
-        regex = self.__dest_raw_basename + "_\d+." + self.__packer_data.extension()
-
-        last_id = -1
-        for filename in os.listdir(self.__dest_folder):
-            if re.search(regex, filename):
-                basename_no_ext = os.path.splitext(filename)[0]
-                id = basename_no_ext.rsplit("_", 1)[1]
-                last_id = int(id) if last_id < int(id) else last_id
-
-        return last_id
-
     # -------------------------------------------------------------------------
     def __suffixTimeStamp(self) -> str:
         return date.today().strftime("_%Y_%m_%d")
@@ -0,0 +1,200 @@
+"""Byte counting and throughput of the task runs.
+
+The packers count the bytes they read from the source tree, from as many
+threads as they compress with, against the total size of the entries
+scanned before packing. The counts are reported at most a few times per
+second, so the progress of a run costs no signal per chunk nor per file.
+The GUI then smooths the throughput over a sliding window to estimate the
+remaining time.
+
+Typical usage example:
+
+  byte_counter = ByteCounter(lambda done, total: print(f"{done}/{total}"))
+  byte_counter.setTotal(total_size)
+  byte_counter.add(len(chunk))
+  byte_counter.finish()
+
+Copyright 2023-present, Marie-Neige Chapel and Joseph Garnier
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, final
+
+if TYPE_CHECKING:
+    # Python
+    from collections.abc import Callable
+
+# Minimum time, in seconds, between two reports of a byte counter
+REPORT_INTERVAL = 0.1
+# Time span, in seconds, over which the throughput is averaged
+THROUGHPUT_WINDOW = 10.0
+
+
+###############################################################################
+@final
+class ByteCounter:
+    """Thread-safe count of the bytes processed by a run.
+
+    Attributes:
+        __on_progress (Callable[[int, int], None]): Called with the bytes
+            processed and the total bytes, from the thread counting, with
+            the lock held. It must return quickly, like a queued signal.
+        __interval (float): Minimum time, in seconds, between two reports.
+        __clock (Callable[[], float]): Returns the current time, in seconds.
+        __lock (threading.Lock): Guards the count.
+        __done (int): The bytes processed so far.
+        __total (int): The bytes to process.
+        __last_report (float): Time of the last report.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        on_progress: Callable[[int, int], None],
+        interval: float = REPORT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initializes the counter, with nothing to process.
+
+        Args:
+            on_progress (Callable[[int, int], None]): Called with the bytes
+                processed and the total bytes.
+            interval (float): Minimum time, in seconds, between two reports.
+                Defaults to ``REPORT_INTERVAL``.
+            clock (Callable[[], float]): Returns the current time, in
+                seconds. Defaults to ``time.monotonic``.
+        """
+        self.__on_progress: Callable[[int, int], None] = on_progress
+        self.__interval: float = interval
+        self.__clock: Callable[[], float] = clock
+        self.__lock: threading.Lock = threading.Lock()
+        self.__done: int = 0
+        self.__total: int = 0
+        self.__last_report: float = float("-inf")
+
+    # -------------------------------------------------------------------------
+    @property
+    def done(self) -> int:
+        """The bytes processed so far."""
+        return self.__done
+
+    # -------------------------------------------------------------------------
+    @property
+    def total(self) -> int:
+        """The bytes to process."""
+        return self.__total
+
+    # -------------------------------------------------------------------------
+    def setTotal(self, total: int) -> None:
+        """Starts counting towards a total, and reports it.
+
+        Args:
+            total (int): The bytes to process.
+        """
+        with self.__lock:
+            self.__done = 0
+            self.__total = total
+            self.__last_report = self.__clock()
+            self.__on_progress(0, total)
+
+    # -------------------------------------------------------------------------
+    def add(self, nb_bytes: int) -> None:
+        """Counts processed bytes, reported if the last report is old enough.
+
+        Args:
+            nb_bytes (int): The bytes processed since the last call.
+        """
+        with self.__lock:
+            self.__done += nb_bytes
+            now = self.__clock()
+            if now - self.__last_report < self.__interval:
+                return
+            self.__last_report = now
+            # Reported under the lock, so the counts never go backwards
+            self.__on_progress(self.__done, self.__total)
+
+    # -------------------------------------------------------------------------
+    def finish(self) -> None:
+        """Reports every byte as processed, whatever the outcome of the run."""
+        with self.__lock:
+            self.__done = self.__total
+            self.__on_progress(self.__total, self.__total)
+
+
+###############################################################################
+@final
+class ThroughputWindow:
+    """Throughput averaged over the last seconds of a run.
+
+    Attributes:
+        __span (float): Time span, in seconds, of the window.
+        __samples (deque[tuple[float, int]]): The times and byte counts
+            sampled in the window, from the oldest to the newest.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, span: float = THROUGHPUT_WINDOW) -> None:
+        """Initializes an empty window.
+
+        Args:
+            span (float): Time span, in seconds, of the window. Defaults to
+                ``THROUGHPUT_WINDOW``.
+        """
+        self.__span: float = span
+        self.__samples: deque[tuple[float, int]] = deque()
+
+    # -------------------------------------------------------------------------
+    def clear(self) -> None:
+        """Drops every sample."""
+        self.__samples.clear()
+
+    # -------------------------------------------------------------------------
+    def add(self, sample_time: float, nb_bytes: int) -> None:
+        """Samples the bytes processed so far.
+
+        The oldest sample older than the span is kept, so the window always
+        covers the whole span once the run lasts long enough.
+
+        Args:
+            sample_time (float): Time of the sample, in seconds.
+            nb_bytes (int): The bytes processed since the start of the run.
+        """
+        samples = self.__samples
+        samples.append((sample_time, nb_bytes))
+        while len(samples) > 2 and samples[1][0] <= sample_time - self.__span:
+            samples.popleft()
+
+    # -------------------------------------------------------------------------
+    def rate(self) -> float:
+        """Returns the throughput over the window, in bytes per second."""
+        if len(self.__samples) < 2:
+            return 0.0
+
+        (first_time, first_bytes), (last_time, last_bytes) = self.__samples[0], self.__samples[-1]
+        if last_time <= first_time:
+            return 0.0
+
+        return max(last_bytes - first_bytes, 0) / (last_time - first_time)
+
+    # -------------------------------------------------------------------------
+    def eta(self, remaining: int) -> float | None:
+        """Estimates the time left to process the remaining bytes.
+
+        Args:
+            remaining (int): The bytes left to process.
+
+        Returns:
+            float | None: The time left, in seconds, or None while nothing
+                was processed in the window.
+        """
+        rate = self.rate()
+        if rate <= 0.0:
+            return None
+
+        return max(remaining, 0) / rate
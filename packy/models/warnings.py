@@ -25,9 +25,10 @@ class Warnings:
 
     # -------------------------------------------------------------------------
     def __init__(self) -> None:
-        self.__added_item_candidates = []
-        self.__added_items = []
-        self.__removed_items = []
+        # Dicts keep the insertion order with hashed lookups
+        self.__added_item_candidates: dict[str, None] = {}
+        self.__added_items: dict[str, None] = {}
+        self.__removed_items: dict[str, None] = {}
 
     # -------------------------------------------------------------------------
     def __repr__(self):
@@ -50,11 +51,11 @@ class Warnings:
 
     # -------------------------------------------------------------------------
     def addedItems(self) -> list[Any]:
-        return self.__added_items
+        return list(self.__added_items)
 
     # -------------------------------------------------------------------------
     def removedItems(self) -> list[Any]:
-        return self.__removed_items
+        return list(self.__removed_items)
 
     ###########################################################################
     # PUBLIC MEMBER FUNCTIONS
@@ -62,28 +63,28 @@ class Warnings:
 
     # -------------------------------------------------------------------------
     def addCandidateAddedItem(self, item_path: str) -> None:
-        if item_path not in self.__added_item_candidates:
-            self.__added_item_candidates.append(item_path)
+        self.__added_item_candidates[item_path] = None
 
     # -------------------------------------------------------------------------
-    def addAddedItem(self, item_path: str) -> None:
-        if item_path not in self.__added_items:
-            self.__added_items.append(item_path)
+    def addAddedItem(self, item_path: str) -> bool:
+        if item_path in self.__added_items:
+            return False
 
-            if self.isInAddedCandidateItems(item_path):
-                self.__added_item_candidates.remove(item_path)
+        self.__added_items[item_path] = None
+        self.__added_item_candidates.pop(item_path, None)
+        return True
 
     # -------------------------------------------------------------------------
-    def addRemovedItem(self, item_path: str) -> None:
-        if item_path not in self.__removed_items:
-            self.__removed_items.append(item_path)
+    def addRemovedItem(self, item_path: str) -> bool:
+        if item_path in self.__removed_items:
+            return False
+
+        self.__removed_items[item_path] = None
+        return True
 
     # -------------------------------------------------------------------------
     def isInAddedCandidateItems(self, item_path: str) -> bool:
-        if item_path in self.__added_item_candidates:
-            return True
-
-        return False
+        return item_path in self.__added_item_candidates
 
     # -------------------------------------------------------------------------
     def clear(self):
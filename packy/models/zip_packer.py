@@ -6,14 +6,20 @@ See LICENCE.md file for more information.
 """
 
 # Python
-import os
 import zipfile
-from zipfile import ZipFile
+from collections.abc import Iterable
+from contextlib import nullcontext
+from zipfile import BadZipFile, ZipFile
 
 # PackY
-from packy.models.packer import Packer
-from packy.models.archiver_config_model import ArchiverConfigModel
-from packy.models.tasks_model import TasksModel
+from packy.models.cancellation import CancellableFile, CancellationToken
+from packy.models.event_buffer import EventBuffer, EventLevel
+from packy.models.packer import PackEntry, Packer, PackerError, ReferenceSnapshot
+from packy.models.archiver_config_model import ArchiveFormat, CompressionMethod, ZipOptions
+from packy.models.parallel_zip_writer import ParallelZipWriter
+from packy.models.run_plan import CompressionSettings, RunPlan
+from packy.models.snapshot_manifest import SnapshotManifest
+from packy.models.tar_packer import compressLevel
 
 
 ###############################################################################
@@ -23,81 +29,131 @@ class ZipPacker(Packer):
     ###########################################################################
 
     # -------------------------------------------------------------------------
-    def __init__(self, task: TasksModel):
-        super(ZipPacker, self).__init__(task)
+    def __init__(
+        self,
+        plan: RunPlan,
+        cancel_token: CancellationToken | None = None,
+        event_buffer: EventBuffer | None = None,
+    ):
+        super(ZipPacker, self).__init__(plan, cancel_token, event_buffer)
 
     ###########################################################################
     # PUBLIC MEMBER FUNCTIONS
     ###########################################################################
 
     # -------------------------------------------------------------------------
-    def packTmpFolder(self, task: TasksModel, tmp_folder_path: str):
+    def packEntries(
+        self,
+        plan: RunPlan,
+        entries: Iterable[PackEntry],
+        reference: ReferenceSnapshot | None = None,
+    ):
         try:
-            destination_filename = task.destFile()
-            packer_data = task.packerData()
-
-            [c_method, c_level] = self.__convertPackerData(packer_data)
-
-            with ZipFile(
-                destination_filename, mode="w", compression=c_method, compresslevel=c_level
-            ) as m_zip:
-                self.__packDir(m_zip, tmp_folder_path)
+            destination_filename = plan.destination_file
+            compression = plan.compression
+
+            [c_method, c_level] = self.__convertCompression(compression)
+            workers = self.__workerCount(compression)
+            store_incompressible = self.__storeIncompressible(compression)
+
+            cancel_token = self.cancelToken()
+
+            # Every chunk written to the archive checks the cancellation
+            with (
+                self.__openReference(reference) as reference_zip,
+                open(destination_filename, "wb") as dst_file,
+                ZipFile(
+                    CancellableFile(dst_file, cancel_token),
+                    mode="w",
+                    compression=c_method,
+                    compresslevel=c_level,
+                ) as m_zip,
+                ParallelZipWriter(
+                    m_zip, workers, store_incompressible, cancel_token, self.byteCounter()
+                ) as zip_writer,
+            ):
+                unchanged = reference.unchanged if reference_zip is not None else frozenset()
+                self.__packEntries(zip_writer, entries, reference_zip, unchanged)
         except OSError as ex:
             raise ex
+        except BadZipFile as ex:
+            raise PackerError(f"The previous snapshot {reference.path} is corrupted: {ex}") from ex
 
     ###########################################################################
     # PRIVATE MEMBER FUNCTIONS
     ###########################################################################
 
     # -------------------------------------------------------------------------
-    def __convertPackerData(self, packer_data: ArchiverConfigModel):
-        extension = packer_data.extension()
-        method = packer_data.compressionMethod()
-        level = packer_data.compressionLevel()
-
+    def __convertCompression(self, compression: CompressionSettings):
         c_method = zipfile.ZIP_STORED
         c_level = None
 
-        match extension:
-            case "zip":
-                if method == 1:
+        match compression.format:
+            case ArchiveFormat.ZIP:
+                if compression.compression != CompressionMethod.STORE:
                     c_method = zipfile.ZIP_DEFLATED
-
-                    if level == 0:  # No compression
-                        c_level = 0
-                    elif level == 1:  # Best compression
-                        c_level = 9
-                    elif level == 2:  # Default
-                        c_level == 6
-                    elif level == 3:  # Fastest
-                        c_level = 1
-
-            case "lzma":
+                    c_level = compressLevel(compression)
+            case ArchiveFormat.LZMA:
                 c_method = zipfile.ZIP_LZMA
-                level = None
             case _:
-                raise Exception("Packer extension not recognized")
+                raise PackerError(f"Format {compression.format.label} is not a zip format")
 
         return [c_method, c_level]
 
     # -------------------------------------------------------------------------
-    def __packDir(self, m_zip, path):
+    def __workerCount(self, compression: CompressionSettings) -> int:
+        options = compression.options
+        if isinstance(options, ZipOptions):
+            return options.workers
+
+        return 0
+
+    # -------------------------------------------------------------------------
+    def __storeIncompressible(self, compression: CompressionSettings) -> bool:
+        options = compression.options
+        if isinstance(options, ZipOptions):
+            return options.store_incompressible
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def __openReference(self, reference: ReferenceSnapshot | None):
+        if reference is None:
+            return nullcontext(None)
+
+        try:
+            return ZipFile(reference.path)
+        except (OSError, BadZipFile) as ex:
+            # Every member is compressed again
+            info_msg = f"Cannot reuse the members of {reference.path}: {ex}"
+            self.postEvent(info_msg)
+            return nullcontext(None)
+
+    # -------------------------------------------------------------------------
+    def __packEntries(
+        self,
+        zip_writer: ParallelZipWriter,
+        entries: Iterable[PackEntry],
+        reference_zip: ZipFile | None = None,
+        unchanged: frozenset[str] = frozenset(),
+    ):
+        cancel_token = self.cancelToken()
         try:
-            for root, dirs, files in os.walk(path):
-                for dir in dirs:
-                    info_msg: str = f'Packing "{dir}"'
-                    self.signals.info.emit(info_msg)
-                    m_zip.write(
-                        os.path.join(root, dir),
-                        os.path.relpath(os.path.join(root, dir), os.path.join(path, ".")),
-                    )
-
-                for file in files:
-                    info_msg: str = f'Packing "{file}"'
-                    self.signals.info.emit(info_msg)
-                    m_zip.write(
-                        os.path.join(root, file),
-                        os.path.relpath(os.path.join(root, file), os.path.join(path, ".")),
-                    )
+            for entry in entries:
+                cancel_token.raiseIfCancelled()
+                source_zinfo = None
+                if not entry.is_dir and reference_zip is not None:
+                    arcname = SnapshotManifest.arcnameKey(entry.arcname)
+                    if arcname in unchanged:
+                        source_zinfo = reference_zip.NameToInfo.get(arcname)
+
+                if source_zinfo is not None:
+                    info_msg: str = f'Reusing "{entry.arcname}"'
+                    self.postEvent(info_msg, EventLevel.DETAIL)
+                    zip_writer.copy(reference_zip.fp, source_zinfo)
+                else:
+                    info_msg: str = f'Packing "{entry.arcname}"'
+                    self.postEvent(info_msg, EventLevel.DETAIL)
+                    zip_writer.write(entry.path, entry.arcname)
         except OSError as ex:
             raise ex
@@ -13,6 +13,8 @@ See LICENCE.md file for more information.
 # Local application
 from packy.core.app_config import AppConfig
 from packy.core.debug_logger import DebugLogger
+from packy.models.retention import SnapshotPruner
+from packy.models.scan_cache import ScanCache
 from packy.views.main_window import MainWindow
 
 # Third-party
@@ -87,10 +89,10 @@ class PackyApp:
     # -------------------------------------------------------------------------
     def init(self, config: AppConfig) -> None:
         """Initialize application components and logging system."""
-        log_file_path = config.log_file_path
-        has_started = DebugLogger.start(log_file_path)
+        has_started = DebugLogger.start(config.LOG_FILE_PATH, config)
         if not has_started:
             raise PackyLifeCycleError("Debug logger has already been started.")  # noqa: TRY003
+        ScanCache.set_default(ScanCache(config.SCAN_CACHE_PATH))
         QtCore.qDebug("App initialized.")
 
     # -------------------------------------------------------------------------
@@ -113,6 +115,9 @@ class PackyApp:
     def dispose(self) -> None:
         """Release application resources before shutdown."""
         QtCore.qDebug("App disposed.")
+        # The snapshots of the last tasks may still be being removed
+        SnapshotPruner.default().wait()
+        ScanCache.set_default(None)
         has_stopped = DebugLogger.stop()
         if not has_stopped:
             raise PackyLifeCycleError("Debug logger is not started.")  # noqa: TRY003
@@ -6,24 +6,69 @@ See LICENCE.md file for more information.
 """
 
 # PyQt
-from json import load
+from typing import Any, override
 
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, QPersistentModelIndex, Qt
 from PySide6.QtWidgets import QDialog, QAbstractButton
 from PySide6.QtUiTools import QUiLoader
 
 # PackY
-from packy.models.files_model import FilesModel
-from packy.models.warnings import Warnings
+from packy.models.integrity_check import IntegrityCheck
+from packy.models.integrity_scanner import IntegrityReport
+from packy.models.task_selection import TaskSelection
 from packy.utils.external_data_access import ExternalData, external_data_path
 
 
+###############################################################################
+class ItemsListModel(QAbstractListModel):
+    """A list of paths only growing at its end.
+
+    The paths are plain Python strings, read by the view for the visible rows
+    only, so a list of a million items stays cheap to fill and to show.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.__items: list[str] = []
+
+    # -------------------------------------------------------------------------
+    @override
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.__items)
+
+    # -------------------------------------------------------------------------
+    @override
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self.__items[index.row()]
+        return None
+
+    # -------------------------------------------------------------------------
+    def appendItems(self, items: list[str]) -> None:
+        if not items:
+            return
+
+        first_row = len(self.__items)
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(items) - 1)
+        self.__items.extend(items)
+        self.endInsertRows()
+
+
 ###############################################################################
 class FixWarnings(QDialog):
     ###########################################################################
     # PRIVATE MEMBER VARIABLES
     #
     # __ui :
-    # __model: the model
+    # __model: the selection of the task
+    # __integrity_check: the running check streaming its results, if any
+    # __added_items: the list of the added items shown
+    # __removed_items: the list of the removed items shown
     ###########################################################################
 
     ###########################################################################
@@ -31,47 +76,123 @@ class FixWarnings(QDialog):
     ###########################################################################
 
     # -------------------------------------------------------------------------
-    def __init__(self, files_model: FilesModel, parent=None) -> None:
+    def __init__(
+        self,
+        task_selection: TaskSelection,
+        integrity_check: IntegrityCheck | None = None,
+        parent=None,
+    ) -> None:
         super(FixWarnings, self).__init__()
 
         ui_path = external_data_path(ExternalData.UI_FIX_WARNINGS)
         loader = QUiLoader()
         self.__ui = loader.load(ui_path, self)
-        self.__model = files_model
+        self.__model = task_selection
+        self.__integrity_check = integrity_check
+        self.__added_items = ItemsListModel(self)
+        self.__removed_items = ItemsListModel(self)
         self.__init()
 
+    ###########################################################################
+    # PUBLIC MEMBER FUNCTIONS
+    ###########################################################################
+
+    # -------------------------------------------------------------------------
+    @override
+    def done(self, result: int) -> None:
+        # The scan is useless once the dialog is closed, and the items still
+        # on their way must not come after the model update
+        if self.__integrity_check is not None:
+            self.__stopCheck()
+            self.__integrity_check.signals.items_found.disconnect(self.__itemsFound)
+
+        super().done(result)
+
+    # -------------------------------------------------------------------------
+    def addNewItems(self, task_selection: TaskSelection, new_items: IntegrityReport) -> None:
+        # The items newly added to the warnings of the task, by a change
+        # watcher for instance, are shown with the others
+        if task_selection is self.__model:
+            self.__added_items.appendItems(new_items.added_items)
+            self.__removed_items.appendItems(new_items.removed_items)
+
     ###########################################################################
     # PRIVATE MEMBER FUNCTIONS
     ###########################################################################
 
     # -------------------------------------------------------------------------
     def __init(self) -> None:
-        warnings = self.__model.warnings()
-        self.__initAddedItems(warnings)
-        self.__initRemovedItems(warnings)
+        self.__ui.added_items.setModel(self.__added_items)
+        self.__ui.removed_items.setModel(self.__removed_items)
+
+        warnings = self.__model.warnings
+        self.__added_items.appendItems(warnings.addedItems())
+        self.__removed_items.appendItems(warnings.removedItems())
 
+        self.__initProgress()
         self.__initConnect()
 
     # -------------------------------------------------------------------------
-    def __initAddedItems(self, warnings: Warnings) -> None:
-        added_items = warnings.addedItems()
-        self.added_items.addItems(added_items)
+    def __initProgress(self) -> None:
+        if self.__integrity_check is None:
+            self.__ui.progress_bar.hide()
+            self.__ui.button_stop.hide()
+            return
 
-    # -------------------------------------------------------------------------
-    def __initRemovedItems(self, warnings: Warnings) -> None:
-        removed_items = warnings.removedItems()
-        self.removed_items.addItems(removed_items)
+        # Busy indicator until the first folders are found
+        self.__ui.progress_bar.setRange(0, 0)
 
     # -------------------------------------------------------------------------
     def __initConnect(self) -> None:
         self.__ui.button_box.clicked.connect(self.__buttonClicked)
 
+        if self.__integrity_check is not None:
+            signals = self.__integrity_check.signals
+            signals.items_found.connect(self.__itemsFound)
+            signals.progress_changed.connect(self.__progressChanged)
+            signals.finished.connect(self.__checkFinished)
+            self.__ui.button_stop.clicked.connect(self.__stopCheck)
+
+    # -------------------------------------------------------------------------
+    def __stopCheck(self) -> None:
+        if self.__integrity_check is not None:
+            self.__integrity_check.cancel()
+            self.__ui.button_stop.setEnabled(False)
+
     ###########################################################################
     # PRIVATE SLOT
     ###########################################################################
 
+    # -------------------------------------------------------------------------
+    def __itemsFound(self, added_items: list[str], removed_items: list[str]) -> None:
+        # The warnings found so far can be applied before the scan completes
+        new_items = self.__model.addIntegrityReport(IntegrityReport(added_items, removed_items))
+        self.__added_items.appendItems(new_items.added_items)
+        self.__removed_items.appendItems(new_items.removed_items)
+
+    # -------------------------------------------------------------------------
+    def __progressChanged(self, nb_scanned_dirs: int, nb_found_dirs: int) -> None:
+        if nb_found_dirs:
+            self.__ui.progress_bar.setRange(0, nb_found_dirs)
+            self.__ui.progress_bar.setValue(nb_scanned_dirs)
+
+    # -------------------------------------------------------------------------
+    def __checkFinished(self, is_cancelled: bool) -> None:
+        self.__integrity_check = None
+        # The dialog compares the whole selection
+        if not is_cancelled:
+            self.__model.markChecked()
+        self.__ui.button_stop.setEnabled(False)
+
+        if is_cancelled:
+            self.__ui.progress_bar.setFormat(self.tr("Stopped at %p%"))
+        else:
+            self.__ui.progress_bar.setRange(0, 1)
+            self.__ui.progress_bar.setValue(1)
+
     # -------------------------------------------------------------------------
     def __buttonClicked(self, button: QAbstractButton) -> None:
         if button.text() == "Apply":
+            self.__stopCheck()
             self.__model.updateModel()
             super().accept()
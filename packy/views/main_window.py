@@ -6,6 +6,7 @@ See LICENCE.md file for more information.
 """
 
 # Python
+import dataclasses
 import json
 import os
 from pathlib import Path
@@ -16,37 +17,47 @@ import yaml
 from PySide6 import QtCore, QtWidgets
 from PySide6.QtCore import QLibraryInfo, QLocale, QModelIndex, QTranslator, Qt, QCoreApplication, QItemSelection, QThreadPool, QStandardPaths, QUrl, Slot, qDebug
 from PySide6.QtGui import QCloseEvent, QDesktopServices, QIcon
-from PySide6.QtWidgets import QAbstractItemDelegate, QButtonGroup, QDataWidgetMapper, QFileDialog, QMainWindow, QPlainTextEdit, QMessageBox, QRadioButton, QWidget
+from PySide6.QtWidgets import QAbstractItemDelegate, QButtonGroup, QCheckBox, QComboBox, QDataWidgetMapper, QFileDialog, QMainWindow, QPlainTextEdit, QMessageBox, QRadioButton, QSpinBox, QWidget
 
 # PackY
 from packy.core.app_config import AppConfig
 from packy.core.ui_strings import UIStrings
 # from packy.models.archiver_config_model import ArchiveFormat, CompressionLevel, CompressionMethod, DataName, ArchiverConfigModel
 from packy.models.archiver_config_model import ArchiveFormat, ArchiverConfigModel, CompressionLevel, CompressionMethod
-from packy.models.packer_factory import createPacker
+from packy.models.change_watcher import ChangeWatcher
+from packy.models.event_buffer import EventBuffer, EventLevel, EventPump
+from packy.models.integrity_check import IntegrityCheck
+from packy.models.integrity_scanner import IntegrityReport
+from packy.models.packer import Packer
 from packy.core.settings import Settings
 from packy.models.progression import Progression
+from packy.models.run_plan import RetentionPolicy
+from packy.models.run_scheduler import RunScheduler
 from packy.models.tasks_model import TasksModel
-from packy.models.tasks_model import TaskProperties
+from packy.models.tasks_model import TaskPriority, TaskProperties, TaskStatus
 from packy.models.session import Session
 from packy.models.session_encoder import SessionEncoder
 from packy.models.session_decoder import SessionDecoder
+from packy.models.task_selection import TaskSelection
 from packy.ui.radio_group_binder import RadioGroupBinder
-from packy.views.messages_widget import MessagesWidget, MsgType
+from packy.views.messages_widget import DEFAULT_CAPACITY, MessagesWidget, MsgType
 from packy.views.tree_view_proxy_model import TreeViewProxyModel
 from packy.utils.external_data_access import ExternalData, external_data_path
 from packy.views.about_dialog import AboutDialog
-from packy.views.options_dialog import OptionsDialog
+from packy.views.options_dialog import OptionsDialog, SettingsKeys, SnapshotRetentionPolicy
 from packy.views.fix_warnings import FixWarnings
 from packy.ui.ui_main_window import Ui_MainWindow
 from typing import Any, override
 
+# The block size of the format options is shown in KiB
+BLOCK_SIZE_UNIT = 1024
+
 ###############################################################################
 class MainWindow(QMainWindow):
     ###########################################################################
     # PRIVATE MEMBER VARIABLES
     #
-    # __thread_pool:
+    # __scheduler: starts the runs as their disks and the cores are free.
     # __session: the current opened session.
     # __selected_task: the current selected task.
     # __progression: the progression model.
@@ -55,6 +66,11 @@ class MainWindow(QMainWindow):
     # __packer_mapper:
     # __packer_type_mapper:
     # __is_canceled:
+    # __event_pump: hands the messages of the runs to the log in batches.
+    # __change_watcher: keeps the warnings of the tasks current, if enabled.
+    # __shown_check: the check of the task shown which was never compared
+    #                to the file system, if any.
+    # __shown_check_task: the task compared by __shown_check.
     ###########################################################################
 
     ###########################################################################
@@ -81,10 +97,35 @@ class MainWindow(QMainWindow):
         self.__setup_connections()
         self.__initApplication()
 
-        self.__thread_pool = QThreadPool()
-        self.__thread_pool.setMaxThreadCount(1)
+        self.__scheduler = RunScheduler(
+            io_slots=self.__settings.value(SettingsKeys.IO_SLOTS_PER_DEVICE, 1), parent=self
+        )
+        self.__scheduler.setDurations(
+            json.loads(self.__settings.value(SettingsKeys.RUN_DURATIONS, "{}"))
+        )
+        self.__scheduler.run_started.connect(self.__connectPacker)
+        self.__scheduler.all_finished.connect(self.__runAllFinished)
         self.__is_canceled = False
 
+        # One message out of ITEM_MESSAGES_SAMPLING is shown for the items packed
+        event_buffer = EventBuffer.default()
+        event_buffer.setDetailSampling(
+            self.__settings.value(SettingsKeys.ITEM_MESSAGES_SAMPLING, 1)
+        )
+        self.__event_pump = EventPump(event_buffer, self)
+        self.__event_pump.events_drained.connect(self.__showEvents)
+        # Only the last MESSAGES_CAPACITY messages are kept in the view
+        self.__ui.messages_view.setCapacity(
+            self.__settings.value(SettingsKeys.MESSAGES_CAPACITY, DEFAULT_CAPACITY)
+        )
+
+        self.__change_watcher: ChangeWatcher | None = None
+        if self.__settings.value(SettingsKeys.WATCH_SOURCES, True):
+            self.__change_watcher = ChangeWatcher(self)
+            self.__change_watcher.changes_found.connect(self.__warningsChanged)
+        self.__shown_check: IntegrityCheck | None = None
+        self.__shown_check_task: TasksModel | None = None
+
         self.__initConnects()
         # self.__initSessionView()
         # self.__initTaskView()
@@ -113,6 +154,15 @@ class MainWindow(QMainWindow):
         # Messages widgets
         self.messages_view = MessagesWidget()
 
+        # Task widgets
+        self.__priority_combo = QComboBox(self.__ui.output_group)
+        self.__priority_combo.setObjectName("priority_combo")
+        self.__priority_combo.addItem(self.tr("Low"), TaskPriority.LOW.value)
+        self.__priority_combo.addItem(self.tr("Normal"), TaskPriority.NORMAL.value)
+        self.__priority_combo.addItem(self.tr("High"), TaskPriority.HIGH.value)
+        self.__ui.output_layout.addRow(self.tr("Priority:"), self.__priority_combo)
+        self.__showPriority(TaskPriority.NORMAL)
+
         # Archiver configuration widgets
         self.__formats_button_group = QButtonGroup(self)
         self.__formats_button_group.setObjectName("formats_button_group")
@@ -130,6 +180,37 @@ class MainWindow(QMainWindow):
         for level in CompressionLevel.__members__.values():
             self.__ui.compression_level_combo.addItem(level.label, level)
 
+        # Format options widgets, only the rows of the current format are shown
+        self.__workers_spin = QSpinBox(self.__ui.archiver_config_group)
+        self.__workers_spin.setObjectName("workers_spin")
+        self.__workers_spin.setRange(0, 256)
+        self.__workers_spin.setSpecialValueText(self.tr("All cores"))
+
+        self.__block_size_spin = QSpinBox(self.__ui.archiver_config_group)
+        self.__block_size_spin.setObjectName("block_size_spin")
+        self.__block_size_spin.setRange(0, 1024 * 1024)
+        self.__block_size_spin.setSuffix(" KiB")
+        self.__block_size_spin.setSpecialValueText(self.tr("Codec default"))
+
+        self.__store_incompressible_check = QCheckBox(self.__ui.archiver_config_group)
+        self.__store_incompressible_check.setObjectName("store_incompressible_check")
+        self.__store_incompressible_check.setText(self.tr("Store incompressible data"))
+
+        self.__long_distance_matching_check = QCheckBox(self.__ui.archiver_config_group)
+        self.__long_distance_matching_check.setObjectName("long_distance_matching_check")
+        self.__long_distance_matching_check.setText(self.tr("Long-distance matching"))
+
+        self.__format_option_widgets: dict[str, QWidget] = {
+            "workers": self.__workers_spin,
+            "block_size": self.__block_size_spin,
+            "store_incompressible": self.__store_incompressible_check,
+            "long_distance_matching": self.__long_distance_matching_check,
+        }
+        self.__ui.archiver_config_layout.addRow(self.tr("Workers:"), self.__workers_spin)
+        self.__ui.archiver_config_layout.addRow(self.tr("Block size:"), self.__block_size_spin)
+        self.__ui.archiver_config_layout.addRow(self.__store_incompressible_check)
+        self.__ui.archiver_config_layout.addRow(self.__long_distance_matching_check)
+
     # -------------------------------------------------------------------------
     def __read_settings(self) -> None:
         self.__settings.restore_layout_geometry(self)
@@ -172,6 +253,22 @@ class MainWindow(QMainWindow):
         )
         self.__archiver_widget_mapper.toFirst()
 
+        self.__workers_spin.valueChanged.connect(
+            lambda value: self.__set_format_option("workers", value)
+        )
+        self.__block_size_spin.valueChanged.connect(
+            lambda value: self.__set_format_option("block_size", value * BLOCK_SIZE_UNIT)
+        )
+        self.__store_incompressible_check.toggled.connect(
+            lambda checked: self.__set_format_option("store_incompressible", checked)
+        )
+        self.__long_distance_matching_check.toggled.connect(
+            lambda checked: self.__set_format_option("long_distance_matching", checked)
+        )
+        self.__archiver_model.format_changed.connect(self.__show_format_options)
+        self.__archiver_model.options_changed.connect(self.__show_format_options)
+        self.__show_format_options()
+
     # -------------------------------------------------------------------------
     def __connect_file_menu_actions(self) -> None:
         # self.__ui.action_new_session.triggered.connect(self.__createNewSession)
@@ -187,6 +284,33 @@ class MainWindow(QMainWindow):
         self.__ui.action_github_repo.triggered.connect(self.__open_github_repo)
         self.__ui.action_about.triggered.connect(self.__open_about_dialog)
 
+    # -------------------------------------------------------------------------
+    @Slot(result=None)
+    def __show_format_options(self) -> None:
+        options = self.__archiver_model.options
+        for name, widget in self.__format_option_widgets.items():
+            has_option = hasattr(options, name)
+            self.__ui.archiver_config_layout.setRowVisible(widget, has_option)
+            if not has_option:
+                continue
+
+            # Showing the options must not write them back
+            value = getattr(options, name)
+            widget.blockSignals(True)
+            if isinstance(widget, QCheckBox):
+                widget.setChecked(value)
+            elif widget is self.__block_size_spin:
+                widget.setValue(value // BLOCK_SIZE_UNIT)
+            else:
+                widget.setValue(value)
+            widget.blockSignals(False)
+
+    # -------------------------------------------------------------------------
+    def __set_format_option(self, name: str, value: Any) -> None:
+        options = self.__archiver_model.options
+        if hasattr(options, name):
+            self.__archiver_model.options = dataclasses.replace(options, **{name: value})
+
     # -------------------------------------------------------------------------
     @Slot(result=None)
     def __open_options_dialog(self) -> None:
@@ -278,6 +402,13 @@ class MainWindow(QMainWindow):
     def __updateSessionViewModel(self) -> None:
         self.__ui.table_view_session.setModel(self.__session)
         self.__ui.table_view_session.selectionModel().selectionChanged.connect(self.__mapViewWithTask)
+        self.__watchSessionTasks()
+
+    # -------------------------------------------------------------------------
+    def __watchSessionTasks(self) -> None:
+        if self.__change_watcher is not None:
+            selections = (task.filesSelected() for task in self.__session.tasks())
+            self.__change_watcher.setSelections(selections)
 
     # -------------------------------------------------------------------------
     def __initTaskView(self) -> None:
@@ -293,6 +424,8 @@ class MainWindow(QMainWindow):
         self.__progression_mapper.setModel(self.__progression)
         self.__progression_mapper.addMapping(self.__ui.pbar_global_progress, 0, b"value")
         self.__progression_mapper.addMapping(self.__ui.pbar_task_progress, 1, b"value")
+        self.__progression_mapper.addMapping(self.__ui.pbar_global_progress, 2, b"format")
+        self.__progression_mapper.addMapping(self.__ui.pbar_task_progress, 3, b"format")
         self.__progression_mapper.toFirst()
 
     # -------------------------------------------------------------------------
@@ -340,10 +473,15 @@ class MainWindow(QMainWindow):
             self.__ui.line_edit_destination, TaskProperties.DST_FILE.value, b"text"
         )
         self.__task_view_mapper.toFirst()
+        self.__showPriority(task.priority)
+
+    # -------------------------------------------------------------------------
+    def __showPriority(self, priority: TaskPriority) -> None:
+        self.__priority_combo.setCurrentIndex(self.__priority_combo.findData(priority.value))
 
     # -------------------------------------------------------------------------
     def __updateFilesSelection(self) -> None:
-        files_model = self.__selected_task.filesSelected()
+        files_model = self.__selected_task.filesModel()
         root_path = files_model.rootPath()
 
         filtering_model = TreeViewProxyModel(root_path)
@@ -357,16 +495,36 @@ class MainWindow(QMainWindow):
         for col_index in range(1, files_model.columnCount()):
             self.__ui.tree_view_source.setColumnHidden(col_index, True)
 
-        files_model.directoryLoaded.connect(self.__updateTreeChildren)
+        # Only the task shown keeps its file system model
+        for task in self.__session.tasks():
+            if task is not self.__selected_task:
+                task.releaseFilesModel()
+
+        if self.__change_watcher is not None:
+            unique_connection = Qt.ConnectionType.UniqueConnection
+            files_model.dataChanged.connect(self.__change_watcher.refresh, unique_connection)
+            files_model.rowsInserted.connect(self.__change_watcher.refresh, unique_connection)
+
+        self.__checkShownTask()
 
     # -------------------------------------------------------------------------
-    def __updateTreeChildren(self, path: str) -> None:
-        files_model = self.__selected_task.filesSelected()
-        index = files_model.index(path)
+    def __checkShownTask(self) -> None:
+        # Loading a session scans nothing, a task is compared once it is
+        # first shown
+        if self.__shown_check is not None:
+            self.__shown_check.cancel()
+            self.__shown_check = None
+
+        task_selection = self.__selected_task.filesSelected()
+        if task_selection.is_checked:
+            return
+
+        self.__shown_check = IntegrityCheck(task_selection.startIntegrityCheck())
+        self.__shown_check_task = self.__selected_task
+        self.__shown_check.signals.items_found.connect(self.__shownTaskItemsFound)
+        self.__shown_check.signals.finished.connect(self.__shownTaskChecked)
+        QThreadPool.globalInstance().start(self.__shown_check)
 
-        if files_model.filePath(index) != self.__ui.line_edit_source.text():
-            parent_check_state = files_model.data(index, Qt.ItemDataRole.CheckStateRole)
-            files_model.setData(index, parent_check_state, Qt.ItemDataRole.CheckStateRole)
 
     # -------------------------------------------------------------------------
     def __updatePackerViewMapper(self) -> None:
@@ -472,6 +630,7 @@ class MainWindow(QMainWindow):
         self.__ui.compression_method_combo.clear()
         self.__ui.compression_level_combo.clear()
         self.__ui.tree_view_source.setModel(None)
+        self.__showPriority(TaskPriority.NORMAL)
 
         checked_button = self.__formats_button_group.checkedButton()
         if checked_button:
@@ -501,6 +660,7 @@ class MainWindow(QMainWindow):
         self.__ui.push_button_destination.clicked.connect(self.__selectDestinationFile)
         self.__formats_button_group.buttonClicked.connect(self.__updatePackerType)
         self.__ui.compression_method_combo.activated.connect(self.__updateCompressionLevel)
+        self.__priority_combo.activated.connect(self.__updatePriority)
 
     ###########################################################################
     # PRIVATE SLOTS
@@ -514,8 +674,6 @@ class MainWindow(QMainWindow):
         self.__ui.push_button_edit.setEnabled(False)
         self.__ui.push_button_run_all.setEnabled(False)
         self.__clearTaskProperties()
-        self.__ui.pbar_global_progress.setFormat("%p%")
-        self.__ui.pbar_task_progress.setFormat("%p%")
         self.__progression.init()
         self.__setTitle()
 
@@ -569,6 +727,7 @@ class MainWindow(QMainWindow):
 
         self.__selected_task = self.__session.taskAt(row_inserted)
         self.__ui.table_view_session.selectRow(row_inserted)
+        self.__watchSessionTasks()
 
         self.__enableTaskProperties()
         self.__updateCompressionMethod()
@@ -579,6 +738,7 @@ class MainWindow(QMainWindow):
         model = self.__ui.table_view_session.model()
         current_row = self.__ui.table_view_session.currentIndex().row()
         model.removeRow(current_row)
+        self.__watchSessionTasks()
 
         if self.__session.nbTasks() == 0:
             self.__ui.push_button_remove.setEnabled(False)
@@ -604,14 +764,58 @@ class MainWindow(QMainWindow):
 
     # -------------------------------------------------------------------------
     def __checkIntegrity(self):
-        self.__selected_task.checkIntegrity()
+        task_selection = self.__selected_task.filesSelected()
+
+        # The warnings of a watched task are current, so nothing is scanned
+        if self.__change_watcher is not None and self.__change_watcher.isUpToDate(task_selection):
+            dlg = FixWarnings(task_selection, None, self)
+        else:
+            # The scan runs in the background, streaming its results into the dialog
+            integrity_check = IntegrityCheck(task_selection.startIntegrityCheck())
+            dlg = FixWarnings(task_selection, integrity_check, self)
+            QThreadPool.globalInstance().start(integrity_check)
+
+        # The changes the watcher finds while the dialog is open are shown too
+        if self.__change_watcher is not None:
+            self.__change_watcher.changes_found.connect(dlg.addNewItems)
+            dlg.exec()
+            self.__change_watcher.changes_found.disconnect(dlg.addNewItems)
+            self.__change_watcher.refresh()
+        else:
+            dlg.exec()
+
+    # -------------------------------------------------------------------------
+    def __shownTaskItemsFound(self, added_items: list[str], removed_items: list[str]) -> None:
+        # The items of a check cancelled since are dropped
+        if self.__shown_check is None or self.sender() is not self.__shown_check.signals:
+            return
+
+        task = self.__shown_check_task
+        new_items = task.filesSelected().addIntegrityReport(
+            IntegrityReport(added_items, removed_items)
+        )
+        self.__warningsChanged(task.filesSelected(), new_items)
+
+    # -------------------------------------------------------------------------
+    def __shownTaskChecked(self, is_cancelled: bool) -> None:
+        if self.__shown_check is None or self.sender() is not self.__shown_check.signals:
+            return
 
-        dlg = FixWarnings(self.__selected_task.filesSelected(), self)
-        dlg.exec()
+        if not is_cancelled:
+            self.__shown_check_task.filesSelected().markChecked()
+            # The changes made meanwhile can now be compared
+            if self.__change_watcher is not None:
+                self.__change_watcher.refresh()
+        self.__shown_check = None
+        self.__shown_check_task = None
+
+    # -------------------------------------------------------------------------
+    def __warningsChanged(self, task_selection: TaskSelection, new_items: IntegrityReport) -> None:
+        self.__session.emitSelectionChanged(task_selection)
 
     # -------------------------------------------------------------------------
     def __selectSourceFolder(self):
-        files_model = self.__selected_task.filesSelected()
+        files_model = self.__selected_task.filesModel()
         selected_folder = QFileDialog.getExistingDirectory(
             self, "Select folder", self.__ui.line_edit_source.text(), QFileDialog.Option.ShowDirsOnly
         )
@@ -636,6 +840,11 @@ class MainWindow(QMainWindow):
         if raw_basename:
             self.__selected_task.setRawDstFile(raw_basename)
 
+    # -------------------------------------------------------------------------
+    def __updatePriority(self) -> None:
+        # The runs submitted from now on are ordered by the new priority
+        self.__selected_task.setPriority(TaskPriority(self.__priority_combo.currentData()))
+
     # -------------------------------------------------------------------------
     def __updatePackerType(self, button: QtWidgets.QAbstractButton):
         self.__packer_type_mapper.submit()
@@ -704,39 +913,93 @@ class MainWindow(QMainWindow):
             self.__progression.init()
             self.__progression.setNbTask(self.__session.nbCheckedTasks())
 
-            self.__ui.pbar_global_progress.setFormat("%p%")
-            self.__ui.pbar_task_progress.setFormat("%p%")
-
             tasks = self.__session.tasks()
+            retention = self.__retentionPolicy()
 
             for task in tasks:
                 if task.isChecked() == Qt.CheckState.Checked.value:
-                    packer = createPacker(task)
-                    packer.signals.info.connect(lambda msg: QtCore.qInfo(msg))
-                    packer.signals.error.connect(self.__progression.errorReported)
-                    packer.signals.progress.connect(self.__progression.updateTaskProgress)
-                    packer.signals.finish.connect(self.__progression.updateGlobalProgress)
-                    self.__thread_pool.start(packer)
-                    packer.signals.finish.connect(self.__runAllFinished)
+                    # The packer only reads the plan, never the task nor the settings
+                    self.__scheduler.submit(task.runPlan(retention), task.priority.value)
+            self.__scheduler.start()
+
+    # -------------------------------------------------------------------------
+    def __connectPacker(self, packer: Packer) -> None:
+        packer.signals.error.connect(self.__progression.errorReported)
+        packer.signals.error.connect(self.__showError)
+        packer.signals.bytes_progress.connect(self.__progression.updateTaskBytes)
+        packer.signals.status_changed.connect(self.__updateTaskStatus)
+        packer.signals.status_changed.connect(self.__progression.taskEnded)
+        packer.signals.finish.connect(self.__progression.updateGlobalProgress)
+
+    # -------------------------------------------------------------------------
+    def __showEvents(self, events: list[tuple[EventLevel, str]]) -> None:
+        # The messages about each item would flood the debug log, they are
+        # only shown
+        for level, message in events:
+            if level != EventLevel.DETAIL:
+                QtCore.qInfo(message)
+        # A single insert per drain, so the view is updated once
+        self.__ui.messages_view.insert_lines(
+            (message, MsgType.DETAIL if level == EventLevel.DETAIL else MsgType.INFO)
+            for level, message in events
+        )
+
+    # -------------------------------------------------------------------------
+    def __showError(self, message: str) -> None:
+        self.__ui.messages_view.insert_line(message, MsgType.ERROR)
+
+    # -------------------------------------------------------------------------
+    def __retentionPolicy(self) -> RetentionPolicy:
+        policy = self.__settings.value(
+            SettingsKeys.RETENTION_POLICY, SnapshotRetentionPolicy.KEEP_ALL.value
+        )
+        full_interval = self.__settings.value(SettingsKeys.FULL_SNAPSHOT_INTERVAL, 1)
+        dry_run = self.__settings.value(SettingsKeys.RETENTION_DRY_RUN, False)
+
+        match policy:
+            case SnapshotRetentionPolicy.KEEP_LAST_N.value:
+                nb_snapshots = self.__settings.value(SettingsKeys.RETENTION_COUNT, 1)
+                return RetentionPolicy(nb_snapshots, full_interval, dry_run=dry_run)
+            case SnapshotRetentionPolicy.TIERED.value:
+                return RetentionPolicy(
+                    self.__settings.value(SettingsKeys.RETENTION_COUNT, 1),
+                    full_interval,
+                    daily=self.__settings.value(SettingsKeys.RETENTION_DAILY, 7),
+                    weekly=self.__settings.value(SettingsKeys.RETENTION_WEEKLY, 4),
+                    monthly=self.__settings.value(SettingsKeys.RETENTION_MONTHLY, 12),
+                    yearly=self.__settings.value(SettingsKeys.RETENTION_YEARLY, 0),
+                    dry_run=dry_run,
+                )
+            case _:
+                return RetentionPolicy(None, full_interval)
+
+    # -------------------------------------------------------------------------
+    def __updateTaskStatus(self, task_id: int, status: TaskStatus) -> None:
+        for task in self.__session.tasks():
+            if task.id == task_id:
+                task.updateStatus(status)
 
     # -------------------------------------------------------------------------
     def __cancelRun(self) -> None:
-        self.__thread_pool.clear()
-        QtCore.qInfo("<b>Cancel. Waiting for the current task to finish.<b>")
+        QtCore.qInfo("<b>Cancel. Stopping the running tasks.<b>")
 
-        self.__ui.pbar_global_progress.setFormat("Stopping...")
-        self.__ui.pbar_task_progress.setFormat("Stopping...")
+        self.__progression.setMessage("Stopping...")
         self.__is_canceled = True
+        self.__scheduler.cancel()
 
     # -------------------------------------------------------------------------
     def __runAllFinished(self):
-        if self.__thread_pool.activeThreadCount() == 0:
-            if self.__is_canceled:
-                self.__ui.pbar_global_progress.setFormat("Stopped")
-                self.__ui.pbar_task_progress.setFormat("Stopped")
-                self.__is_canceled = False
+        # The last messages of the runs come before the report
+        self.__event_pump.flush()
+        self.__settings.set_value(
+            SettingsKeys.RUN_DURATIONS, json.dumps(self.__scheduler.durations())
+        )
+
+        if self.__is_canceled:
+            self.__progression.setMessage("Stopped")
+            self.__is_canceled = False
 
-            self.__enableTask()
+        self.__enableTask()
 
-            report = f"<b>{self.__progression.report()}</b>"
-            QtCore.qInfo(report)
+        report = f"<b>{self.__progression.report()}</b>"
+        QtCore.qInfo(report)
@@ -1,7 +1,12 @@
 """Message display widgets and utilities for formatted UI logging.
 
-This module provides a QTextEdit-based widget for displaying colored
-messages in a GUI, along with a message type enumeration.
+This module provides a widget for displaying colored messages in a GUI,
+along with a message type enumeration.
+
+The messages are kept by a list model in a ring buffer, so only the most
+recent ones are kept once the capacity is reached, and each new message
+costs the same however long the run. The list view only lays out the rows
+visible, and a proxy model filters the messages by type and text.
 
 Typical usage example:
 
@@ -18,13 +23,40 @@ See LICENCE.md file for more information.
 from packy.core.ui_strings import UIStrings
 
 # Third-party
-from PySide6.QtCore import Slot
-from PySide6.QtGui import QAction, QContextMenuEvent
-from PySide6.QtWidgets import QMenu, QTextEdit, QWidget
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QObject,
+    QPersistentModelIndex,
+    QPoint,
+    QSortFilterProxyModel,
+    Qt,
+    Slot,
+)
+from PySide6.QtGui import QAction, QColor, QGuiApplication
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QHBoxLayout,
+    QLineEdit,
+    QListView,
+    QMenu,
+    QVBoxLayout,
+    QWidget,
+)
 
 # Standard library
+import html
+import re
+from collections.abc import Iterable
 from enum import IntEnum, auto
-from typing import final, override
+from typing import Any, final, override
+
+# Number of messages kept by default, the oldest being dropped beyond it
+DEFAULT_CAPACITY = 100_000
+
+# The messages may be formatted as rich text, which the list shows as plain text
+_TAG_PATTERN = re.compile(r"<[^>]*>")
 
 
 ###############################################################################
@@ -32,25 +64,245 @@ class MsgType(IntEnum):
     """Enumeration of message severity levels for UI display.
 
     Attributes:
+        DETAIL (int): Informational message about a single item.
         INFO (int): Informational message.
         SUCCESS (int): Successful operation message.
         ERROR (int): Error message.
     """
 
+    DETAIL = 0
     INFO = 1
     SUCCESS = auto()
     ERROR = auto()
 
 
+_MSG_COLORS: dict[MsgType, QColor] = {
+    MsgType.DETAIL: QColor("gray"),
+    MsgType.INFO: QColor("blue"),
+    MsgType.SUCCESS: QColor("green"),
+    MsgType.ERROR: QColor("red"),
+}
+
+
+###############################################################################
+@final
+class MessagesModel(QAbstractListModel):
+    """List model of the most recent messages, kept in a ring buffer.
+
+    Once the capacity is reached, each message added overwrites the oldest
+    one in place, so adding and reading a message never depend on the
+    number of messages kept.
+
+    Attributes:
+        TYPE_ROLE (int): Role of the ``MsgType`` of a message.
+        __capacity (int): The maximum number of messages kept.
+        __messages (list[tuple[str, MsgType]]): The slots of the buffer,
+            only grown up to the capacity as messages are added.
+        __start (int): Slot of the oldest message.
+        __count (int): The number of messages kept.
+    """
+
+    TYPE_ROLE = Qt.ItemDataRole.UserRole
+
+    # -------------------------------------------------------------------------
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, parent: QObject | None = None) -> None:
+        """Initializes an empty model.
+
+        Args:
+            capacity (int): The maximum number of messages kept. Defaults to
+                ``DEFAULT_CAPACITY``.
+            parent (QObject | None): The parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self.__capacity: int = max(1, capacity)
+        self.__messages: list[tuple[str, MsgType]] = []
+        self.__start: int = 0
+        self.__count: int = 0
+
+    # -------------------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        """The maximum number of messages kept."""
+        return self.__capacity
+
+    # -------------------------------------------------------------------------
+    def setCapacity(self, capacity: int) -> None:
+        """Changes the maximum number of messages kept.
+
+        The oldest messages are dropped if there are more than the new
+        capacity.
+
+        Args:
+            capacity (int): The maximum number of messages kept.
+        """
+        capacity = max(1, capacity)
+        if capacity == self.__capacity:
+            return
+
+        self.beginResetModel()
+        self.__messages = self.messages()[-capacity:]
+        self.__start = 0
+        self.__count = len(self.__messages)
+        self.__capacity = capacity
+        self.endResetModel()
+
+    # -------------------------------------------------------------------------
+    def messages(self) -> list[tuple[str, MsgType]]:
+        """Returns the messages kept, from the oldest to the newest."""
+        end = self.__start + self.__count
+        if end <= len(self.__messages):
+            return self.__messages[self.__start : end]
+        return self.__messages[self.__start :] + self.__messages[: end - self.__capacity]
+
+    # -------------------------------------------------------------------------
+    def appendMessages(self, messages: Iterable[tuple[str, MsgType]]) -> None:
+        """Adds messages after the newest one, dropping the oldest if need be.
+
+        Args:
+            messages (Iterable[tuple[str, MsgType]]): The texts and types of
+                the messages, from the oldest to the newest.
+        """
+        capacity = self.__capacity
+        new_messages = list(messages)[-capacity:]
+        if not new_messages:
+            return
+
+        nb_dropped = self.__count + len(new_messages) - capacity
+        if nb_dropped > 0:
+            # The rows dropped are removed first, so the views never see more
+            # rows than the capacity
+            self.beginRemoveRows(QModelIndex(), 0, nb_dropped - 1)
+            if len(self.__messages) < capacity:
+                # The free slots may now be before the oldest message
+                self.__messages.extend([("", MsgType.INFO)] * (capacity - len(self.__messages)))
+            self.__start = (self.__start + nb_dropped) % capacity
+            self.__count -= nb_dropped
+            self.endRemoveRows()
+
+        messages = self.__messages
+        first_row = self.__count
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(new_messages) - 1)
+        for message in new_messages:
+            slot = (self.__start + self.__count) % capacity
+            if slot == len(messages):
+                messages.append(message)
+            else:
+                messages[slot] = message
+            self.__count += 1
+        self.endInsertRows()
+
+    # -------------------------------------------------------------------------
+    def clear(self) -> None:
+        """Removes every message."""
+        self.beginResetModel()
+        self.__messages = []
+        self.__start = 0
+        self.__count = 0
+        self.endResetModel()
+
+    # -------------------------------------------------------------------------
+    @override
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.__count
+
+    # -------------------------------------------------------------------------
+    @override
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = 0) -> Any:
+        if not index.isValid():
+            return None
+
+        text, msg_type = self.__messages[(self.__start + index.row()) % self.__capacity]
+        match role:
+            case Qt.ItemDataRole.DisplayRole:
+                return text
+            case Qt.ItemDataRole.ForegroundRole:
+                return _MSG_COLORS[msg_type]
+            case MessagesModel.TYPE_ROLE:
+                return msg_type
+        return None
+
+
+###############################################################################
+@final
+class MessagesFilterModel(QSortFilterProxyModel):
+    """Proxy model keeping the messages of the types shown and with a text.
+
+    The type of a message is checked first, since it is cheaper than
+    searching its text.
+
+    Attributes:
+        __min_type (MsgType): The messages of a lower type are hidden.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, parent: QObject | None = None) -> None:
+        """Initializes a proxy showing every message.
+
+        Args:
+            parent (QObject | None): The parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self.__min_type: MsgType = MsgType.DETAIL
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+    # -------------------------------------------------------------------------
+    @property
+    def min_type(self) -> MsgType:
+        """The messages of a lower type are hidden."""
+        return self.__min_type
+
+    # -------------------------------------------------------------------------
+    def setMinType(self, min_type: MsgType) -> None:
+        """Hides the messages of a lower type.
+
+        Args:
+            min_type (MsgType): The lowest type of the messages shown.
+        """
+        if min_type != self.__min_type:
+            self.beginFilterChange()
+            self.__min_type = min_type
+            self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+
+    # -------------------------------------------------------------------------
+    def setSearchText(self, text: str) -> None:
+        """Hides the messages not containing a text, whatever its case.
+
+        Args:
+            text (str): The text searched, every message being shown if empty.
+        """
+        self.setFilterFixedString(text)
+
+    # -------------------------------------------------------------------------
+    @override
+    def filterAcceptsRow(
+        self, source_row: int, source_parent: QModelIndex | QPersistentModelIndex
+    ) -> bool:
+        if self.__min_type != MsgType.DETAIL:
+            source_index = self.sourceModel().index(source_row, 0, source_parent)
+            if source_index.data(MessagesModel.TYPE_ROLE) < self.__min_type:
+                return False
+
+        return super().filterAcceptsRow(source_row, source_parent)
+
+
 ###############################################################################
 @final
-class MessagesWidget(QTextEdit):
-    """A text widget for displaying formatted messages with severity colors.
+class MessagesWidget(QWidget):
+    """A list widget for displaying formatted messages with severity colors.
+
+    Provides convenience methods to insert color-coded messages, a filter on
+    their type and text, and a context menu to copy or clear them.
 
-    Provides convenience methods to insert color-coded messages and extend
-    the default context menu with a clear action.
+    Attributes:
+        __model (MessagesModel): The messages kept.
+        __filter_model (MessagesFilterModel): The messages shown.
+        __type_combo (QComboBox): Selects the lowest type of the messages
+            shown.
+        __search_edit (QLineEdit): The text of the messages shown.
+        __list_view (QListView): Shows the messages.
     """
 
+    # -------------------------------------------------------------------------
     def __init__(self, parent: QWidget | None = None) -> None:
         """Initializes the message widget.
 
@@ -59,40 +311,98 @@ class MessagesWidget(QTextEdit):
         """
         super().__init__(parent)
 
-    @override
-    def contextMenuEvent(self, event: QContextMenuEvent) -> None:
-        menu: QMenu = super().createStandardContextMenu()
-        menu.addSeparator()
-        clear_action: QAction = QAction(UIStrings.tr(UIStrings.Menu.CLEAR), self)
-        clear_action.triggered.connect(self.clear_messages)
-        menu.addAction(clear_action)
-        menu.exec(event.globalPos())
+        self.__model: MessagesModel = MessagesModel(parent=self)
+        self.__filter_model: MessagesFilterModel = MessagesFilterModel(self)
+        self.__filter_model.setSourceModel(self.__model)
+
+        self.__type_combo: QComboBox = QComboBox(self)
+        self.__type_combo.addItem(UIStrings.tr(UIStrings.MessagesView.SHOW_ALL), MsgType.DETAIL)
+        self.__type_combo.addItem(UIStrings.tr(UIStrings.MessagesView.SHOW_INFO), MsgType.INFO)
+        self.__type_combo.addItem(
+            UIStrings.tr(UIStrings.MessagesView.SHOW_SUCCESS), MsgType.SUCCESS
+        )
+        self.__type_combo.addItem(UIStrings.tr(UIStrings.MessagesView.SHOW_ERROR), MsgType.ERROR)
+        self.__type_combo.currentIndexChanged.connect(self.__typeChanged)
+
+        self.__search_edit: QLineEdit = QLineEdit(self)
+        self.__search_edit.setPlaceholderText(UIStrings.tr(UIStrings.MessagesView.SEARCH))
+        self.__search_edit.setClearButtonEnabled(True)
+        self.__search_edit.textChanged.connect(self.__filter_model.setSearchText)
 
+        # With rows of the same height, the view only lays out the rows
+        # visible instead of measuring every message
+        self.__list_view: QListView = QListView(self)
+        self.__list_view.setModel(self.__filter_model)
+        self.__list_view.setUniformItemSizes(True)
+        self.__list_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.__list_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.__list_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.__list_view.customContextMenuRequested.connect(self.__showContextMenu)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(self.__type_combo)
+        filter_layout.addWidget(self.__search_edit, 1)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.__list_view)
+
+    # -------------------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        """The maximum number of messages kept."""
+        return self.__model.capacity
+
+    # -------------------------------------------------------------------------
+    def setCapacity(self, capacity: int) -> None:
+        """Changes the maximum number of messages kept, the oldest being dropped.
+
+        Args:
+            capacity (int): The maximum number of messages kept.
+        """
+        self.__model.setCapacity(capacity)
+
+    # -------------------------------------------------------------------------
     @Slot(result=None)
     def clear_messages(self) -> None:
         """Clears all displayed messages from the widget."""
-        super().clear()
+        self.__model.clear()
 
+    # -------------------------------------------------------------------------
     @Slot(result=None)
     def insert_line(self, message: str, msg_type: MsgType = MsgType.INFO) -> None:
-        """Inserts a formatted message line with color based on its type.
+        """Inserts a message line with color based on its type.
 
         Args:
             message (str): The message text to display.
             msg_type (MsgType): The type of message, determining its color.
                 Defaults to MsgType.INFO.
         """
-        match msg_type:
-            case MsgType.INFO:
-                msg_font_color = "blue"
-            case MsgType.SUCCESS:
-                msg_font_color = "green"
-            case MsgType.ERROR:
-                msg_font_color = "red"
+        self.insert_lines([(message, msg_type)])
+
+    # -------------------------------------------------------------------------
+    def insert_lines(self, messages: Iterable[tuple[str, MsgType]]) -> None:
+        """Inserts message lines at once, with colors based on their types.
 
-        message = f"<font color='{msg_font_color}'>{message}</font>"
-        super().append(message)
+        The view only follows the new messages if it showed the newest one.
 
+        Args:
+            messages (Iterable[tuple[str, MsgType]]): The texts and types of
+                the messages, from the oldest to the newest.
+        """
+        scroll_bar = self.__list_view.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+
+        self.__model.appendMessages(
+            (html.unescape(_TAG_PATTERN.sub("", message)), msg_type)
+            for message, msg_type in messages
+        )
+
+        if at_bottom:
+            self.__list_view.scrollToBottom()
+
+    # -------------------------------------------------------------------------
     @Slot(result=None)
     def print_op_pack_file(self, msg_type: MsgType, file_path: str) -> None:
         """Formats and displays a pack file operation message.
@@ -102,7 +412,7 @@ class MessagesWidget(QTextEdit):
             file_path (str): The file path involved in the operation.
         """
         match msg_type:
-            case MsgType.INFO:
+            case MsgType.DETAIL | MsgType.INFO:
                 message = UIStrings.tr(UIStrings.MessagesView.OP_INFO)
             case MsgType.SUCCESS:
                 message = UIStrings.tr(UIStrings.MessagesView.OP_SUCCESS)
@@ -111,3 +421,30 @@ class MessagesWidget(QTextEdit):
 
         message += UIStrings.tr(UIStrings.MessagesView.OP_PACK).format(file_path)
         self.insert_line(message, msg_type)
+
+    # -------------------------------------------------------------------------
+    @Slot(result=None)
+    def copy_selection(self) -> None:
+        """Copies the text of the selected messages to the clipboard."""
+        rows = sorted(index.row() for index in self.__list_view.selectedIndexes())
+        if rows:
+            QGuiApplication.clipboard().setText(
+                "\n".join(self.__filter_model.index(row, 0).data() for row in rows)
+            )
+
+    # -------------------------------------------------------------------------
+    def __typeChanged(self, index: int) -> None:
+        self.__filter_model.setMinType(MsgType(self.__type_combo.itemData(index)))
+
+    # -------------------------------------------------------------------------
+    def __showContextMenu(self, pos: QPoint) -> None:
+        menu: QMenu = QMenu(self)
+        copy_action: QAction = QAction(UIStrings.tr(UIStrings.Menu.COPY), menu)
+        copy_action.setEnabled(self.__list_view.selectionModel().hasSelection())
+        copy_action.triggered.connect(self.copy_selection)
+        menu.addAction(copy_action)
+        menu.addSeparator()
+        clear_action: QAction = QAction(UIStrings.tr(UIStrings.Menu.CLEAR), menu)
+        clear_action.triggered.connect(self.clear_messages)
+        menu.addAction(clear_action)
+        menu.exec(self.__list_view.viewport().mapToGlobal(pos))
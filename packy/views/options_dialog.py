@@ -34,7 +34,18 @@ class SettingsKeys:
     STATE = "State"
     RETENTION_POLICY = "Snapshot/Retention/Policy"
     RETENTION_COUNT = "Snapshot/Retention/Count"
+    RETENTION_DAILY = "Snapshot/Retention/Daily"
+    RETENTION_WEEKLY = "Snapshot/Retention/Weekly"
+    RETENTION_MONTHLY = "Snapshot/Retention/Monthly"
+    RETENTION_YEARLY = "Snapshot/Retention/Yearly"
+    RETENTION_DRY_RUN = "Snapshot/Retention/DryRun"
+    FULL_SNAPSHOT_INTERVAL = "Snapshot/FullInterval"
     ARCHIVE_FILENAME_SUFFIX = "Task/Archive/FilenameSuffix"
+    WATCH_SOURCES = "Task/Integrity/WatchSources"
+    IO_SLOTS_PER_DEVICE = "Scheduler/IoSlotsPerDevice"
+    RUN_DURATIONS = "Scheduler/RunDurations"
+    ITEM_MESSAGES_SAMPLING = "Messages/ItemSampling"
+    MESSAGES_CAPACITY = "Messages/Capacity"
 
 
 ###############################################################################
@@ -43,6 +54,7 @@ class SnapshotRetentionPolicy(StrEnum):
 
     KEEP_ALL = "KeepAll"
     KEEP_LAST_N = "KeepLastN"
+    TIERED = "Tiered"
 
 
 ###############################################################################
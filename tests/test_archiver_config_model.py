@@ -0,0 +1,135 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import dataclasses
+import json
+import pytest
+from jsonschema import ValidationError, validate
+
+# PackY
+from packy.models.archiver_config_model import (
+    ArchiveFormat,
+    ArchiverConfigModel,
+    CompressionLevel,
+    CompressionMethod,
+    CompressorOptions,
+    ZipOptions,
+    ZstdOptions,
+)
+from packy.utils.external_data_access import ExternalData, external_data_path
+
+
+# -----------------------------------------------------------------------------
+def packerDataSchema():
+    session_schema = json.load(open(external_data_path(ExternalData.JSON_SCHEMA)))
+    return session_schema["properties"]["tasks"]["items"]["properties"]["packer_data"]
+
+
+###############################################################################
+# TEST SERIALIZATION
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The options of the format are saved with the archiver configuration of a
+# task, and read back as they were.
+#
+# -----------------------------------------------------------------------------
+# - zip, tgz, tzst: each kind of options is saved and read back.
+#
+###############################################################################
+class TestSerialization:
+    test_list = [
+        ("zip", ArchiveFormat.ZIP, ZipOptions(workers=2, store_incompressible=False)),
+        ("tgz", ArchiveFormat.TGZ, CompressorOptions(workers=1, block_size=4096)),
+        ("tzst", ArchiveFormat.TZST, ZstdOptions(workers=3, long_distance_matching=False)),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "archive_format, options",
+        [test[1:] for test in test_list],
+        ids=[test[0] for test in test_list],
+    )
+    def test(self, archive_format, options):
+        config = ArchiverConfigModel()
+        config.format = archive_format
+        config.compression = CompressionMethod.DEFLATE
+        config.compression_level = CompressionLevel.FAST
+        config.options = options
+
+        json_dict = json.loads(json.dumps(config.serialize()))
+        validate(json_dict, packerDataSchema())
+
+        read_config = ArchiverConfigModel()
+        read_config.deserialize(json_dict)
+        assert read_config.format == archive_format
+        assert read_config.compression == CompressionMethod.DEFLATE
+        assert read_config.compression_level == CompressionLevel.FAST
+        assert read_config.options == options
+
+    # -------------------------------------------------------------------------
+    def test_without_options(self):
+        # The sessions saved before the format options keep their defaults
+        config = ArchiverConfigModel()
+        config.deserialize(
+            {"type": ArchiveFormat.TXZ.id, "compression_method": 0, "compression_level": 0}
+        )
+
+        assert config.options == CompressorOptions()
+
+    # -------------------------------------------------------------------------
+    def test_other_format_options(self):
+        config = ArchiverConfigModel()
+        config.deserialize(
+            {
+                "type": ArchiveFormat.ZST.id,
+                "compression_method": 0,
+                "compression_level": 0,
+                "options": {"workers": 2, "block_size": 4096},
+            }
+        )
+
+        assert config.options == ZstdOptions(workers=2)
+
+    # -------------------------------------------------------------------------
+    def test_unknown_option(self):
+        json_dict = ArchiverConfigModel().serialize()
+        json_dict["options"]["level"] = 3
+
+        with pytest.raises(ValidationError):
+            validate(json_dict, packerDataSchema())
+
+
+###############################################################################
+# TEST OPTIONS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The options set must be the ones of the current format, and a change is
+# notified once.
+#
+###############################################################################
+class TestOptions:
+    # -------------------------------------------------------------------------
+    def test(self):
+        config = ArchiverConfigModel()
+        options_changed = []
+        config.options_changed.connect(options_changed.append)
+
+        options = dataclasses.replace(config.options, workers=4)
+        config.options = options
+        config.options = dataclasses.replace(options)
+
+        assert options_changed == [options]
+
+    # -------------------------------------------------------------------------
+    def test_other_format(self):
+        config = ArchiverConfigModel()
+
+        with pytest.raises(TypeError):
+            config.options = ZstdOptions()
@@ -0,0 +1,151 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+
+# PackY
+from packy.models.change_watcher import ChangeWatcher
+
+
+# -----------------------------------------------------------------------------
+class FakeSelection:
+    def __init__(self, paths):
+        self.revision = 0
+        self.paths = set(paths)
+        self.is_checked = True
+
+    def watchedPaths(self):
+        return set(self.paths)
+
+    def markChecked(self):
+        self.is_checked = True
+
+
+# -----------------------------------------------------------------------------
+def pathChanged(watcher, path):
+    watcher._ChangeWatcher__pathChanged(path)
+
+
+# -----------------------------------------------------------------------------
+def poll(watcher):
+    watcher._ChangeWatcher__poll()
+
+
+###############################################################################
+# TEST UP TO DATE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The warnings of a selection are current only while it is watched, was
+# compared in full, did not change since its paths were watched, and none of
+# its paths changed.
+#
+###############################################################################
+class TestUpToDate:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        selection = FakeSelection([str(tmp_path)])
+        other_selection = FakeSelection([str(tmp_path)])
+        watcher = ChangeWatcher()
+
+        assert not watcher.isUpToDate(selection)
+
+        watcher.setSelections([selection])
+        assert watcher.isUpToDate(selection)
+        assert not watcher.isUpToDate(other_selection)
+
+        selection.revision += 1
+        assert not watcher.isUpToDate(selection)
+
+    # -------------------------------------------------------------------------
+    def test_not_checked(self, tmp_path):
+        # A selection read from a session was never compared
+        selection = FakeSelection([str(tmp_path)])
+        selection.is_checked = False
+        watcher = ChangeWatcher()
+        watcher.setSelections([selection])
+
+        assert not watcher.isUpToDate(selection)
+
+        selection.markChecked()
+        assert watcher.isUpToDate(selection)
+
+    # -------------------------------------------------------------------------
+    def test_changed_before_checked(self, tmp_path):
+        # The changes made before the full check wait for its end
+        selection = FakeSelection([str(tmp_path)])
+        selection.is_checked = False
+        watcher = ChangeWatcher()
+        watcher.setSelections([selection])
+
+        pathChanged(watcher, str(tmp_path))
+        selection.markChecked()
+
+        assert not watcher.isUpToDate(selection)
+
+    # -------------------------------------------------------------------------
+    def test_path_changed(self, tmp_path):
+        watched_dir = tmp_path / "watched"
+        other_dir = tmp_path / "other"
+        watched_dir.mkdir()
+        other_dir.mkdir()
+        selection = FakeSelection([str(watched_dir)])
+        other_selection = FakeSelection([str(other_dir)])
+        watcher = ChangeWatcher()
+        watcher.setSelections([selection, other_selection])
+
+        pathChanged(watcher, str(other_dir))
+
+        assert watcher.isUpToDate(selection)
+        assert not watcher.isUpToDate(other_selection)
+
+        # A path no selection watches changes nothing
+        pathChanged(watcher, str(tmp_path))
+        assert watcher.isUpToDate(selection)
+
+
+###############################################################################
+# TEST POLLING
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The paths the system refuses to watch are polled, a change of their
+# modification time marking the selections watching them.
+#
+###############################################################################
+class TestPolling:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        # The system cannot watch a path which does not exist yet
+        missing_dir = tmp_path / "missing"
+        selection = FakeSelection([str(tmp_path), str(missing_dir)])
+        watcher = ChangeWatcher()
+        watcher.setSelections([selection])
+
+        assert watcher.polled_paths == {str(missing_dir)}
+
+        poll(watcher)
+        assert watcher.isUpToDate(selection)
+
+        missing_dir.mkdir()
+        poll(watcher)
+        assert not watcher.isUpToDate(selection)
+
+    # -------------------------------------------------------------------------
+    def test_unwatched(self, tmp_path):
+        missing_dir = tmp_path / "missing"
+        selection = FakeSelection([str(missing_dir)])
+        watcher = ChangeWatcher()
+        watcher.setSelections([selection])
+
+        watcher.setSelections([])
+        assert watcher.polled_paths == frozenset()
+
+        os.mkdir(missing_dir)
+        poll(watcher)
+        assert not watcher.isUpToDate(selection)
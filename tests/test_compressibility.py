@@ -0,0 +1,92 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import random
+import pytest
+
+# PackY
+from packy.models.compressibility import (
+    MIN_SAMPLE_SIZE,
+    SAMPLE_SIZE,
+    hasIncompressibleExtension,
+    isIncompressible,
+)
+
+###############################################################################
+# GLOBAL VARIABLES
+###############################################################################
+
+text = b"".join(f"line {i}\n".encode() for i in range(20000))
+noise = random.Random(0).randbytes(4 * SAMPLE_SIZE)
+
+
+###############################################################################
+# TEST EXTENSION
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The files of a compressed format are known from their extension, whatever
+# its case.
+#
+###############################################################################
+class TestExtension:
+    test_list = [
+        ("photo.jpg", True),
+        ("PHOTO.JPG", True),
+        ("backup.tar.gz", True),
+        ("dir/song.flac", True),
+        ("report.docx", True),
+        ("notes.txt", False),
+        ("backup.tar", False),
+        ("Makefile", False),
+        ("jpg", False),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("path, expected", test_list)
+    def test(self, path, expected):
+        assert hasIncompressibleExtension(path) == expected
+
+
+###############################################################################
+# TEST SAMPLE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Data is incompressible when a trial compression of its sample does not
+# shrink it enough.
+#
+# -----------------------------------------------------------------------------
+# - text: repetitive text is compressed.
+# - random, random_windows: random data is not, wherever it is sampled.
+# - short: data shorter than MIN_SAMPLE_SIZE is compressed whatever it holds.
+# - min_size: random data of MIN_SAMPLE_SIZE is sampled.
+# - random_start: only the start of the data is sampled by default.
+# - windows: the sample is taken from evenly spaced windows, so data whose
+#   start only is random is compressed once several windows are sampled.
+#
+###############################################################################
+class TestSample:
+    test_list = [
+        ("text", text, 1, False),
+        ("random", noise, 1, True),
+        ("random_windows", noise, 4, True),
+        ("short", noise[: MIN_SAMPLE_SIZE - 1], 1, False),
+        ("min_size", noise[:MIN_SAMPLE_SIZE], 1, True),
+        ("random_start", noise[:SAMPLE_SIZE] + text, 1, True),
+        ("windows", noise[:SAMPLE_SIZE] + text, 4, False),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "data, nb_windows, expected",
+        [test[1:] for test in test_list],
+        ids=[test[0] for test in test_list],
+    )
+    def test(self, data, nb_windows, expected):
+        assert isIncompressible(data, nb_windows) == expected
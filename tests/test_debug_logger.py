@@ -0,0 +1,114 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import json
+import threading
+
+# PyQt
+from PySide6 import QtCore
+
+# PackY
+from packy.core.app_config import AppConfig
+from packy.core.debug_logger import DebugLogger
+
+
+# -----------------------------------------------------------------------------
+def logFiles(log_file_path):
+    # From the oldest to the newest
+    rotated_paths = sorted(
+        log_file_path.parent.glob(log_file_path.name + ".*"),
+        key=lambda path: int(path.suffix[1:]),
+        reverse=True,
+    )
+    return [*rotated_paths, log_file_path]
+
+
+###############################################################################
+# TEST ROTATION
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The messages logged by several threads are written whole, once each, and
+# the log file is rotated past its size, the oldest files being removed.
+#
+###############################################################################
+class TestRotation:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        log_file_path = tmp_path / "log.txt"
+        DebugLogger.start(log_file_path, AppConfig(LOG_MAX_BYTES=1024, LOG_BACKUP_COUNT=100))
+
+        def logMessages(thread_name):
+            for i in range(25):
+                QtCore.qInfo(f"{thread_name} message {i}")
+
+        threads = [threading.Thread(target=logMessages, args=(f"t{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert DebugLogger.stop()
+        assert not DebugLogger.is_active()
+
+        paths = logFiles(log_file_path)
+        lines = [line for path in paths for line in path.read_text().splitlines()]
+
+        assert len(paths) > 2
+        assert all(path.stat().st_size <= 1024 for path in paths)
+        assert len(lines) == 100
+        for i in range(4):
+            assert [line.split("]: ")[1] for line in lines if f"]: t{i} " in line] == [
+                f"t{i} message {j}" for j in range(25)
+            ]
+
+    # -------------------------------------------------------------------------
+    def test_backup_count(self, tmp_path):
+        log_file_path = tmp_path / "log.txt"
+        DebugLogger.start(log_file_path, AppConfig(LOG_MAX_BYTES=256, LOG_BACKUP_COUNT=2))
+
+        for i in range(20):
+            QtCore.qInfo(f"message {i}")
+            # One message per write
+            DebugLogger.flush()
+
+        DebugLogger.stop()
+
+        assert logFiles(log_file_path) == [
+            tmp_path / "log.txt.2",
+            tmp_path / "log.txt.1",
+            log_file_path,
+        ]
+        assert log_file_path.read_text().splitlines()[-1].endswith("]: message 19")
+
+
+###############################################################################
+# TEST JSON LINES
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Each message is written as a JSON object on its own line.
+#
+###############################################################################
+class TestJsonLines:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        log_file_path = tmp_path / "log.jsonl"
+        DebugLogger.start(log_file_path, AppConfig(LOG_JSON_LINES=True))
+
+        QtCore.qInfo("first")
+        QtCore.qWarning('second "quoted"\nmessage')
+
+        DebugLogger.stop()
+
+        records = [json.loads(line) for line in log_file_path.read_text().splitlines()]
+
+        assert [(record["level"], record["message"]) for record in records] == [
+            ("INFO", "first"),
+            ("WARNING", 'second "quoted"\nmessage'),
+        ]
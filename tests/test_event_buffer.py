@@ -0,0 +1,89 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import pytest
+import threading
+
+# PackY
+from packy.models.event_buffer import EventBuffer, EventLevel, EventPump
+
+
+###############################################################################
+# TEST DETAIL SAMPLING
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The detail messages are kept, dropped or sampled, the other messages are
+# always kept.
+#
+# -----------------------------------------------------------------------------
+# - keep_all: every detail message is kept.
+# - drop: no detail message is kept.
+# - sample: one detail message out of three is kept.
+#
+###############################################################################
+class TestDetailSampling:
+    test_list = [
+        (1, ["start", "item 0", "item 1", "item 2", "item 3", "end"]),
+        (0, ["start", "end"]),
+        (3, ["start", "item 0", "item 3", "end"]),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "detail_sampling, expected", test_list, ids=["keep_all", "drop", "sample"]
+    )
+    def test(self, detail_sampling, expected):
+        event_buffer = EventBuffer(detail_sampling)
+
+        event_buffer.post("start")
+        for i in range(4):
+            event_buffer.post(f"item {i}", EventLevel.DETAIL)
+        event_buffer.post("end")
+
+        assert [message for _, message in event_buffer.drain()] == expected
+        assert event_buffer.drain() == []
+
+
+###############################################################################
+# TEST DRAIN
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The messages posted by several threads are all drained, in the order each
+# thread posted them, the pump handing them over in batches.
+#
+###############################################################################
+class TestDrain:
+    # -------------------------------------------------------------------------
+    def test(self):
+        event_buffer = EventBuffer()
+        event_pump = EventPump(event_buffer)
+        batches = []
+        event_pump.events_drained.connect(batches.append)
+
+        def postMessages(thread_name):
+            for i in range(1000):
+                event_buffer.post(f"{thread_name} {i}", EventLevel.DETAIL)
+
+        threads = [threading.Thread(target=postMessages, args=(f"t{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        first_events = event_buffer.drain(10)
+        event_pump.flush()
+
+        assert len(first_events) == 10
+        assert len(batches) == 1
+        messages = [message for _, message in first_events + batches[0]]
+        for i in range(4):
+            assert [m for m in messages if m.startswith(f"t{i} ")] == [
+                f"t{i} {j}" for j in range(1000)
+            ]
@@ -188,6 +188,7 @@ class TestCheckIntegrity:
         json_dict = loadData[test_name]["data"]
 
         files_model = FilesModel(json_dict)
+        files_model.checkIntegrity()
         warnings = files_model.warnings()
 
         yield warnings
@@ -278,6 +279,7 @@ class TestUpdateModel:
         data = loadData[test_name]["data"]
 
         files_model = FilesModel(data)
+        files_model.checkIntegrity()
         files_model.updateModel()
 
         yield files_model
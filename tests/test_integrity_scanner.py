@@ -0,0 +1,248 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+import pytest
+
+# PackY
+from packy.models.integrity_scanner import IntegrityScanner
+from packy.models.scan_cache import ScanCache
+from packy.models.selection_tree import CheckState, SelectionTree
+
+###############################################################################
+# FILE HIERARCHY
+#
+# -----------------------------------------------------------------------------
+# tmp_path
+# ├─ dir_1
+# │  ├─ file_1.txt
+# │  └─ file_2.txt
+# └─ dir_2
+#    ├─ dir_3
+#    │  └─ file_3.txt
+#    └─ file_4.txt
+#
+###############################################################################
+
+ITEMS = [
+    "dir_1",
+    "dir_1/file_1.txt",
+    "dir_1/file_2.txt",
+    "dir_2",
+    "dir_2/dir_3",
+    "dir_2/dir_3/file_3.txt",
+    "dir_2/file_4.txt",
+]
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def rootPath(tmp_path):
+    for item in ITEMS:
+        path = tmp_path / item
+        if path.suffix:
+            path.write_text(item)
+        else:
+            path.mkdir()
+
+    yield tmp_path.as_posix()
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def selection(rootPath):
+    selection = SelectionTree(rootPath)
+    for item in ITEMS:
+        selection.register(f"{rootPath}/{item}")
+
+    yield selection
+
+
+###############################################################################
+# TEST SCAN
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The checked part of the selection is compared to the file system.
+#
+# -----------------------------------------------------------------------------
+# - unchanged: nothing changed.
+# - added_file: a file was added to a checked directory.
+# - added_dir: a folder with a file was added to a checked directory.
+# - added_unchecked: a file was added to an unchecked directory.
+# - removed_file: a checked file was removed.
+# - removed_dir: a checked folder was removed, with its known content.
+# - removed_root: a checked root was removed.
+# - not_listed: a file was added to a checked directory whose content was
+#   never listed, so it is selected without warning.
+#
+###############################################################################
+class TestScan:
+    test_list = [
+        ("unchanged", [], []),
+        ("added_file", ["dir_2/dir_3/file_5.txt"], []),
+        ("added_dir", ["dir_2/dir_4/file_5.txt"], []),
+        ("added_unchecked", [], []),
+        ("removed_file", [], ["dir_2/file_4.txt"]),
+        ("removed_dir", [], ["dir_2/dir_3", "dir_2/dir_3/file_3.txt"]),
+        (
+            "removed_root",
+            [],
+            ["dir_2", "dir_2/dir_3", "dir_2/dir_3/file_3.txt", "dir_2/file_4.txt"],
+        ),
+        ("not_listed", [], []),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name, expected_added, expected_removed", test_list)
+    def test(self, rootPath, selection, test_name, expected_added, expected_removed, tmp_path):
+        selection.set_state(f"{rootPath}/dir_2", CheckState.CHECKED)
+
+        match test_name:
+            case "added_file":
+                (tmp_path / "dir_2" / "dir_3" / "file_5.txt").write_text("file 5")
+            case "added_dir":
+                (tmp_path / "dir_2" / "dir_4").mkdir()
+                (tmp_path / "dir_2" / "dir_4" / "file_5.txt").write_text("file 5")
+            case "added_unchecked":
+                (tmp_path / "dir_1" / "file_5.txt").write_text("file 5")
+            case "removed_file":
+                (tmp_path / "dir_2" / "file_4.txt").unlink()
+            case "removed_dir":
+                (tmp_path / "dir_2" / "dir_3" / "file_3.txt").unlink()
+                (tmp_path / "dir_2" / "dir_3").rmdir()
+            case "removed_root":
+                (tmp_path / "dir_2" / "dir_3" / "file_3.txt").unlink()
+                (tmp_path / "dir_2" / "dir_3").rmdir()
+                (tmp_path / "dir_2" / "file_4.txt").unlink()
+                (tmp_path / "dir_2").rmdir()
+            case "not_listed":
+                selection = SelectionTree(rootPath)
+                selection.load({f"{rootPath}/dir_2": 2})
+                (tmp_path / "dir_2" / "file_5.txt").write_text("file 5")
+
+        report = IntegrityScanner(selection, workers=2).scan()
+
+        assert report.added_items == [f"{rootPath}/{item}" for item in expected_added]
+        assert report.removed_items == [f"{rootPath}/{item}" for item in expected_removed]
+
+
+###############################################################################
+# TEST BATCHES
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The changes read in batches are the ones of a whole scan, and a cancelled
+# scan stops listing directories.
+#
+###############################################################################
+class TestBatches:
+    # -------------------------------------------------------------------------
+    def test(self, rootPath, selection, tmp_path):
+        selection.set_state(f"{rootPath}/dir_2", CheckState.CHECKED)
+        (tmp_path / "dir_2" / "dir_3" / "file_5.txt").write_text("file 5")
+        (tmp_path / "dir_2" / "file_4.txt").unlink()
+
+        scanner = IntegrityScanner(selection)
+        batches = list(scanner.batches())
+
+        assert sum((batch.added_items for batch in batches), []) == [
+            f"{rootPath}/dir_2/dir_3/file_5.txt"
+        ]
+        assert sum((batch.removed_items for batch in batches), []) == [
+            f"{rootPath}/dir_2/file_4.txt"
+        ]
+        assert scanner.nb_scanned_dirs == scanner.nb_found_dirs == 2
+
+    # -------------------------------------------------------------------------
+    def test_cancel(self, rootPath, selection, tmp_path):
+        selection.set_state(f"{rootPath}/dir_2", CheckState.CHECKED)
+        (tmp_path / "dir_2" / "dir_3" / "file_5.txt").write_text("file 5")
+
+        scanner = IntegrityScanner(selection)
+        scanner.cancel()
+
+        assert scanner.scan().added_items == []
+        assert scanner.is_cancelled
+
+
+###############################################################################
+# TEST DIR PATHS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A scan restricted to some directories compares them without their known
+# subdirectories, and walks the new ones.
+#
+###############################################################################
+class TestDirPaths:
+    # -------------------------------------------------------------------------
+    def test(self, rootPath, selection, tmp_path):
+        selection.set_state(f"{rootPath}/dir_2", CheckState.CHECKED)
+        (tmp_path / "dir_2" / "dir_3" / "file_5.txt").write_text("file 5")
+        (tmp_path / "dir_2" / "dir_4").mkdir()
+        (tmp_path / "dir_2" / "dir_4" / "file_6.txt").write_text("file 6")
+        (tmp_path / "dir_2" / "file_4.txt").unlink()
+
+        report = IntegrityScanner(selection, dir_paths=[f"{rootPath}/dir_2"]).scan()
+
+        assert report.added_items == [f"{rootPath}/dir_2/dir_4/file_6.txt"]
+        assert report.removed_items == [f"{rootPath}/dir_2/file_4.txt"]
+
+        report = IntegrityScanner(
+            selection, dir_paths=[f"{rootPath}/dir_2/dir_4", f"{rootPath}/dir_1"]
+        ).scan()
+
+        assert report.added_items == [f"{rootPath}/dir_2/dir_4/file_6.txt"]
+
+
+###############################################################################
+# TEST CACHE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A directory whose modification time did not change since the previous scan
+# is compared to its cached listing, and read again otherwise.
+#
+# -----------------------------------------------------------------------------
+# - unchanged: the cached listing is used, so a file added without changing
+#   the modification time of its directory is not seen.
+# - changed: the directory is read again and the added file is seen.
+# - recent: the directory was changed just before it was read, so its listing
+#   is not reused.
+#
+###############################################################################
+class TestCache:
+    # Far enough in the past for the listings to be reused
+    OLD_MTIME_NS = 1_000_000_000_000_000_000
+
+    test_list = [
+        ("unchanged", []),
+        ("changed", ["dir_2/dir_3/file_5.txt"]),
+        ("recent", ["dir_2/dir_3/file_5.txt"]),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name, expected_added", test_list)
+    def test(self, rootPath, selection, test_name, expected_added, tmp_path):
+        dir_3 = tmp_path / "dir_2" / "dir_3"
+        if test_name != "recent":
+            for dir_path in (tmp_path / "dir_2", dir_3):
+                os.utime(dir_path, ns=(self.OLD_MTIME_NS, self.OLD_MTIME_NS))
+
+        selection.set_state(f"{rootPath}/dir_2", CheckState.CHECKED)
+        cache = ScanCache(tmp_path / "scan_cache.sqlite3")
+        assert IntegrityScanner(selection, cache=cache).scan().added_items == []
+
+        (dir_3 / "file_5.txt").write_text("file 5")
+        if test_name == "unchanged":
+            os.utime(dir_3, ns=(self.OLD_MTIME_NS, self.OLD_MTIME_NS))
+
+        report = IntegrityScanner(selection, cache=cache).scan()
+
+        assert report.added_items == [f"{rootPath}/{item}" for item in expected_added]
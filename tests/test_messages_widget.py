@@ -0,0 +1,110 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import pytest
+
+# PackY
+from packy.views.messages_widget import MessagesFilterModel, MessagesModel, MsgType
+
+
+# -----------------------------------------------------------------------------
+def rowTexts(model):
+    return [model.index(row, 0).data() for row in range(model.rowCount())]
+
+
+###############################################################################
+# TEST RING BUFFER
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Only the most recent messages up to the capacity are kept, whatever the
+# size of the batches added, and shrinking the capacity drops the oldest.
+#
+# -----------------------------------------------------------------------------
+# - one_by_one: the messages are added one at a time.
+# - batches: the messages are added three at a time.
+# - large_batch: the messages are added in a batch larger than the capacity.
+#
+###############################################################################
+class TestRingBuffer:
+    test_list = [1, 3, 10]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "batch_size", test_list, ids=["one_by_one", "batches", "large_batch"]
+    )
+    def test(self, batch_size):
+        model = MessagesModel(capacity=4)
+        messages = [(f"message {i}", MsgType.INFO) for i in range(10)]
+        row_counts = []
+        model.rowsInserted.connect(lambda *_: row_counts.append(model.rowCount()))
+
+        for i in range(0, len(messages), batch_size):
+            model.appendMessages(messages[i : i + batch_size])
+
+        assert max(row_counts) == 4
+        assert rowTexts(model) == [f"message {i}" for i in range(6, 10)]
+        assert model.messages() == messages[6:]
+
+        model.setCapacity(2)
+        assert rowTexts(model) == ["message 8", "message 9"]
+
+    # -------------------------------------------------------------------------
+    def test_clear(self):
+        model = MessagesModel(capacity=2)
+        model.appendMessages([("first", MsgType.INFO), ("second", MsgType.ERROR)])
+
+        model.clear()
+        model.appendMessages([("third", MsgType.SUCCESS)])
+
+        assert model.messages() == [("third", MsgType.SUCCESS)]
+
+
+###############################################################################
+# TEST FILTER
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The messages shown are those of the lowest type selected or above which
+# contain the text searched, whatever its case.
+#
+###############################################################################
+class TestFilter:
+    # -------------------------------------------------------------------------
+    def test(self):
+        model = MessagesModel()
+        model.appendMessages(
+            [
+                ("Run task A", MsgType.INFO),
+                ("Packing a.txt", MsgType.DETAIL),
+                ("Task A done", MsgType.SUCCESS),
+                ("Cannot read B.txt", MsgType.ERROR),
+                ("Task B done", MsgType.SUCCESS),
+            ]
+        )
+        filter_model = MessagesFilterModel()
+        filter_model.setSourceModel(model)
+
+        assert rowTexts(filter_model) == rowTexts(model)
+
+        filter_model.setMinType(MsgType.INFO)
+        assert "Packing a.txt" not in rowTexts(filter_model)
+
+        filter_model.setMinType(MsgType.SUCCESS)
+        assert rowTexts(filter_model) == ["Task A done", "Cannot read B.txt", "Task B done"]
+
+        filter_model.setSearchText("b")
+        assert rowTexts(filter_model) == ["Cannot read B.txt", "Task B done"]
+
+        filter_model.setMinType(MsgType.ERROR)
+        assert rowTexts(filter_model) == ["Cannot read B.txt"]
+
+        filter_model.setMinType(MsgType.DETAIL)
+        filter_model.setSearchText("")
+        model.appendMessages([("Packing c.txt", MsgType.DETAIL)])
+        assert rowTexts(filter_model)[-1] == "Packing c.txt"
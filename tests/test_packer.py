@@ -6,23 +6,29 @@ See LICENCE.md file for more information.
 """
 
 # Python
+import dataclasses
 import json
 import os
 import pathlib
 import pytest
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock
 from zipfile import ZipFile, ZipInfo
 
 # PyQt
 from PySide6.QtCore import QStandardPaths
 
 # PackY
-import model.task
-from packy.core.settings import PreferencesKeys
-from packy.models.tasks_model import TasksModel
-from packy.models.files_model import FilesModel
+from packy.core.settings import PreferencesTask
+from packy.models.archiver_config_model import ArchiveFormat, CompressionLevel, CompressionMethod
+from packy.models.cancellation import CancellationToken
+from packy.models.event_buffer import EventLevel
+from packy.models.packer import PARTIAL_SUFFIX, PackEntry
+from packy.models.retention import SnapshotPruner
+from packy.models.run_plan import CompressionSettings, RetentionPolicy, RunPlan
+from packy.models.snapshot_catalog import SnapshotSeries
+from packy.models.snapshot_manifest import SnapshotManifest
+from packy.models.tasks_model import TaskStatus
 from packy.models.zip_packer import ZipPacker
-from packy.utils.settings_access import packySettings
 
 # PackY tests
 from packy.utils_func import camelCaseToSnakeCase
@@ -125,6 +131,30 @@ def createFileHierarchy(loadFileHierarchy):
     recursive(fh_dict["root"])
 
 
+# -----------------------------------------------------------------------------
+def createPlan(
+    destination_file="",
+    suffix=PreferencesTask.SUFFIX_VERSION_NUM,
+    root_path="",
+    retention=RetentionPolicy(),
+):
+    dirname, raw_basename = os.path.split(destination_file)
+
+    return RunPlan(
+        task_id=0,
+        raw_dest_file=destination_file,
+        destination_file=destination_file,
+        snapshots=SnapshotSeries(dirname, raw_basename, suffix, "zip"),
+        root_path=root_path,
+        selected_items=(),
+        excluded_items=frozenset(),
+        compression=CompressionSettings(
+            ArchiveFormat.ZIP, CompressionMethod.STORE, CompressionLevel.NORMAL, None
+        ),
+        retention=retention,
+    )
+
+
 # -----------------------------------------------------------------------------
 @pytest.fixture
 def checkArchiveHierarchy(loadTestData, outputPath, test_name):
@@ -142,117 +172,50 @@ def checkArchiveHierarchy(loadTestData, outputPath, test_name):
 
 
 ###############################################################################
-# TEST TMP FOLDER PATH
-#
-# -----------------------------------------------------------------------------
-# Description:
-# Produce the temporary folder path according to the output archive name.
-#
-# -----------------------------------------------------------------------------
-# - simple_test: output archive name with one word.
-# - complex_test: output archive name with several words (separated by "_").
-# - spaces_test: output archive name with several words (separated by " ").
-#
-###############################################################################
-class TestTmpFolderPath:
-    test_list = ["simple_test", "complex_test", "spaces_test"]
-
-    # -------------------------------------------------------------------------
-    @pytest.mark.parametrize("test_name", test_list)
-    def test(self, loadTestData, test_name):
-        input = loadTestData[test_name]["input"]
-        expected = loadTestData[test_name]["expected"]
-
-        mock_task = Mock(TasksModel)
-        mock_task.destFile = MagicMock(return_value=input)
-
-        zip_packer = ZipPacker(mock_task)
-        tmp_folder_path = zip_packer._Packer__tmpFolderPath()
-        tmp_folder_path = tmp_folder_path.replace("\\", "/")
-
-        expected = joinPath(os.path.dirname(model.task.__file__), expected)
-
-        assert tmp_folder_path == expected
-
-
-###############################################################################
-# TEST FILTER SELECTED FILES
-#
-# -----------------------------------------------------------------------------
-# Description:
-# The function selects the items (files and directories) that are checked
-# or partially checked to be packed.
-#
-# -----------------------------------------------------------------------------
-# - no_items: no items.
-# - item_checked: one item is checked.
-# - item_partially_checked: one item is partially cheched.
-# - item_unchecked: one item is unchecked.
-# - item_mixed: items are unchecked, checked and partially checked.
-#
-###############################################################################
-class TestFilterSelectedFiles:
-    test_list = [
-        "no_items",
-        "item_checked",
-        "item_partially_checked",
-        "item_unchecked",
-        "item_mixed",
-    ]
-
-    # -------------------------------------------------------------------------
-    @pytest.mark.parametrize("test_name", test_list)
-    def test(self, loadTestData, test_name):
-        input = loadTestData[test_name]["input"]
-        expected = loadTestData[test_name]["expected"]
-
-        mock = Mock(TasksModel)
-        mock_files_model = Mock(FilesModel)
-        mock_files_model.checks = MagicMock(return_value=input)
-        mock.filesSelected = MagicMock(return_value=mock_files_model)
-
-        zip_packer = ZipPacker(mock)
-        items_to_pack = zip_packer._Packer__filterSelectedFiles()
-
-        assert items_to_pack == expected
-
-
-###############################################################################
-# TEST COPY ITEMS TO TMP FOLDER
+# TEST LIST ENTRIES
 #
 # -----------------------------------------------------------------------------
 # Description:
-# Copy items to pack into a temporary folder.
+# List the entries to pack, read straight from the source tree, with their
+# name in the archive relative to the root folder.
 #
 # -----------------------------------------------------------------------------
 # - no_items: no items.
 # - one_file: one file.
 # - complete_dir: a folder and its files.
 # - empty_dir: an empty folder.
-# - file_and_dir: .
+# - file_and_dir: a file and a folder.
+# - nested_checked_items: a folder and its checked files, listed only once.
+# - unchecked_items: a folder without its unchecked file.
 #
 ###############################################################################
-class TestCopyItemsToTmpFolder:
-    test_list = ["no_items", "one_file", "complete_dir", "empty_dir", "file_and_dir"]
+class TestListEntries:
+    test_list = [
+        "no_items",
+        "one_file",
+        "complete_dir",
+        "empty_dir",
+        "file_and_dir",
+        "nested_checked_items",
+        "unchecked_items",
+    ]
 
     # -------------------------------------------------------------------------
     @pytest.mark.parametrize("test_name", test_list)
     def test(self, createFileHierarchy, loadTestData, test_name, tmp_path):
         input = loadTestData[test_name]["input"]
+        excluded = loadTestData[test_name].get("excluded", [])
         expected = loadTestData[test_name]["expected"]
 
-        mock_files_model = Mock(FilesModel)
-        mock_files_model.rootPath = MagicMock(return_value=joinPath(tmp_path, "folder"))
+        plan = createPlan(root_path=joinPath(tmp_path, "folder"))
 
-        mock_task = Mock(TasksModel)
-        mock_task.filesSelected = MagicMock(return_value=mock_files_model)
+        zip_packer = ZipPacker(plan)
+        entries = list(zip_packer._Packer__listEntries(input, excluded))
 
-        zip_packer = ZipPacker(mock_task)
-        tmp_path_task = joinPath(tmp_path, "results", test_name)
-        zip_packer._Packer__copyItemsToTmpFolder(input, tmp_path_task)
+        assert all(isinstance(entry, PackEntry) for entry in entries)
 
-        for item in expected:
-            assert os.path.exists(item)
+        arcnames = [entry.arcname.replace("\\", "/") for entry in entries]
+        assert sorted(arcnames) == sorted(expected)
 
 
 ###############################################################################
@@ -260,46 +223,35 @@ class TestCopyItemsToTmpFolder:
 #
 # -----------------------------------------------------------------------------
 # Description
-# TODO
+# Find the snapshots of the task, from the oldest to the newest.
 #
 # -----------------------------------------------------------------------------
-# - input:
-# - expected:
-#
-# -----------------------------------------------------------------------------
-# -
+# - find_4_snapshots: four numbered snapshots.
 #
 ###############################################################################
 class TestFindSnapshots:
     test_list = ["find_4_snapshots"]
 
-    # -------------------------------------------------------------------------
-    @pytest.fixture
-    def configureSettings(self, loadTestData, test_name):
-        settings = packySettings()
-        task_suffix = settings.value(PreferencesKeys.TASK_SUFFIX.value, type=int)
-
-        test_task_suffix = loadTestData[test_name]["input"]["task_suffix"]
-        settings.setValue(PreferencesKeys.TASK_SUFFIX.value, test_task_suffix)
-
-        yield
-
-        settings.setValue(PreferencesKeys.TASK_SUFFIX.value, task_suffix)
-
     # -------------------------------------------------------------------------
     @pytest.mark.parametrize("test_name", test_list)
-    def test(self, createFileHierarchy, loadTestData, configureSettings, test_name):
+    def test(self, createFileHierarchy, loadTestData, test_name):
         input = loadTestData[test_name]["input"]
         expected = loadTestData[test_name]["expected"]
 
-        mock_task = Mock(TasksModel)
-        mock_task.rawDestFile = MagicMock(return_value=input["raw_dest_file"])
-        mock_task.destExtension = MagicMock(return_value=input["dest_extension"])
+        dirname, raw_basename = os.path.split(input["raw_dest_file"])
+        series = SnapshotSeries(
+            dirname,
+            raw_basename,
+            PreferencesTask(input["task_suffix"]),
+            input["dest_extension"],
+        )
+
+        plan = dataclasses.replace(createPlan(), snapshots=series)
 
-        zip_packer = ZipPacker(mock_task)
+        zip_packer = ZipPacker(plan)
         snapshots = zip_packer._Packer__findSnapshots()
 
-        assert sorted(snapshots) == sorted(expected)
+        assert snapshots == expected
 
 
 ###############################################################################
@@ -307,41 +259,38 @@ class TestFindSnapshots:
 #
 # -----------------------------------------------------------------------------
 # Description
-# Remove snapshots according to the snapshot retention.
+# Remove snapshots according to the snapshot retention, in the background.
 #
 # -----------------------------------------------------------------------------
-# - input:
-# - expected:
+# - no_snapshot_to_remove: fewer snapshots than the ones to keep.
+# - one_snapshot_to_remove: the oldest snapshot is removed.
+# - several_snapshot_to_remove: the oldest snapshots are removed.
+# - dry_run: the snapshots to remove are only listed.
 #
 ###############################################################################
 class TestRemoveSnapshots:
-    test_list = ["no_snapshot_to_remove", "one_snapshot_to_remove", "several_snapshot_to_remove"]
-
-    # -------------------------------------------------------------------------
-    @pytest.fixture
-    def configureSettings(self, loadTestData, test_name):
-        settings = packySettings()
-        nb_snapshot = settings.value(PreferencesKeys.GENERAL_NB_SNAPSHOT.value, type=int)
-
-        test_nb_snapshot = loadTestData[test_name]["input"]["nb_snapshot"]
-        settings.setValue(PreferencesKeys.GENERAL_NB_SNAPSHOT.value, test_nb_snapshot)
-
-        yield
-
-        settings.setValue(PreferencesKeys.GENERAL_NB_SNAPSHOT.value, nb_snapshot)
+    test_list = [
+        "no_snapshot_to_remove",
+        "one_snapshot_to_remove",
+        "several_snapshot_to_remove",
+        "dry_run",
+    ]
 
     # -------------------------------------------------------------------------
     @pytest.mark.parametrize("test_name", test_list)
-    def test(self, createFileHierarchy, loadTestData, configureSettings, test_name):
+    def test(self, createFileHierarchy, loadTestData, test_name):
         input = loadTestData[test_name]["input"]
         expected = loadTestData[test_name]["expected"]
 
-        mock_task = Mock(TasksModel)
         raw_dest_file = input["raw_dest_file"]
-        mock_task.rawDestFile = MagicMock(return_value=raw_dest_file)
+        retention = RetentionPolicy(
+            nb_snapshots=input["nb_snapshot"], dry_run=input.get("dry_run", False)
+        )
+        plan = createPlan(raw_dest_file, retention=retention)
 
-        zip_packer = ZipPacker(mock_task)
-        zip_packer._Packer__removeSnapshots(input["snapshots"])
+        zip_packer = ZipPacker(plan)
+        zip_packer._Packer__applySnapshotRetention()
+        SnapshotPruner.default().wait()
 
         snapshots_dir = os.path.dirname(raw_dest_file)
         assert len(os.listdir(snapshots_dir)) == len(expected)
@@ -351,27 +300,73 @@ class TestRemoveSnapshots:
 
 
 ###############################################################################
-# TEST CLEAN TMP FOLDER
+# TEST CANCEL
 #
 # -----------------------------------------------------------------------------
 # Description
-# TODO
-#
-# -----------------------------------------------------------------------------
-# - input:
+# A run cancelled while the entries are packed stops before the next entry,
+# removes the archive partially written and ends as cancelled. The snapshot
+# it was to replace is left as it was, whether the run is cancelled or fails.
 #
 ###############################################################################
-class TestCleanTmpFolder:
-    test_list = ["files", "tree_hierarchy"]
-
+class TestCancel:
     # -------------------------------------------------------------------------
-    @pytest.mark.parametrize("test_name", test_list)
-    def test(self, createFileHierarchy, loadTestData, test_name):
-        input = loadTestData[test_name]["input"]
-
-        mock_task = Mock(TasksModel)
+    def test(self, createFileHierarchy, tmp_path):
+        root_path = joinPath(tmp_path, "folder")
+        destination_file = joinPath(tmp_path, "results", "output.zip")
+        plan = dataclasses.replace(
+            createPlan(destination_file, PreferencesTask.SUFFIX_NOTHING, root_path),
+            selected_items=(root_path,),
+        )
+        cancel_token = CancellationToken()
+        event_buffer = MagicMock()
+        event_buffer.post.side_effect = lambda msg, level=EventLevel.INFO: (
+            cancel_token.cancel() if level == EventLevel.DETAIL else None
+        )
+
+        zip_packer = ZipPacker(plan, cancel_token, event_buffer)
+        zip_packer.signals = MagicMock()
+        zip_packer.run()
+
+        zip_packer.signals.status_changed.emit.assert_called_once_with(0, TaskStatus.CANCELLED)
+        zip_packer.signals.error.emit.assert_not_called()
+        assert not os.path.exists(destination_file)
 
-        zip_packer = ZipPacker(mock_task)
-        zip_packer._Packer__cleanTmpFolder(input)
-
-        assert os.path.exists(input) is False
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("failure", ["cancel", "error"])
+    def test_previous_snapshot(self, createFileHierarchy, tmp_path, failure):
+        # The snapshot rewritten in place survives a run which fails
+        root_path = joinPath(tmp_path, "folder")
+        destination_file = joinPath(tmp_path, "results", "output.zip")
+        plan = dataclasses.replace(
+            createPlan(destination_file, PreferencesTask.SUFFIX_NOTHING, root_path),
+            selected_items=(root_path,),
+        )
+        zip_packer = ZipPacker(plan, event_buffer=MagicMock())
+        zip_packer.signals = MagicMock()
+        zip_packer.run()
+        previous_content = pathlib.Path(destination_file).read_bytes()
+
+        pathlib.Path(root_path, "file_1.txt").write_text("changed")
+        cancel_token = CancellationToken()
+        event_buffer = MagicMock()
+
+        def failRun(msg, level=EventLevel.INFO):
+            if level != EventLevel.DETAIL:
+                return
+            if failure == "cancel":
+                cancel_token.cancel()
+            else:
+                raise OSError("The disk is full")
+
+        event_buffer.post.side_effect = failRun
+
+        zip_packer = ZipPacker(plan, cancel_token, event_buffer)
+        zip_packer.signals = MagicMock()
+        zip_packer.run()
+
+        expected_status = TaskStatus.CANCELLED if failure == "cancel" else TaskStatus.ERROR
+        zip_packer.signals.status_changed.emit.assert_called_once_with(0, expected_status)
+        assert pathlib.Path(destination_file).read_bytes() == previous_content
+        assert os.path.exists(SnapshotManifest.pathFor(destination_file))
+        assert not os.path.exists(destination_file + PARTIAL_SUFFIX)
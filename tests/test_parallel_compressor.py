@@ -0,0 +1,84 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import bz2
+import gzip
+import io
+import lzma
+import os
+import pytest
+
+# PackY
+from packy.models.parallel_compressor import Codec, ParallelCompressor
+
+###############################################################################
+# GLOBAL VARIABLES
+###############################################################################
+
+decompressors = {
+    Codec.GZIP: gzip.decompress,
+    Codec.BZIP2: bz2.decompress,
+    Codec.XZ: lzma.decompress,
+}
+
+
+###############################################################################
+# TEST WRITE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The data written to the stream is compressed block by block, and the
+# concatenated blocks decompress to the original data.
+#
+# -----------------------------------------------------------------------------
+# - empty: nothing is written.
+# - one_block: less data than one block.
+# - several_blocks: several blocks and a partial last block.
+# - store_incompressible: random blocks are written with the fastest level.
+# - xz_dictionary: the xz dictionary is shrunk to the block, which compresses
+#   the same at the presets only differing by their dictionary size.
+#
+###############################################################################
+class TestWrite:
+    test_list = [("empty", 0), ("one_block", 1000), ("several_blocks", 100000)]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("codec", list(Codec))
+    @pytest.mark.parametrize("test_name, nb_lines", test_list)
+    def test(self, codec, test_name, nb_lines):
+        data = b"".join(f"line {i}\n".encode() for i in range(nb_lines))
+        dst_file = io.BytesIO()
+
+        with ParallelCompressor(dst_file, codec, 1, workers=4, block_size=64 * 1024) as stream:
+            for i in range(0, len(data), 10000):
+                stream.write(data[i : i + 10000])
+
+        assert decompressors[codec](dst_file.getvalue()) == data
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("codec", list(Codec))
+    def test_store_incompressible(self, codec):
+        text = b"".join(f"line {i}\n".encode() for i in range(20000))
+        data = text + os.urandom(256 * 1024) + text
+        dst_file = io.BytesIO()
+
+        with ParallelCompressor(
+            dst_file, codec, 9, workers=4, block_size=64 * 1024, store_incompressible=True
+        ) as stream:
+            stream.write(data)
+
+        assert decompressors[codec](dst_file.getvalue()) == data
+
+    # -------------------------------------------------------------------------
+    def test_xz_dictionary(self):
+        block = b"".join(f"line {i}\n".encode() for i in range(20000))
+
+        compressed = Codec.XZ.compress(block, 9)
+
+        assert compressed == Codec.XZ.compress(block, 6)
+        assert lzma.decompress(compressed) == block
@@ -0,0 +1,189 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+import pytest
+import zipfile
+from zipfile import ZipFile
+
+# PackY
+from packy.models import parallel_zip_writer
+from packy.models.parallel_zip_writer import ParallelZipWriter
+from packy.models.throughput import ByteCounter
+
+###############################################################################
+# FILE HIERARCHY
+#
+# -----------------------------------------------------------------------------
+# tmp_path
+# ├─ folder
+# │  ├─ file_<i>.txt (x 20)
+# │  └─ dir
+# └─ results
+#
+###############################################################################
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def sourceFolder(tmp_path):
+    folder = tmp_path / "folder"
+    (folder / "dir").mkdir(parents=True)
+    (tmp_path / "results").mkdir()
+
+    contents = {}
+    for i in range(20):
+        content = (f"line {i}\n" * (i * 500)).encode()
+        (folder / f"file_{i}.txt").write_bytes(content)
+        contents[f"file_{i}.txt"] = content
+
+    yield folder, contents
+
+
+###############################################################################
+# TEST WRITE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Members compressed by the workers are written in submission order and the
+# archive is readable by zipfile.
+#
+# -----------------------------------------------------------------------------
+# - stored, deflated, lzma: compression method of the archive.
+# - large_members: members streamed between pooled ones, every byte counted.
+# - store_incompressible: random data and media files are stored.
+#
+###############################################################################
+class TestWrite:
+    test_list = [
+        ("stored", zipfile.ZIP_STORED, None),
+        ("deflated", zipfile.ZIP_DEFLATED, 6),
+        ("lzma", zipfile.ZIP_LZMA, None),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name, c_method, c_level", test_list)
+    def test(self, sourceFolder, tmp_path, test_name, c_method, c_level):
+        folder, contents = sourceFolder
+        destination_filename = tmp_path / "results" / f"{test_name}.zip"
+        arcnames = ["dir/"] + list(contents)
+
+        with (
+            ZipFile(destination_filename, "w", c_method, compresslevel=c_level) as m_zip,
+            ParallelZipWriter(m_zip, workers=4) as zip_writer,
+        ):
+            zip_writer.write(os.path.join(folder, "dir"), "dir")
+            for name in contents:
+                zip_writer.write(os.path.join(folder, name), name)
+
+        with ZipFile(destination_filename) as m_zip:
+            assert m_zip.testzip() is None
+            assert m_zip.namelist() == arcnames
+            for name, content in contents.items():
+                assert m_zip.read(name) == content
+
+    # -------------------------------------------------------------------------
+    def test_large_members(self, sourceFolder, tmp_path, monkeypatch):
+        folder, contents = sourceFolder
+        monkeypatch.setattr(parallel_zip_writer, "LARGE_MEMBER_SIZE", 40000)
+        destination_filename = tmp_path / "results" / "large_members.zip"
+        byte_counter = ByteCounter(lambda done, total: None)
+
+        with (
+            ZipFile(destination_filename, "w", compression=zipfile.ZIP_DEFLATED) as m_zip,
+            ParallelZipWriter(m_zip, workers=4, byte_counter=byte_counter) as zip_writer,
+        ):
+            for name in contents:
+                zip_writer.write(os.path.join(folder, name), name)
+
+        with ZipFile(destination_filename) as m_zip:
+            assert m_zip.testzip() is None
+            assert m_zip.namelist() == list(contents)
+            for name, content in contents.items():
+                assert m_zip.read(name) == content
+
+        assert byte_counter.done == sum(len(content) for content in contents.values())
+
+    # -------------------------------------------------------------------------
+    def test_store_incompressible(self, sourceFolder, tmp_path):
+        folder, contents = sourceFolder
+        contents["random.bin"] = os.urandom(100000)
+        contents["photo.jpg"] = b"line\n" * 20000
+        for name in ["random.bin", "photo.jpg"]:
+            (folder / name).write_bytes(contents[name])
+        destination_filename = tmp_path / "results" / "store_incompressible.zip"
+
+        with (
+            ZipFile(destination_filename, "w", compression=zipfile.ZIP_DEFLATED) as m_zip,
+            ParallelZipWriter(m_zip, workers=4, store_incompressible=True) as zip_writer,
+        ):
+            for name in contents:
+                zip_writer.write(os.path.join(folder, name), name)
+
+        with ZipFile(destination_filename) as m_zip:
+            assert m_zip.testzip() is None
+            assert m_zip.getinfo("random.bin").compress_type == zipfile.ZIP_STORED
+            assert m_zip.getinfo("photo.jpg").compress_type == zipfile.ZIP_STORED
+            assert m_zip.getinfo("file_19.txt").compress_type == zipfile.ZIP_DEFLATED
+            for name, content in contents.items():
+                assert m_zip.read(name) == content
+
+
+###############################################################################
+# TEST COPY
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Members copied from another archive keep their compressed data and are
+# readable like the members compressed by the workers.
+#
+# -----------------------------------------------------------------------------
+# - deflated, lzma: compression method of both archives.
+# - large_members: members copied in chunks between pooled ones.
+#
+###############################################################################
+class TestCopy:
+    test_list = [
+        ("deflated", zipfile.ZIP_DEFLATED, 40000000),
+        ("lzma", zipfile.ZIP_LZMA, 40000000),
+        ("large_members", zipfile.ZIP_DEFLATED, 100),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name, c_method, large_member_size", test_list)
+    def test(self, sourceFolder, tmp_path, monkeypatch, test_name, c_method, large_member_size):
+        folder, contents = sourceFolder
+        monkeypatch.setattr(parallel_zip_writer, "LARGE_MEMBER_SIZE", large_member_size)
+        reference_filename = tmp_path / "results" / f"{test_name}_reference.zip"
+        destination_filename = tmp_path / "results" / f"{test_name}.zip"
+
+        with ZipFile(reference_filename, "w", compression=c_method) as m_zip:
+            for name in contents:
+                m_zip.write(os.path.join(folder, name), name)
+
+        copied = list(contents)[::2]
+        with (
+            ZipFile(reference_filename) as reference_zip,
+            ZipFile(destination_filename, "w", compression=c_method) as m_zip,
+            ParallelZipWriter(m_zip, workers=4) as zip_writer,
+        ):
+            for name in contents:
+                if name in copied:
+                    zip_writer.copy(reference_zip.fp, reference_zip.getinfo(name))
+                else:
+                    zip_writer.write(os.path.join(folder, name), name)
+
+        with ZipFile(reference_filename) as reference_zip, ZipFile(destination_filename) as m_zip:
+            for name in copied:
+                reference_info = reference_zip.getinfo(name)
+                assert m_zip.getinfo(name).compress_size == reference_info.compress_size
+
+            assert m_zip.testzip() is None
+            assert m_zip.namelist() == list(contents)
+            for name, content in contents.items():
+                assert m_zip.read(name) == content
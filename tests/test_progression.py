@@ -0,0 +1,101 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# PackY
+from packy.models.progression import Progression
+
+
+# -----------------------------------------------------------------------------
+class Clock:
+    # Time moved forward by the test
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# -----------------------------------------------------------------------------
+def rowData(progression, row):
+    return progression.data(progression.index(row, 0), 0)
+
+
+###############################################################################
+# TEST CONCURRENT TASKS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# While several runs progress together, the task progress bar follows the
+# first one until it ends, then the next one reporting its bytes.
+#
+###############################################################################
+class TestConcurrentTasks:
+    # -------------------------------------------------------------------------
+    def test(self):
+        progression = Progression(Clock())
+        progression.setNbTask(3)
+
+        progression.updateTaskBytes(1, 100, 1000)
+        progression.updateTaskBytes(2, 900, 1000)
+
+        assert rowData(progression, 1) == 10
+
+        progression.updateTaskBytes(1, 500, 1000)
+        progression.updateTaskBytes(2, 1000, 1000)
+        progression.taskEnded(2)
+
+        assert rowData(progression, 1) == 50
+
+        progression.taskEnded(1)
+        progression.updateTaskBytes(1, 1000, 1000)
+
+        assert rowData(progression, 1) == 100
+
+        progression.updateTaskBytes(2, 1000, 1000)
+        progression.updateTaskBytes(3, 200, 1000)
+
+        assert rowData(progression, 1) == 20
+
+
+###############################################################################
+# TEST BYTES PROGRESS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The progress of the tasks is weighted by their bytes, the tasks not started
+# weighing as much as the started ones on average, and the throughput and
+# time left are shown in the global progress bar.
+#
+###############################################################################
+class TestBytesProgress:
+    # -------------------------------------------------------------------------
+    def test(self):
+        clock = Clock()
+        progression = Progression(clock)
+        progression.setNbTask(3)
+
+        progression.updateTaskBytes(1, 0, 3_000_000)
+        clock.now = 1.0
+        progression.updateTaskBytes(1, 1_000_000, 3_000_000)
+
+        assert rowData(progression, 1) == 33
+        assert rowData(progression, 0) == 11
+        assert rowData(progression, 2) == "%p% - 1.0 MB/s - 0:00:08 left"
+
+        clock.now = 3.0
+        progression.updateTaskBytes(1, 3_000_000, 3_000_000)
+        progression.taskEnded(1)
+        progression.updateGlobalProgress()
+        progression.updateTaskBytes(2, 0, 1_000_000)
+
+        assert rowData(progression, 1) == 0
+        assert rowData(progression, 0) == 50
+
+        progression.setMessage("Stopping...")
+
+        assert rowData(progression, 2) == "Stopping..."
+        assert rowData(progression, 3) == "Stopping..."
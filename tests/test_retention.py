@@ -0,0 +1,145 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+import pytest
+from datetime import datetime, timedelta
+
+# PackY
+from packy.core.settings import PreferencesTask
+from packy.models.retention import SnapshotPruner, pruneList, selectSnapshots
+from packy.models.run_plan import RetentionPolicy
+from packy.models.snapshot_catalog import SnapshotCatalog, SnapshotSeries
+from packy.models.snapshot_manifest import SnapshotManifest
+
+###############################################################################
+# GLOBAL VARIABLES
+###############################################################################
+
+# Modification time far enough in the past to be trusted
+OLD_MTIME_NS = 1_000_000_000_000_000_000
+
+
+# -----------------------------------------------------------------------------
+def dailySnapshots(first_day, nb_days):
+    # One snapshot in the morning and one in the evening of each day
+    snapshots = []
+    for day in range(nb_days):
+        date = first_day + timedelta(days=day)
+        snapshots.append((f"{date:%Y_%m_%d}_am", date.replace(hour=9)))
+        snapshots.append((f"{date:%Y_%m_%d}_pm", date.replace(hour=18)))
+
+    return snapshots
+
+
+###############################################################################
+# TEST SELECT SNAPSHOTS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The latest snapshots and the newest snapshot of each period kept by a tier
+# are kept, the newest snapshot always.
+#
+# -----------------------------------------------------------------------------
+# - keep_all: no snapshot is removed.
+# - keep_last: the latest snapshots are kept.
+# - daily: the evening snapshot of the last days is kept.
+# - weekly: the Sunday snapshot of the last weeks is kept.
+# - monthly: the last snapshot of the last months is kept.
+# - yearly: the last snapshot of the year is kept.
+# - tiers: the tiers add up.
+#
+###############################################################################
+class TestSelectSnapshots:
+    # From Monday 2024-01-01 to Saturday 2024-03-30
+    snapshots = dailySnapshots(datetime(2024, 1, 1), 90)
+
+    test_list = [
+        (RetentionPolicy(), [name for name, _ in snapshots]),
+        (RetentionPolicy(nb_snapshots=3), ["2024_03_29_pm", "2024_03_30_am", "2024_03_30_pm"]),
+        (RetentionPolicy(daily=2), ["2024_03_29_pm", "2024_03_30_pm"]),
+        (
+            RetentionPolicy(weekly=3),
+            ["2024_03_17_pm", "2024_03_24_pm", "2024_03_30_pm"],
+        ),
+        (
+            RetentionPolicy(monthly=6),
+            ["2024_01_31_pm", "2024_02_29_pm", "2024_03_30_pm"],
+        ),
+        (RetentionPolicy(yearly=1), ["2024_03_30_pm"]),
+        (
+            RetentionPolicy(nb_snapshots=2, daily=2, monthly=2),
+            ["2024_02_29_pm", "2024_03_29_pm", "2024_03_30_am", "2024_03_30_pm"],
+        ),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "policy, expected",
+        test_list,
+        ids=["keep_all", "keep_last", "daily", "weekly", "monthly", "yearly", "tiers"],
+    )
+    def test(self, policy, expected):
+        prune_list = selectSnapshots(self.snapshots, policy)
+
+        assert list(prune_list.kept) == expected
+        assert len(prune_list.kept) + len(prune_list.removed) == len(self.snapshots)
+        assert set(prune_list.removed).isdisjoint(prune_list.kept)
+
+
+###############################################################################
+# TEST PRUNE LIST
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The snapshots of a series are sorted out with their time read from their
+# date suffix, and the full snapshots kept incremental ones depend on are
+# pinned.
+#
+###############################################################################
+class TestPruneList:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        for name in ["output_2024_01_01.zip", "output_2024_01_02.zip", "output_2024_02_01.zip"]:
+            (tmp_path / name).touch()
+
+        manifest = SnapshotManifest.scan([], "zip").derive("output_2024_01_01.zip", 1)
+        manifest.save(SnapshotManifest.pathFor(str(tmp_path / "output_2024_02_01.zip")))
+        os.utime(tmp_path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+        series = SnapshotSeries(str(tmp_path), "output", PreferencesTask.SUFFIX_CURR_DATE, "zip")
+        prune_list = pruneList(series, RetentionPolicy(monthly=1), SnapshotCatalog())
+
+        assert prune_list.kept == ("output_2024_02_01.zip",)
+        assert prune_list.removed == ("output_2024_01_02.zip",)
+        assert prune_list.pinned == ("output_2024_01_01.zip",)
+
+
+###############################################################################
+# TEST SNAPSHOT PRUNER
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The snapshots are removed with their manifest in the background, and the
+# ones already removed are skipped.
+#
+###############################################################################
+class TestSnapshotPruner:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        (tmp_path / "output_1.zip").touch()
+        (tmp_path / "output_1.zip.manifest").touch()
+        (tmp_path / "output_2.zip").touch()
+        removed = []
+
+        pruner = SnapshotPruner()
+        pruner.prune(str(tmp_path), ["output_1.zip", "output_3.zip"], removed.append)
+        pruner.wait()
+
+        assert removed == ["output_1.zip", "output_3.zip"]
+        assert os.listdir(tmp_path) == ["output_2.zip"]
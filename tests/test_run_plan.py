@@ -0,0 +1,128 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import dataclasses
+import json
+import pathlib
+import pickle
+import pytest
+
+# PackY
+from packy.core.settings import PreferencesTask
+from packy.models.archiver_config_model import (
+    ArchiveFormat,
+    CompressionLevel,
+    CompressionMethod,
+    ZipOptions,
+)
+from packy.models.run_plan import CompressionSettings, RetentionPolicy, RunPlan
+from packy.models.snapshot_catalog import SnapshotSeries
+
+# PackY tests
+from packy.utils_func import camelCaseToSnakeCase
+
+###############################################################################
+# GLOBAL VARIABLES
+###############################################################################
+
+test_data_folder = pathlib.Path("tests", "data", "run_plan")
+
+###############################################################################
+# MODULE FIXTURE SCOPE
+###############################################################################
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def loadTestData(request):
+    json_filename = camelCaseToSnakeCase(request.cls.__name__[4:])
+    file = pathlib.Path(request.config.rootdir, test_data_folder, json_filename).with_suffix(
+        ".json"
+    )
+    data = json.loads(file.read_text())
+
+    yield data
+
+
+# -----------------------------------------------------------------------------
+def createPlan(tmp_path):
+    return RunPlan(
+        task_id=3,
+        raw_dest_file=str(tmp_path / "output"),
+        destination_file=str(tmp_path / "output_2.zip"),
+        snapshots=SnapshotSeries(
+            tmp_path.as_posix(), "output", PreferencesTask.SUFFIX_VERSION_NUM, "zip"
+        ),
+        root_path=tmp_path.as_posix(),
+        selected_items=("dir_1",),
+        excluded_items=frozenset({"dir_1/file_1.txt"}),
+        compression=CompressionSettings(
+            ArchiveFormat.ZIP,
+            CompressionMethod.DEFLATE,
+            CompressionLevel.FAST,
+            ZipOptions(workers=2),
+        ),
+        retention=RetentionPolicy(nb_snapshots=4, full_interval=2),
+    )
+
+
+###############################################################################
+# TEST RESOLVE ITEMS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The checked items are packed, and the unchecked ones are left out of the
+# checked directories holding them.
+#
+# -----------------------------------------------------------------------------
+# - no_items: no items.
+# - item_checked: one item is checked.
+# - item_partially_checked: one item is partially cheched.
+# - item_unchecked: one item is unchecked.
+# - item_mixed: items are unchecked, checked and partially checked.
+#
+###############################################################################
+class TestResolveItems:
+    test_list = [
+        "no_items",
+        "item_checked",
+        "item_partially_checked",
+        "item_unchecked",
+        "item_mixed",
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name", test_list)
+    def test(self, loadTestData, test_name):
+        input = loadTestData[test_name]["input"]
+        expected = loadTestData[test_name]["expected"]
+
+        selected_items, excluded_items = RunPlan.resolveItems(input)
+
+        assert selected_items == tuple(expected["selected"])
+        assert excluded_items == frozenset(expected["excluded"])
+
+
+###############################################################################
+# TEST PICKLE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A plan holds plain values, so it can be sent to another process, and it
+# cannot be changed once built.
+#
+###############################################################################
+class TestPickle:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        plan = createPlan(tmp_path)
+
+        assert pickle.loads(pickle.dumps(plan)) == plan
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            plan.destination_file = str(tmp_path / "output_3.zip")
@@ -0,0 +1,245 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# PackY
+from packy.core.settings import PreferencesTask
+from packy.models.archiver_config_model import (
+    ArchiveFormat,
+    CompressionLevel,
+    CompressionMethod,
+    ZipOptions,
+)
+from packy.models.packer_signals import PackerSignals
+from packy.models.run_plan import CompressionSettings, RetentionPolicy, RunPlan
+from packy.models.run_scheduler import CpuBudget, RunScheduler
+from packy.models.snapshot_catalog import SnapshotSeries
+from packy.models.tasks_model import TaskPriority
+
+
+# -----------------------------------------------------------------------------
+class ThreadPool:
+    # Holds the packers started instead of running them
+    def __init__(self):
+        self.started = []
+
+    def start(self, packer):
+        self.started.append(packer)
+
+
+# -----------------------------------------------------------------------------
+class Packer:
+    def __init__(self, plan, cancel_token):
+        self.plan = plan
+        self.cancel_token = cancel_token
+        self.signals = PackerSignals()
+
+
+# -----------------------------------------------------------------------------
+def createPlan(dir_path, name, workers=1):
+    return RunPlan(
+        task_id=0,
+        raw_dest_file=str(dir_path / name),
+        destination_file=str(dir_path / f"{name}.zip"),
+        snapshots=SnapshotSeries(str(dir_path), name, PreferencesTask.SUFFIX_NOTHING, "zip"),
+        root_path=str(dir_path),
+        selected_items=(),
+        excluded_items=frozenset(),
+        compression=CompressionSettings(
+            ArchiveFormat.ZIP,
+            CompressionMethod.DEFLATE,
+            CompressionLevel.NORMAL,
+            ZipOptions(workers=workers),
+        ),
+        retention=RetentionPolicy(),
+    )
+
+
+# -----------------------------------------------------------------------------
+def startedNames(thread_pool):
+    return [packer.plan.snapshots.raw_basename for packer in thread_pool.started]
+
+
+###############################################################################
+# TEST CPU BUDGET
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The tokens are granted as long as some are available, at least one per
+# request, and given back.
+#
+###############################################################################
+class TestCpuBudget:
+    # -------------------------------------------------------------------------
+    def test(self):
+        budget = CpuBudget(4)
+
+        assert budget.acquire(3) == 3
+        assert budget.acquire(0) == 1
+        assert budget.acquire(2) == 0
+
+        budget.release(3)
+
+        assert budget.available == 3
+
+
+###############################################################################
+# TEST START ORDER
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The runs start by priority, then the longest first, then in submission
+# order, each one once the previous one gave its CPU token back.
+#
+###############################################################################
+class TestStartOrder:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        thread_pool = ThreadPool()
+        scheduler = RunScheduler(CpuBudget(1), thread_pool=thread_pool, packer_factory=Packer)
+        scheduler.setDurations({str(tmp_path / "long"): 60.0, str(tmp_path / "short"): 5.0})
+        finished = []
+        scheduler.all_finished.connect(lambda: finished.append(True))
+
+        for name, priority in [("short", 0), ("new", 0), ("long", 0), ("urgent", 1)]:
+            scheduler.submit(createPlan(tmp_path, name), priority)
+        scheduler.start()
+
+        for packer in thread_pool.started:
+            packer.signals.finish.emit()
+
+        assert startedNames(thread_pool) == ["urgent", "long", "short", "new"]
+        assert finished == [True]
+        assert scheduler.isIdle()
+        assert str(tmp_path / "new") in scheduler.durations()
+
+
+###############################################################################
+# TEST RESOURCES
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A run waits while another one uses its disk, and the next ones on other
+# disks start meanwhile. The compressors of a run are sized to the CPU
+# tokens granted, fewer than asked for once the others are granted.
+#
+###############################################################################
+class TestResources:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        thread_pool = ThreadPool()
+        budget = CpuBudget(4)
+        scheduler = RunScheduler(budget, thread_pool=thread_pool, packer_factory=Packer)
+        missing_path = tmp_path / "missing"
+
+        scheduler.submit(createPlan(tmp_path, "first", workers=3))
+        scheduler.submit(createPlan(tmp_path, "same_disk"))
+        scheduler.submit(createPlan(missing_path, "no_disk", workers=2))
+        scheduler.start()
+
+        assert startedNames(thread_pool) == ["first", "no_disk"]
+        assert thread_pool.started[1].plan.compression.options.workers == 1
+        assert budget.available == 0
+
+        thread_pool.started[0].signals.finish.emit()
+
+        assert startedNames(thread_pool) == ["first", "no_disk", "same_disk"]
+        assert thread_pool.started[2].plan == createPlan(tmp_path, "same_disk")
+
+
+###############################################################################
+# TEST DEFAULT WORKERS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A run leaving the number of workers to the default takes its share of the
+# CPU tokens among the runs waiting, so the runs on different disks start
+# together instead of one at a time.
+#
+###############################################################################
+class TestDefaultWorkers:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        thread_pool = ThreadPool()
+        budget = CpuBudget(4)
+        scheduler = RunScheduler(budget, thread_pool=thread_pool, packer_factory=Packer)
+
+        # The folders missing are on no disk, as if each run had its own
+        for name in ["first", "second", "third"]:
+            scheduler.submit(createPlan(tmp_path / name, name, workers=0))
+        scheduler.start()
+
+        workers = [packer.plan.compression.options.workers for packer in thread_pool.started]
+        assert startedNames(thread_pool) == ["first", "second", "third"]
+        assert workers == [1, 2, 1]
+        assert budget.available == 0
+
+        for packer in thread_pool.started:
+            packer.signals.finish.emit()
+
+        scheduler.submit(createPlan(tmp_path / "alone", "alone", workers=0))
+        scheduler.start()
+
+        assert thread_pool.started[-1].plan.compression.options.workers == 4
+
+
+###############################################################################
+# TEST PRIORITY
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The runs of the tasks with a higher priority start first, whatever their
+# submission order and the duration of their previous run.
+#
+###############################################################################
+class TestPriority:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        thread_pool = ThreadPool()
+        scheduler = RunScheduler(CpuBudget(1), thread_pool=thread_pool, packer_factory=Packer)
+        scheduler.setDurations({str(tmp_path / "low"): 60.0})
+
+        for priority in [TaskPriority.LOW, TaskPriority.NORMAL, TaskPriority.HIGH]:
+            scheduler.submit(createPlan(tmp_path, priority.name.lower()), priority.value)
+        scheduler.start()
+
+        for packer in thread_pool.started:
+            packer.signals.finish.emit()
+
+        assert startedNames(thread_pool) == ["high", "normal", "low"]
+
+
+###############################################################################
+# TEST CANCEL
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Cancelling drops the runs waiting and stops the runs started, which give
+# their resources back once finished.
+#
+###############################################################################
+class TestCancel:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        thread_pool = ThreadPool()
+        budget = CpuBudget(1)
+        scheduler = RunScheduler(budget, thread_pool=thread_pool, packer_factory=Packer)
+        finished = []
+        scheduler.all_finished.connect(lambda: finished.append(True))
+
+        scheduler.submit(createPlan(tmp_path, "first"))
+        scheduler.submit(createPlan(tmp_path, "second"))
+        scheduler.start()
+        scheduler.cancel()
+
+        assert thread_pool.started[0].cancel_token.is_cancelled
+        assert finished == []
+
+        thread_pool.started[0].signals.finish.emit()
+
+        assert startedNames(thread_pool) == ["first"]
+        assert finished == [True]
+        assert budget.available == 1
@@ -0,0 +1,87 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import pytest
+
+# PackY
+from packy.models.scan_cache import DirListing, ScanCache
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def cache(tmp_path):
+    yield ScanCache(tmp_path / "cache" / "scan_cache.sqlite3")
+
+
+# -----------------------------------------------------------------------------
+def listing(mtime_ns, dir_names=(), file_names=(), link_names=()):
+    return DirListing(mtime_ns, frozenset(dir_names), frozenset(file_names), frozenset(link_names))
+
+
+###############################################################################
+# TEST LOAD
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The listings stored are read back for the folders asked and their
+# descendants only, even once the cache is reopened.
+#
+###############################################################################
+class TestLoad:
+    # -------------------------------------------------------------------------
+    def test(self, cache):
+        listings = {
+            "/root/dir_1": listing(1, file_names=["file_1.txt", "file_2.txt"]),
+            "/root/dir_2": listing(2, dir_names=["dir_3"], link_names=["link"]),
+            "/root/dir_2/dir_3": listing(3),
+            "/root/dir_2-copy": listing(4),
+        }
+        cache.update(listings, [])
+
+        reopened_cache = ScanCache(cache.db_path)
+
+        assert reopened_cache.load(["/root/dir_2"]) == {
+            "/root/dir_2": listings["/root/dir_2"],
+            "/root/dir_2/dir_3": listings["/root/dir_2/dir_3"],
+        }
+        assert reopened_cache.load(["/root/"]) == listings
+        assert reopened_cache.load(["/other"]) == {}
+
+
+###############################################################################
+# TEST UPDATE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A listing stored again replaces the previous one, and a directory removed
+# is forgotten with its descendants.
+#
+###############################################################################
+class TestUpdate:
+    # -------------------------------------------------------------------------
+    def test(self, cache):
+        cache.update(
+            {
+                "/root/dir_2": listing(1, dir_names=["dir_3"]),
+                "/root/dir_2/dir_3": listing(2, dir_names=["dir_4"]),
+                "/root/dir_2/dir_3/dir_4": listing(3),
+            },
+            [],
+        )
+        cache.update({"/root/dir_2": listing(4)}, ["/root/dir_2/dir_3"])
+
+        assert cache.load(["/root"]) == {"/root/dir_2": listing(4)}
+
+    # -------------------------------------------------------------------------
+    def test_unwritable(self, tmp_path):
+        (tmp_path / "cache").write_text("not a folder")
+        cache = ScanCache(tmp_path / "cache" / "scan_cache.sqlite3")
+
+        cache.update({"/root": listing(1)}, [])
+
+        assert cache.load(["/root"]) == {}
@@ -0,0 +1,245 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import pytest
+
+# PackY
+from packy.models.selection_tree import CheckState, SelectionTree
+
+###############################################################################
+# FILE HIERARCHY
+#
+# -----------------------------------------------------------------------------
+# /root
+# ├─ dir_1
+# │  ├─ file_1.txt
+# │  └─ file_2.txt
+# └─ dir_2
+#    ├─ dir_3
+#    │  └─ file_3.txt
+#    └─ file_4.txt
+#
+###############################################################################
+
+ROOT = "/root"
+ITEMS = [
+    "/root/dir_1",
+    "/root/dir_1/file_1.txt",
+    "/root/dir_1/file_2.txt",
+    "/root/dir_2",
+    "/root/dir_2/dir_3",
+    "/root/dir_2/dir_3/file_3.txt",
+    "/root/dir_2/file_4.txt",
+]
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def selection():
+    selection = SelectionTree(ROOT)
+    for item in ITEMS:
+        selection.register(item)
+
+    yield selection
+
+
+###############################################################################
+# TEST SET STATE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Checking or unchecking an item applies the state to everything below it and
+# updates its ancestors, up to the root folder excluded. Only the explicit
+# states are recorded.
+#
+# -----------------------------------------------------------------------------
+# - check_dir: all the descendants of a checked directory are checked.
+# - check_file: the parents of a checked file become partially checked.
+# - check_siblings: a directory is checked when all its children are.
+# - check_root_children: the root folder is never marked.
+# - uncheck_file: the parents of an unchecked file become partially checked.
+# - uncheck_siblings: a directory is unchecked when none of its children is
+#   checked.
+#
+###############################################################################
+class TestSetState:
+    test_list = [
+        (
+            "check_dir",
+            [("/root/dir_2", CheckState.CHECKED)],
+            {
+                "/root/dir_2": CheckState.CHECKED,
+                "/root/dir_2/dir_3": CheckState.CHECKED,
+                "/root/dir_2/dir_3/file_3.txt": CheckState.CHECKED,
+                "/root/dir_2/file_4.txt": CheckState.CHECKED,
+                "/root/dir_1": CheckState.UNCHECKED,
+            },
+            {"/root/dir_2": 2},
+        ),
+        (
+            "check_file",
+            [("/root/dir_2/dir_3/file_3.txt", CheckState.CHECKED)],
+            {
+                "/root/dir_2/dir_3": CheckState.CHECKED,
+                "/root/dir_2": CheckState.PARTIALLY_CHECKED,
+                "/root/dir_2/file_4.txt": CheckState.UNCHECKED,
+            },
+            {"/root/dir_2/dir_3": 2},
+        ),
+        (
+            "check_siblings",
+            [
+                ("/root/dir_1/file_1.txt", CheckState.CHECKED),
+                ("/root/dir_1/file_2.txt", CheckState.CHECKED),
+            ],
+            {"/root/dir_1": CheckState.CHECKED},
+            {"/root/dir_1": 2},
+        ),
+        (
+            "check_root_children",
+            [
+                ("/root/dir_1", CheckState.CHECKED),
+                ("/root/dir_2", CheckState.CHECKED),
+            ],
+            {"/root": CheckState.PARTIALLY_CHECKED},
+            {"/root/dir_1": 2, "/root/dir_2": 2},
+        ),
+        (
+            "uncheck_file",
+            [
+                ("/root/dir_2", CheckState.CHECKED),
+                ("/root/dir_2/dir_3/file_3.txt", CheckState.UNCHECKED),
+            ],
+            {
+                "/root/dir_2/dir_3": CheckState.UNCHECKED,
+                "/root/dir_2": CheckState.PARTIALLY_CHECKED,
+                "/root/dir_2/file_4.txt": CheckState.CHECKED,
+            },
+            {"/root/dir_2": 2, "/root/dir_2/dir_3": 0},
+        ),
+        (
+            "uncheck_siblings",
+            [
+                ("/root/dir_1", CheckState.CHECKED),
+                ("/root/dir_1/file_1.txt", CheckState.UNCHECKED),
+                ("/root/dir_1/file_2.txt", CheckState.UNCHECKED),
+            ],
+            {"/root/dir_1": CheckState.UNCHECKED},
+            {},
+        ),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name, actions, expected, expected_checks", test_list)
+    def test(self, selection, test_name, actions, expected, expected_checks):
+        for path, state in actions:
+            selection.set_state(path, state)
+
+        assert {path: selection.state(path) for path in expected} == expected
+        assert selection.checks() == expected_checks
+
+    # -------------------------------------------------------------------------
+    def test_changed_paths(self, selection):
+        changed_paths = selection.set_state("/root/dir_1/file_1.txt", CheckState.CHECKED)
+        assert changed_paths == ["/root/dir_1/file_1.txt", "/root/dir_1"]
+
+        changed_paths = selection.set_state("/root/dir_1/file_1.txt", CheckState.CHECKED)
+        assert changed_paths == []
+
+
+###############################################################################
+# TEST SET STATE SPARSE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A directory takes the state of its children only once they are all known:
+# the items read from a sparse selection may not be the whole directory.
+#
+###############################################################################
+class TestSetStateSparse:
+    # -------------------------------------------------------------------------
+    def test(self):
+        selection = SelectionTree(ROOT)
+        selection.load({"/root/dir_1/file_1.txt": 2})
+
+        # An item added to a directory never shown
+        selection.register("/root/dir_1/file_2.txt")
+        selection.set_state("/root/dir_1/file_2.txt", CheckState.CHECKED)
+
+        assert selection.state("/root/dir_1/file_5.txt") == CheckState.UNCHECKED
+        assert selection.checks() == {"/root/dir_1/file_1.txt": 2, "/root/dir_1/file_2.txt": 2}
+
+        # The directory is shown
+        selection.register("/root/dir_1/file_1.txt")
+        selection.set_state("/root/dir_1/file_1.txt", CheckState.CHECKED)
+
+        assert selection.checks() == {"/root/dir_1": 2}
+
+
+###############################################################################
+# TEST LOAD
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A selection written with the state of every item shown, as sessions were
+# before, loads to the same sparse selection, and its items become known.
+# Unknown items inherit the state of their nearest marked ancestor.
+#
+###############################################################################
+class TestLoad:
+    # -------------------------------------------------------------------------
+    def test(self, selection):
+        selection.set_state("/root/dir_2/dir_3", CheckState.CHECKED)
+
+        loaded_selection = SelectionTree(ROOT)
+        loaded_selection.load(
+            {
+                "/root/dir_2/": 1,
+                "/root/dir_2/dir_3": 2,
+                "/root/dir_2/dir_3/file_3.txt": 2,
+                "/root/dir_2/file_4.txt": 0,
+            },
+            sparse=False,
+        )
+
+        assert loaded_selection == selection
+        assert loaded_selection.is_known("/root/dir_2/dir_3/file_3.txt")
+        assert loaded_selection.is_listed("/root/dir_2")
+
+    # -------------------------------------------------------------------------
+    def test_sparse(self):
+        selection = SelectionTree(ROOT)
+        selection.load({"/root/dir_2": 2, "/root/dir_2/dir_3": 0})
+
+        assert selection.state("/root/dir_2/file_5.txt") == CheckState.CHECKED
+        assert selection.state("/root/dir_2/dir_3/dir_6/file_6.txt") == CheckState.UNCHECKED
+        assert not selection.is_listed("/root/dir_2")
+        assert list(selection.checked_roots()) == []
+
+
+###############################################################################
+# TEST REMOVE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Removing an item forgets it with the states below it.
+#
+###############################################################################
+class TestRemove:
+    # -------------------------------------------------------------------------
+    def test(self, selection):
+        selection.set_state("/root/dir_2", CheckState.CHECKED)
+        selection.set_state("/root/dir_2/dir_3/file_3.txt", CheckState.UNCHECKED)
+        selection.remove("/root/dir_2/dir_3")
+
+        assert selection.checks() == {"/root/dir_2": 2}
+        assert not selection.is_known("/root/dir_2/dir_3")
+
+        selection.set_state("/root/dir_2/file_4.txt", CheckState.UNCHECKED)
+        assert selection.checks() == {}
+        assert selection.state("/root/dir_2") == CheckState.UNCHECKED
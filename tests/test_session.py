@@ -0,0 +1,55 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# PyQt
+from PySide6.QtCore import QObject, Signal
+
+# PackY
+from packy.models.session import Session
+from packy.models.task_selection import TaskSelection
+
+
+# -----------------------------------------------------------------------------
+class TaskDouble(QObject):
+    # The members of a task read by the session to find its row
+    statusChanged = Signal(int)
+
+    def __init__(self, task_id):
+        super().__init__()
+        self.id = task_id
+        self.task_selection = TaskSelection()
+
+    def filesSelected(self):
+        return self.task_selection
+
+
+###############################################################################
+# TEST DATA CHANGED
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The row of a task is repainted when its status or the warnings of its
+# selection change, the tasks being found by their identifier.
+#
+###############################################################################
+class TestDataChanged:
+    # -------------------------------------------------------------------------
+    def test(self):
+        session = Session()
+        tasks = [TaskDouble(3), TaskDouble(7)]
+        session.setTasks(tasks)
+        rows = []
+        session.dataChanged.connect(lambda top_left, _: rows.append(top_left.row()))
+
+        assert session.taskRowById(7) == 1
+        assert session.taskRowById(5) == -1
+
+        tasks[0].statusChanged.emit(3)
+        session.emitSelectionChanged(tasks[1].filesSelected())
+        session.emitSelectionChanged(TaskSelection())
+
+        assert rows == [0, 1]
@@ -0,0 +1,191 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+import pytest
+from datetime import datetime
+
+# PackY
+from packy.core.settings import PreferencesTask
+from packy.models.snapshot_catalog import SnapshotCatalog, SnapshotSeries
+from packy.models.snapshot_manifest import SnapshotManifest
+
+###############################################################################
+# GLOBAL VARIABLES
+###############################################################################
+
+# Modification times far enough in the past to be trusted
+OLD_MTIME_NS = 1_000_000_000_000_000_000
+OTHER_OLD_MTIME_NS = 1_000_000_001_000_000_000
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def snapshotsDir(tmp_path):
+    for name in [
+        "output_9.zip",
+        "output_10.zip",
+        "output_10.zip.manifest",
+        "output_2.zip",
+        "output_2024_01_31.zip",
+        "output_2023_12_01.zip",
+        "output.zip",
+        "other_1.zip",
+        "output_3.tar",
+    ]:
+        (tmp_path / name).touch()
+
+    os.utime(tmp_path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+    yield tmp_path
+
+
+# -----------------------------------------------------------------------------
+def series(dir_path, suffix):
+    return SnapshotSeries(str(dir_path), "output", suffix, "zip")
+
+
+###############################################################################
+# TEST SNAPSHOTS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The snapshots of a series are sorted from the oldest to the newest, the
+# numbered ones by version number.
+#
+# -----------------------------------------------------------------------------
+# - version: the numbered snapshots.
+# - date: the snapshots suffixed with their date.
+# - nothing: the snapshot without suffix.
+#
+###############################################################################
+class TestSnapshots:
+    test_list = [
+        (
+            PreferencesTask.SUFFIX_VERSION_NUM,
+            ["output_2.zip", "output_9.zip", "output_10.zip"],
+        ),
+        (
+            PreferencesTask.SUFFIX_CURR_DATE,
+            ["output_2023_12_01.zip", "output_2024_01_31.zip"],
+        ),
+        (PreferencesTask.SUFFIX_NOTHING, ["output.zip"]),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("suffix, expected", test_list, ids=["version", "date", "nothing"])
+    def test(self, snapshotsDir, suffix, expected):
+        catalog = SnapshotCatalog()
+
+        assert catalog.snapshots(series(snapshotsDir, suffix)) == expected
+
+
+###############################################################################
+# TEST LAST VERSION
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The highest version number of a numbered series, -1 without snapshot.
+#
+###############################################################################
+class TestLastVersion:
+    # -------------------------------------------------------------------------
+    def test(self, snapshotsDir, tmp_path):
+        catalog = SnapshotCatalog()
+        empty_series = SnapshotSeries(
+            str(snapshotsDir), "empty", PreferencesTask.SUFFIX_VERSION_NUM, "zip"
+        )
+
+        missing_series = series(tmp_path / "missing", PreferencesTask.SUFFIX_VERSION_NUM)
+
+        assert catalog.lastVersion(series(snapshotsDir, PreferencesTask.SUFFIX_VERSION_NUM)) == 10
+        assert catalog.lastVersion(empty_series) == -1
+        assert catalog.lastVersion(missing_series) == -1
+
+
+###############################################################################
+# TEST UPDATE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The snapshots written and deleted by the application update the index
+# without listing the folder again, while a folder changed by another
+# program is listed again.
+#
+###############################################################################
+class TestUpdate:
+    # -------------------------------------------------------------------------
+    def test(self, snapshotsDir):
+        catalog = SnapshotCatalog()
+        version_series = series(snapshotsDir, PreferencesTask.SUFFIX_VERSION_NUM)
+        catalog.snapshots(version_series)
+
+        (snapshotsDir / "output_11.zip").touch()
+        (snapshotsDir / "output_9.zip").unlink()
+        os.utime(snapshotsDir, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+        catalog.add(str(snapshotsDir / "output_11.zip"))
+        catalog.remove(str(snapshotsDir / "output_9.zip"))
+
+        # A file created without changing the modification time is not seen
+        (snapshotsDir / "output_12.zip").touch()
+        os.utime(snapshotsDir, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+        assert catalog.snapshots(version_series) == [
+            "output_2.zip",
+            "output_10.zip",
+            "output_11.zip",
+        ]
+
+        os.utime(snapshotsDir, ns=(OTHER_OLD_MTIME_NS, OTHER_OLD_MTIME_NS))
+
+        assert catalog.lastVersion(version_series) == 12
+
+
+###############################################################################
+# TEST TIMES
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The time of a numbered snapshot is the time of the run recorded in its
+# manifest, even when it is a hard link sharing the modification time of an
+# older snapshot, and else its modification time.
+#
+###############################################################################
+class TestTimes:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        first_time = datetime(2024, 1, 1, 12)
+        linked_time = datetime(2024, 2, 1, 12)
+        old_time = datetime(2023, 6, 1, 12)
+
+        first_path = tmp_path / "output_1.zip"
+        first_path.touch()
+        os.utime(first_path, (first_time.timestamp(), first_time.timestamp()))
+        SnapshotManifest("zip", {}, run_time=first_time.timestamp()).save(
+            SnapshotManifest.pathFor(str(first_path))
+        )
+
+        linked_path = tmp_path / "output_2.zip"
+        os.link(first_path, linked_path)
+        SnapshotManifest("zip", {}, run_time=linked_time.timestamp()).save(
+            SnapshotManifest.pathFor(str(linked_path))
+        )
+
+        # Written before the run time was recorded
+        old_path = tmp_path / "output_0.zip"
+        old_path.touch()
+        os.utime(old_path, (old_time.timestamp(), old_time.timestamp()))
+        os.utime(tmp_path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+        catalog = SnapshotCatalog()
+
+        assert catalog.times(series(tmp_path, PreferencesTask.SUFFIX_VERSION_NUM)) == [
+            ("output_0.zip", old_time),
+            ("output_1.zip", first_time),
+            ("output_2.zip", linked_time),
+        ]
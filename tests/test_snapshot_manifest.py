@@ -0,0 +1,163 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import os
+import pytest
+
+# PackY
+from packy.models.packer import PackEntry
+from packy.models.snapshot_manifest import SnapshotManifest
+
+###############################################################################
+# FILE HIERARCHY
+#
+# -----------------------------------------------------------------------------
+# tmp_path
+# ├─ folder
+# │  ├─ file_1.txt
+# │  └─ dir_1
+# │     └─ file_2.txt
+# └─ results
+#
+###############################################################################
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def sourceFolder(tmp_path):
+    folder = tmp_path / "folder"
+    (folder / "dir_1").mkdir(parents=True)
+    (tmp_path / "results").mkdir()
+    (folder / "file_1.txt").write_text("file 1")
+    (folder / "dir_1" / "file_2.txt").write_text("file 2")
+
+    yield folder
+
+
+# -----------------------------------------------------------------------------
+def listEntries(root_path):
+    entries = []
+    for root, dirs, files in os.walk(root_path):
+        for name in dirs + files:
+            path = os.path.join(root, name)
+            entries.append(PackEntry(path, os.path.relpath(path, root_path), name in dirs))
+
+    return entries
+
+
+###############################################################################
+# TEST SAVE LOAD
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A saved manifest is read back equal, and a missing or corrupted manifest is
+# read as None.
+#
+###############################################################################
+class TestSaveLoad:
+    # -------------------------------------------------------------------------
+    def test(self, sourceFolder, tmp_path):
+        manifest = SnapshotManifest.scan(listEntries(sourceFolder), "zip")
+        manifest_path = SnapshotManifest.pathFor(str(tmp_path / "results" / "output_1.zip"))
+        manifest.save(manifest_path)
+
+        assert SnapshotManifest.load(manifest_path) == manifest
+        assert sorted(manifest.records) == ["dir_1", "dir_1/file_2.txt", "file_1.txt"]
+
+    # -------------------------------------------------------------------------
+    def test_invalid(self, tmp_path):
+        manifest_path = tmp_path / "output_1.zip.manifest"
+        assert SnapshotManifest.load(str(manifest_path)) is None
+
+        manifest_path.write_bytes(b"not a manifest")
+        assert SnapshotManifest.load(str(manifest_path)) is None
+
+
+###############################################################################
+# TEST SCAN
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A fresh scan of the source tree differs from the previous one as soon as an
+# item or the archiver configuration changed.
+#
+# -----------------------------------------------------------------------------
+# - unchanged: nothing changed.
+# - modified: a file was rewritten with a different size.
+# - added: a file was added.
+# - removed: a file was removed.
+# - config: the archiver configuration changed.
+#
+###############################################################################
+class TestScan:
+    test_list = [
+        ("unchanged", True),
+        ("modified", False),
+        ("added", False),
+        ("removed", False),
+        ("config", False),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name, expected", test_list)
+    def test(self, sourceFolder, test_name, expected):
+        previous = SnapshotManifest.scan(listEntries(sourceFolder), "zip")
+        config = "zip"
+
+        match test_name:
+            case "modified":
+                (sourceFolder / "file_1.txt").write_text("file 1 modified")
+            case "added":
+                (sourceFolder / "file_3.txt").write_text("file 3")
+            case "removed":
+                (sourceFolder / "dir_1" / "file_2.txt").unlink()
+            case "config":
+                config = "tgz"
+
+        current = SnapshotManifest.scan(listEntries(sourceFolder), config)
+
+        assert (current == previous) == expected
+
+
+###############################################################################
+# TEST DIFF
+#
+# -----------------------------------------------------------------------------
+# Description:
+# An incremental snapshot holds the items added or modified since its base,
+# and lists the items deleted since.
+#
+###############################################################################
+class TestDiff:
+    # -------------------------------------------------------------------------
+    def test(self, sourceFolder):
+        base = SnapshotManifest.scan(listEntries(sourceFolder), "zip")
+
+        (sourceFolder / "file_1.txt").write_text("file 1 modified")
+        (sourceFolder / "file_3.txt").write_text("file 3")
+        (sourceFolder / "dir_1" / "file_2.txt").unlink()
+
+        current = SnapshotManifest.scan(listEntries(sourceFolder), "zip")
+        changed, deleted = current.diff(base)
+
+        assert changed >= {"file_1.txt", "file_3.txt"}
+        assert "dir_1/file_2.txt" not in changed
+        assert deleted == ["dir_1/file_2.txt"]
+
+    # -------------------------------------------------------------------------
+    def test_header(self, sourceFolder, tmp_path):
+        manifest = SnapshotManifest.scan(listEntries(sourceFolder), "zip").derive("output_1.zip", 2)
+        manifest_path = SnapshotManifest.pathFor(str(tmp_path / "results" / "output_3.zip"))
+        manifest.save(manifest_path)
+
+        header = SnapshotManifest.load(manifest_path, with_records=False)
+
+        assert header.base == "output_1.zip"
+        assert header.index == 2
+        assert header.run_time == manifest.run_time
+        assert header.records == {}
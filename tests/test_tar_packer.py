@@ -0,0 +1,323 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import bz2
+import gc
+import gzip
+import json
+import lzma
+import os
+import pathlib
+import pytest
+import tarfile
+from unittest.mock import MagicMock
+
+try:
+    from compression import zstd
+except ImportError:  # Python built without libzstd
+    zstd = None
+
+# PackY
+from packy.core.settings import PreferencesTask
+from packy.models.archiver_config_model import (
+    ArchiveFormat,
+    CompressionLevel,
+    CompressionMethod,
+    ZstdOptions,
+)
+from packy.models.cancellation import CancellationToken, RunCancelledError
+from packy.models.event_buffer import EventBuffer, EventLevel
+from packy.models.packer import PackEntry, PackerError
+from packy.models.run_plan import CompressionSettings, RetentionPolicy, RunPlan
+from packy.models.snapshot_catalog import SnapshotSeries
+from packy.models.tar_packer import FilePacker, TarPacker, openZstdStream
+
+# PackY tests
+from packy.utils_func import camelCaseToSnakeCase
+
+###############################################################################
+# FILE HIERARCHY
+#
+# -----------------------------------------------------------------------------
+# tmp_path
+# ├─ folder
+# │  ├─ file_1.txt
+# │  ├─ dir_1
+# │  │  └─ file_2.txt
+# │  └─ dir_2
+# └─ results
+#
+###############################################################################
+
+###############################################################################
+# GLOBAL VARIABLES
+###############################################################################
+
+requires_zstd = pytest.mark.skipif(zstd is None, reason="Python built without libzstd")
+
+test_data_folder = pathlib.Path("tests", "data", "tar_packer")
+
+###############################################################################
+# MODULE FIXTURE SCOPE
+###############################################################################
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def loadFileHierarchy(request, tmp_path):
+    file = pathlib.Path(request.config.rootdir, test_data_folder, "file_hierarchy").with_suffix(
+        ".json"
+    )
+    file_txt = file.read_text()
+    a_tmp_path = str(tmp_path).replace("\\", "/")
+    file_txt = file_txt.replace("tmp_path", a_tmp_path)
+    data = json.loads(file_txt)
+
+    yield data
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def loadTestData(request, tmp_path):
+    json_filename = camelCaseToSnakeCase(request.cls.__name__[4:])
+    file = pathlib.Path(request.config.rootdir, test_data_folder, json_filename).with_suffix(
+        ".json"
+    )
+    file_txt = file.read_text()
+    a_tmp_path = str(tmp_path).replace("\\", "/")
+    file_txt = file_txt.replace("tmp_path", a_tmp_path)
+    data = json.loads(file_txt)
+
+    yield data
+
+
+# -----------------------------------------------------------------------------
+def recursive(fh_dict):
+    for node in fh_dict:
+        type = node["type"]
+
+        match type:
+            case "file":
+                open(node["path"], "w").close()
+            case "folder":
+                os.makedirs(node["path"])
+            case _:
+                raise Exception("")
+
+        if "children" in node:
+            recursive(node["children"])
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def createFileHierarchy(loadFileHierarchy):
+    fh_dict = loadFileHierarchy
+
+    recursive(fh_dict["root"])
+
+
+# -----------------------------------------------------------------------------
+def createPlan(archive_format: str, destination_file: str):
+    compression = CompressionSettings(
+        ArchiveFormat[archive_format], CompressionMethod.STORE, CompressionLevel.FASTEST, None
+    )
+
+    return RunPlan(
+        task_id=0,
+        raw_dest_file=destination_file,
+        destination_file=destination_file,
+        snapshots=SnapshotSeries(
+            os.path.dirname(destination_file),
+            "output",
+            PreferencesTask.SUFFIX_NOTHING,
+            compression.format.label,
+        ),
+        root_path="",
+        selected_items=(),
+        excluded_items=frozenset(),
+        compression=compression,
+        retention=RetentionPolicy(),
+    )
+
+
+# -----------------------------------------------------------------------------
+def listEntries(root_path):
+    entries = []
+    for root, dirs, files in os.walk(root_path):
+        for name in dirs + files:
+            path = os.path.join(root, name)
+            entries.append(PackEntry(path, os.path.relpath(path, root_path), name in dirs))
+
+    return entries
+
+
+###############################################################################
+# TEST PACK ENTRIES
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Stream the entries into a tar archive compressed according to the format.
+#
+# -----------------------------------------------------------------------------
+# - tar, tgz, tbz, txz, tlz, tzst: the archive format.
+#
+###############################################################################
+class TestPackEntries:
+    test_list = ["tar", "tgz", "tbz", "txz", "tlz", pytest.param("tzst", marks=requires_zstd)]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name", test_list)
+    def test(self, createFileHierarchy, loadTestData, test_name, tmp_path):
+        input = loadTestData[test_name]["input"]
+        expected = loadTestData[test_name]["expected"]
+
+        destination_file = input["destination_file"]
+        plan = createPlan(input["format"], destination_file)
+        entries = listEntries(os.path.join(tmp_path, "folder"))
+
+        tar_packer = TarPacker(plan)
+        tar_packer.signals = MagicMock()
+        tar_packer.packEntries(plan, entries)
+
+        with tarfile.open(destination_file, "r:*") as m_tar:
+            assert sorted(m_tar.getnames()) == sorted(expected)
+
+
+###############################################################################
+# TEST COMPRESS FILE
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Compress the single selected file according to the format.
+#
+# -----------------------------------------------------------------------------
+# - gz, bz2, xz, zst: the compressed file format.
+# - several_files: more than one file is selected.
+#
+###############################################################################
+class TestCompressFile:
+    test_list = ["gz", "bz2", "xz", pytest.param("zst", marks=requires_zstd), "several_files"]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("test_name", test_list)
+    def test(self, createFileHierarchy, loadTestData, test_name, tmp_path):
+        input = loadTestData[test_name]["input"]
+        expected = loadTestData[test_name]["expected"]
+
+        destination_file = input["destination_file"]
+        plan = createPlan(input["format"], destination_file)
+        root_path = os.path.join(tmp_path, "folder")
+        entries = [
+            PackEntry(path, os.path.relpath(path, root_path), False)
+            for path in input["selected_files"]
+        ]
+
+        file_packer = FilePacker(plan)
+        file_packer.signals = MagicMock()
+
+        if not expected:
+            with pytest.raises(PackerError):
+                file_packer.packEntries(plan, entries)
+            return
+
+        file_packer.packEntries(plan, entries)
+
+        match ArchiveFormat[input["format"]]:
+            case ArchiveFormat.GZ:
+                content = gzip.decompress(pathlib.Path(destination_file).read_bytes())
+            case ArchiveFormat.BZ2:
+                content = bz2.decompress(pathlib.Path(destination_file).read_bytes())
+            case ArchiveFormat.XZ:
+                content = lzma.decompress(pathlib.Path(destination_file).read_bytes())
+            case ArchiveFormat.ZST:
+                content = zstd.decompress(pathlib.Path(destination_file).read_bytes())
+
+        assert content == pathlib.Path(input["selected_files"][0]).read_bytes()
+
+
+###############################################################################
+# TEST CANCEL
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A cancelled run stops packing at the next entry or chunk read, and the
+# archive is closed without raising the cancellation again.
+#
+# -----------------------------------------------------------------------------
+# - tar, tgz: the archive format.
+#
+###############################################################################
+class TestCancel:
+    test_list = ["TAR", "TGZ"]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("archive_format", test_list)
+    def test(self, createFileHierarchy, archive_format, tmp_path):
+        destination_file = os.path.join(tmp_path, "results", "output.tar")
+        plan = createPlan(archive_format, destination_file)
+        entries = listEntries(os.path.join(tmp_path, "folder"))
+        cancel_token = CancellationToken()
+        cancel_token.cancel()
+
+        event_buffer = EventBuffer()
+
+        tar_packer = TarPacker(plan, cancel_token, event_buffer)
+
+        with pytest.raises(RunCancelledError):
+            tar_packer.packEntries(plan, entries)
+
+        assert event_buffer.drain() == []
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize("archive_format", test_list)
+    @pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+    def test_while_packing(self, createFileHierarchy, archive_format, tmp_path):
+        # The stream is closed without raising the cancellation again
+        destination_file = os.path.join(tmp_path, "results", "output.tar")
+        plan = createPlan(archive_format, destination_file)
+        entries = listEntries(os.path.join(tmp_path, "folder"))
+        cancel_token = CancellationToken()
+
+        event_buffer = MagicMock()
+        event_buffer.post.side_effect = lambda msg, level=EventLevel.INFO: cancel_token.cancel()
+
+        tar_packer = TarPacker(plan, cancel_token, event_buffer)
+
+        with pytest.raises(RunCancelledError):
+            tar_packer.packEntries(plan, entries)
+
+        gc.collect()
+
+
+###############################################################################
+# TEST ZSTD STREAM
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A number of zstd workers beyond the bounds of the library is clamped.
+#
+###############################################################################
+@requires_zstd
+class TestZstdStream:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path):
+        compression = CompressionSettings(
+            ArchiveFormat.ZST,
+            CompressionMethod.STORE,
+            CompressionLevel.FASTEST,
+            ZstdOptions(workers=100_000),
+        )
+        destination_file = tmp_path / "output.zst"
+
+        with (
+            open(destination_file, "wb") as dst_file,
+            openZstdStream(dst_file, compression) as dst_stream,
+        ):
+            dst_stream.write(b"content" * 1000)
+
+        assert zstd.decompress(destination_file.read_bytes()) == b"content" * 1000
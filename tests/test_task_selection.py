@@ -0,0 +1,157 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+from unittest.mock import MagicMock
+import pytest
+
+# PackY
+import packy.models.task_selection
+from packy.models.task_selection import TaskSelection
+
+###############################################################################
+# FILE HIERARCHY
+#
+# -----------------------------------------------------------------------------
+# tmp_path
+# ├─ dir_1
+# │  ├─ file_1.txt
+# │  └─ file_2.txt
+# └─ dir_2
+#    └─ file_3.txt
+#
+###############################################################################
+
+ITEMS = [
+    "dir_1",
+    "dir_1/file_1.txt",
+    "dir_1/file_2.txt",
+    "dir_2",
+    "dir_2/file_3.txt",
+]
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture
+def rootPath(tmp_path):
+    for item in ITEMS:
+        path = tmp_path / item
+        if path.suffix:
+            path.write_text(item)
+        else:
+            path.mkdir()
+
+    yield tmp_path.as_posix()
+
+
+###############################################################################
+# TEST INIT
+#
+# -----------------------------------------------------------------------------
+# Description:
+# A selection read from a session is only compared to the file system once
+# checked, and is written back with its explicit states only.
+#
+###############################################################################
+class TestInit:
+    # -------------------------------------------------------------------------
+    def test(self, rootPath, tmp_path, monkeypatch):
+        scanner = MagicMock(wraps=packy.models.task_selection.IntegrityScanner)
+        monkeypatch.setattr(packy.models.task_selection, "IntegrityScanner", scanner)
+        (tmp_path / "dir_1" / "file_4.txt").write_text("file 4")
+        (tmp_path / "dir_2" / "file_3.txt").unlink()
+
+        task_selection = TaskSelection(
+            {
+                "root_path": rootPath,
+                "check": {
+                    f"{rootPath}/dir_1": 2,
+                    f"{rootPath}/dir_1/file_1.txt": 2,
+                    f"{rootPath}/dir_1/file_2.txt": 2,
+                    f"{rootPath}/dir_2": 2,
+                    f"{rootPath}/dir_2/file_3.txt": 2,
+                },
+            }
+        )
+
+        scanner.assert_not_called()
+        assert not task_selection.is_checked
+        assert task_selection.warnings.addedItems() == []
+
+        task_selection.checkIntegrity()
+
+        assert task_selection.is_checked
+        assert task_selection.warnings.addedItems() == [f"{rootPath}/dir_1/file_4.txt"]
+        assert task_selection.warnings.removedItems() == [f"{rootPath}/dir_2/file_3.txt"]
+        assert task_selection.serialize() == {
+            "root_path": rootPath,
+            "check": {f"{rootPath}/dir_1": 2, f"{rootPath}/dir_2": 2},
+            "sparse": True,
+        }
+
+
+###############################################################################
+# TEST UPDATE MODEL
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The warnings are applied to the selection, which changes its revision.
+#
+###############################################################################
+class TestUpdateModel:
+    # -------------------------------------------------------------------------
+    def test(self, rootPath, tmp_path):
+        task_selection = TaskSelection(
+            {
+                "root_path": rootPath,
+                "check": {f"{rootPath}/dir_1/file_1.txt": 2, f"{rootPath}/dir_1/file_2.txt": 0},
+            }
+        )
+        (tmp_path / "dir_1" / "file_1.txt").unlink()
+        task_selection.checkIntegrity()
+        revision = task_selection.revision
+
+        task_selection.updateModel()
+
+        assert task_selection.checks == {}
+        assert task_selection.warnings.removedItems() == []
+        assert task_selection.revision != revision
+
+
+###############################################################################
+# TEST WATCHED PATHS
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The checked roots, the directories listed below them, and every new folder
+# between a listed directory and the added items are watched.
+#
+###############################################################################
+class TestWatchedPaths:
+    # -------------------------------------------------------------------------
+    def test(self, rootPath, tmp_path):
+        task_selection = TaskSelection(
+            {
+                "root_path": rootPath,
+                "check": {
+                    f"{rootPath}/dir_1": 2,
+                    f"{rootPath}/dir_1/file_1.txt": 2,
+                    f"{rootPath}/dir_1/file_2.txt": 2,
+                },
+            }
+        )
+        (tmp_path / "dir_1" / "new" / "sub").mkdir(parents=True)
+        (tmp_path / "dir_1" / "new" / "sub" / "file_4.txt").write_text("file 4")
+
+        task_selection.checkIntegrity()
+
+        assert task_selection.warnings.addedItems() == [f"{rootPath}/dir_1/new/sub/file_4.txt"]
+        assert task_selection.watchedPaths() == {
+            f"{rootPath}/dir_1",
+            f"{rootPath}/dir_1/new",
+            f"{rootPath}/dir_1/new/sub",
+        }
@@ -0,0 +1,58 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+from unittest.mock import MagicMock
+
+# PyQt
+from PySide6.QtCore import QObject
+
+# PackY
+import packy.models.tasks_model
+from packy.models.task_selection import TaskSelection
+from packy.models.tasks_model import TasksModel
+
+
+# -----------------------------------------------------------------------------
+class TaskDouble(QObject):
+    # A TasksModel reads the preferences and its packer data when created,
+    # so only the members handling its files model are kept
+    def __init__(self, task_selection):
+        super().__init__()
+        self._TasksModel__files_selected = task_selection
+        self._TasksModel__files_model = None
+
+    filesModel = TasksModel.filesModel
+    releaseFilesModel = TasksModel.releaseFilesModel
+
+
+###############################################################################
+# TEST FILES MODEL
+#
+# -----------------------------------------------------------------------------
+# Description:
+# Loading a task creates no files model: it is only created once the task is
+# shown, and a new one is created once the previous one is released.
+#
+###############################################################################
+class TestFilesModel:
+    # -------------------------------------------------------------------------
+    def test(self, tmp_path, monkeypatch):
+        files_model = MagicMock(wraps=packy.models.tasks_model.FilesModel)
+        monkeypatch.setattr(packy.models.tasks_model, "FilesModel", files_model)
+
+        task_selection = TaskSelection({"root_path": tmp_path.as_posix(), "check": {}})
+        task = TaskDouble(task_selection)
+        files_model.assert_not_called()
+
+        assert task.filesModel() is task.filesModel()
+        files_model.assert_called_once_with(task_selection, task)
+
+        task.releaseFilesModel()
+        task.releaseFilesModel()
+        task.filesModel()
+        assert files_model.call_count == 2
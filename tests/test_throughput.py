@@ -0,0 +1,88 @@
+"""
+Copyright 2023-present, Marie-Neige Chapel
+All rights reserved.
+
+See LICENCE.md file for more information.
+"""
+
+# Python
+import pytest
+
+# PackY
+from packy.models.throughput import ByteCounter, ThroughputWindow
+
+
+# -----------------------------------------------------------------------------
+class Clock:
+    # Time moved forward by the test
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+###############################################################################
+# TEST BYTE COUNTER
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The bytes are counted at each call but reported at most once per interval,
+# the total when counting starts and when the run ends.
+#
+###############################################################################
+class TestByteCounter:
+    # -------------------------------------------------------------------------
+    def test(self):
+        clock = Clock()
+        reports = []
+        byte_counter = ByteCounter(lambda done, total: reports.append((done, total)), 1.0, clock)
+
+        byte_counter.setTotal(100)
+        byte_counter.add(10)
+        clock.now = 0.5
+        byte_counter.add(10)
+        clock.now = 1.0
+        byte_counter.add(10)
+        byte_counter.add(10)
+
+        assert byte_counter.done == 40
+        assert reports == [(0, 100), (30, 100)]
+
+        byte_counter.finish()
+
+        assert reports[-1] == (100, 100)
+
+
+###############################################################################
+# TEST THROUGHPUT WINDOW
+#
+# -----------------------------------------------------------------------------
+# Description:
+# The throughput is averaged over the span of the window only, and the time
+# left is unknown until bytes are processed.
+#
+# -----------------------------------------------------------------------------
+# - empty: a single sample.
+# - steady: the same throughput since the start.
+# - slowdown: the bytes processed before the span are forgotten.
+#
+###############################################################################
+class TestThroughputWindow:
+    test_list = [
+        ([(0.0, 0)], 0.0, None),
+        ([(0.0, 0), (5.0, 500), (10.0, 1000)], 100.0, 10.0),
+        ([(0.0, 0), (10.0, 10000), (15.0, 10250), (20.0, 10500)], 50.0, 20.0),
+    ]
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "samples, expected_rate, expected_eta", test_list, ids=["empty", "steady", "slowdown"]
+    )
+    def test(self, samples, expected_rate, expected_eta):
+        window = ThroughputWindow(10.0)
+        for sample_time, nb_bytes in samples:
+            window.add(sample_time, nb_bytes)
+
+        assert window.rate() == expected_rate
+        assert window.eta(1000) == expected_eta
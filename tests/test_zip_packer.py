@@ -11,14 +11,16 @@ import os
 import pathlib
 import pytest
 import zipfile
-from unittest.mock import MagicMock, Mock
+from unittest.mock import Mock
 from zipfile import ZipFile, ZipInfo
 
 # PyQt
 from PySide6.QtCore import QStandardPaths
 
 # PackY
-from packy.models.tasks_model import TasksModel
+from packy.models.packer import PackEntry
+from packy.models.parallel_zip_writer import ParallelZipWriter
+from packy.models.run_plan import RunPlan
 from packy.models.zip_packer import ZipPacker
 
 # PackY tests
@@ -121,20 +123,32 @@ def createFileHierarchy(loadFileHierarchy):
     recursive(fh_dict["root"])
 
 
+# -----------------------------------------------------------------------------
+def listEntries(root_path):
+    entries = []
+    for root, dirs, files in os.walk(root_path):
+        for name in dirs + files:
+            path = os.path.join(root, name)
+            entries.append(PackEntry(path, os.path.relpath(path, root_path), name in dirs))
+
+    return entries
+
+
 ###############################################################################
-# TEST PACK TMP FOLDER
+# TEST PACK ENTRIES
 #
 # -----------------------------------------------------------------------------
 # Description:
-# ???.
+# Write the entries read from the source tree into the archive.
 #
 # -----------------------------------------------------------------------------
-# - one_file: ???.
-# - one_dir: ???.
-# - empty_dir: ???.
+# - one_file: a folder with one file.
+# - one_dir: a folder with one sub-folder containing one file.
+# - empty_dir: a folder with an empty sub-folder.
+# - complex_dir: a folder with files, sub-folders and empty sub-folders.
 #
 ###############################################################################
-class TestPackTmpFolder:
+class TestPackEntries:
     test_list = ["one_file", "one_dir", "empty_dir", "complex_dir"]
 
     # -------------------------------------------------------------------------
@@ -143,19 +157,19 @@ class TestPackTmpFolder:
         input = loadTestData[test_name]["input"]
         expected = loadTestData[test_name]["expected"]
 
-        mock_task = Mock(TasksModel)
-        mock_task.destFile = MagicMock(return_value=input["destination_file"])
-
-        tmp_folder_path = input["tmp_dir_path"]
+        entries = listEntries(input["root_path"])
         destination_filename = input["destination_file"]
         c_method = zipfile.ZIP_STORED
         c_level = 0
-        zip_packer = ZipPacker(mock_task)
-
-        with ZipFile(
-            destination_filename, mode="w", compression=c_method, compresslevel=c_level
-        ) as m_zip:
-            zip_packer._ZipPacker__packDir(m_zip, tmp_folder_path)
+        zip_packer = ZipPacker(Mock(RunPlan))
+
+        with (
+            ZipFile(
+                destination_filename, mode="w", compression=c_method, compresslevel=c_level
+            ) as m_zip,
+            ParallelZipWriter(m_zip) as zip_writer,
+        ):
+            zip_packer._ZipPacker__packEntries(zip_writer, entries)
 
         m_zip = zipfile.ZipFile(destination_filename, "r")
         for item in expected: